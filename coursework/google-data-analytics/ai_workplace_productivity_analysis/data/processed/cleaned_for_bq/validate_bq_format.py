@@ -1,25 +1,342 @@
 #!/usr/bin/env python3
 """
 Validate CSV and Schema Format for BigQuery Compatibility
+
+Sharded output (``{year}_stackoverflow_manifest.json`` from generate_cleaned_datasets.py
+--shard-rows/--shard-mb/--compress) is checked against its manifest: every shard must
+exist with the recorded size, SHA-256, header and row count. Shards are checked in
+parallel with --workers N.
+
+--deep streams every row (of the CSV or of every shard) and checks each value against
+its column's type in ``*_bq_schema.json``, the way ``bq load`` would parse it: INTEGER
+(INT64 literals), FLOAT, BOOLEAN (true/false/t/f/yes/no/y/n/1/0) and TIMESTAMP / DATE
+(YYYY-MM-DD[ HH:MM[:SS[.ffffff]]][zone], real calendar dates). It also checks each
+row's field count. Violations are counted per column with their first row numbers
+and values, so a bad value deep in a file shows up before a load job fails on it.
+Files are split into newline-aligned blocks (cleaned rows never contain a newline)
+checked by --workers processes; each block's distinct values are checked once.
 """
 
+import argparse
+import csv
+import gzip
+import hashlib
+import io
 import json
-import pandas as pd
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import repeat
 from pathlib import Path
 
-def validate_csv_and_schema(year: int):
-    """Validate a CSV and its corresponding BigQuery schema."""
+import numpy as np
+import pandas as pd
+
+DEEP_BLOCK_BYTES = 32 << 20   # newline-aligned bytes parsed at a time; uncompressed files split at this size
+FIRST_OFFENDERS = 5           # row numbers (with values) reported per column
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+# bq load's CSV literals per type, for Series.str.fullmatch over distinct values
+_INTEGER = r'[+-]?\d+'
+_FLOAT = r'(?i:[+-]?(?:(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?|inf|infinity|nan))'
+_BOOLEAN = r'(?i:true|false|t|f|yes|no|y|n|1|0)'
+_DATE = r'\d{4}-\d{1,2}-\d{1,2}'
+_TIMESTAMP = _DATE + r'(?i:[ T]\d{1,2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?)?(?i:\s*(?:Z|UTC|[+-]\d{1,2}(?::?\d{2})?))?'
+_DATE_PARTS = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})(?:[ Tt](\d{1,2}):(\d{2})(?::(\d{2}))?)?')
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional: --deep falls back to the csv module
+    pa = None
+
+def open_shard(path: Path, compression: str):
+    """Binary stream of a shard's CSV bytes, decompressed while read."""
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    if compression == 'zstd':
+        import pyarrow  # zstd shards are written (and read) with pyarrow's codec
+        return pyarrow.input_stream(str(path), compression='zstd')
+    return open(path, 'rb')
+
+def check_shard(path: str, compression: str, entry: dict, columns: list) -> list:
+    """Problems found in one shard (empty when it matches its manifest entry)."""
+    path = Path(path)
+    if not path.exists():
+        return [f"{entry['file']}: missing"]
+    problems = []
+    if path.stat().st_size != entry['bytes']:
+        problems.append(f"{entry['file']}: {path.stat().st_size} bytes, manifest says {entry['bytes']}")
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    if digest.hexdigest() != entry['sha256']:
+        problems.append(f"{entry['file']}: SHA-256 does not match the manifest")
+        return problems  # corrupt: counting rows would only add noise
+    with open_shard(path, compression) as raw:
+        reader = csv.reader(io.TextIOWrapper(raw, encoding='utf-8', newline=''), escapechar='\\')
+        header = next(reader, None)
+        rows = sum(1 for _ in reader)
+    if header != columns:
+        problems.append(f"{entry['file']}: header does not match the manifest columns")
+    if rows != entry['rows']:
+        problems.append(f"{entry['file']}: {rows} rows, manifest says {entry['rows']}")
+    return problems
+
+def validate_manifest(manifest_file: Path, workers: int = 1) -> bool:
+    """Check every shard listed in ``manifest_file`` (sizes, checksums, headers, row counts)."""
+    with open(manifest_file, 'r') as f:
+        manifest = json.load(f)
+    shards = manifest['shards']
+    args = [(str(manifest_file.parent / s['file']), manifest['compression'], s, manifest['columns']) for s in shards]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(check_shard, *zip(*args)))
+    else:
+        results = [check_shard(*a) for a in args]
+    problems = [p for r in results for p in r]
+
+    if sum(s['rows'] for s in shards) != manifest['total_rows']:
+        problems.append(f"Shard rows add up to {sum(s['rows'] for s in shards)}, manifest total is {manifest['total_rows']}")
+    if not problems:
+        print(f"✅ {len(shards)} {manifest['compression']} shard(s) match the manifest: "
+              f"{manifest['total_rows']:,} rows, checksums and headers verified")
+        return True
+    print(f"❌ Shards do not match the manifest ({len(problems)} problem(s)):")
+    for problem in problems[:10]:  # Show first 10
+        print(f"   {problem}")
+    return False
+
+def _in_int64(value: str) -> bool:
+    return _INT64_MIN <= int(value) <= _INT64_MAX
+
+def _real_date(value: str) -> bool:
+    parts = _DATE_PARTS.match(value)
+    try:
+        datetime(*[int(parts[k] or 0) for k in range(1, 7)])
+    except ValueError:
+        return False
+    return True
+
+# Local stand-in for bq load's CSV parsing: BigQuery type -> (literal pattern, further
+# check in Python or None, shortest value that needs it)
+VALUE_CHECKS = {
+    'INTEGER': (_INTEGER, _in_int64, 19), 'INT64': (_INTEGER, _in_int64, 19),
+    'FLOAT': (_FLOAT, None, 0), 'FLOAT64': (_FLOAT, None, 0),
+    'BOOLEAN': (_BOOLEAN, None, 0), 'BOOL': (_BOOLEAN, None, 0),
+    'TIMESTAMP': (_TIMESTAMP, _real_date, 0), 'DATE': (_DATE, _real_date, 0),
+}
+
+def value_fits(uniques: pd.Series, bq_type: str, required: bool) -> np.ndarray:
+    """Per distinct value: would ``bq load`` accept it for ``bq_type``? ('' is null: fine unless REQUIRED)"""
+    if bq_type in VALUE_CHECKS:
+        pattern, check, min_len = VALUE_CHECKS[bq_type]
+        ok = np.array(uniques.str.fullmatch(pattern).to_numpy(dtype=bool, na_value=False))
+        if check is not None:
+            for k in np.flatnonzero(ok & (uniques.str.len().to_numpy() >= min_len)):
+                ok[k] = check(uniques.iloc[k])
+    else:
+        ok = np.ones(len(uniques), dtype=bool)
+    ok[(uniques == '').to_numpy(dtype=bool)] = not required
+    return ok
+
+def _blocks(stream, limit):
+    """Newline-aligned blocks of about DEEP_BLOCK_BYTES from ``stream`` (at most ``limit`` bytes if given)."""
+    carry = b''
+    while True:
+        size = DEEP_BLOCK_BYTES if limit is None else min(DEEP_BLOCK_BYTES, limit)
+        data = stream.read(size) if size > 0 else b''
+        if limit is not None:
+            limit -= len(data)
+        if not data:
+            if carry:
+                yield carry
+            return
+        data = carry + data
+        cut = data.rfind(b'\n') + 1
+        carry = data[cut:]
+        if cut:
+            yield data[:cut]
+
+def _ranges(path: Path) -> list:
+    """(start, end) byte ranges of an uncompressed CSV, about DEEP_BLOCK_BYTES each, cut after a newline."""
+    size = path.stat().st_size
+    bounds = [0]
+    with open(path, 'rb') as f:
+        while bounds[-1] + DEEP_BLOCK_BYTES < size:
+            f.seek(bounds[-1] + DEEP_BLOCK_BYTES)
+            f.readline()
+            if f.tell() >= size:
+                break
+            bounds.append(f.tell())
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def _parse_arrow(block: bytes, columns: list, wanted: list):
+    """(rows, {index: (codes, distinct values)}) for the ``wanted`` columns, or None if a row is ragged."""
+    ragged = []
+    def invalid(row):
+        ragged.append(row.number)
+        return 'skip'
+    names = [columns[i] for i in wanted] or columns[:1]
+    table = pa_csv.read_csv(
+        pa.py_buffer(block),
+        read_options=pa_csv.ReadOptions(column_names=columns),
+        parse_options=pa_csv.ParseOptions(escape_char='\\', ignore_empty_lines=False, invalid_row_handler=invalid),
+        convert_options=pa_csv.ConvertOptions(column_types={name: pa.string() for name in names},
+                                              include_columns=names, strings_can_be_null=False,
+                                              quoted_strings_can_be_null=False))
+    if ragged:
+        return None
+    parsed = {}
+    for i in wanted:
+        encoded = table.column(columns[i]).combine_chunks().dictionary_encode()
+        parsed[i] = (encoded.indices.to_numpy(zero_copy_only=False), encoded.dictionary.to_pandas(types_mapper=pd.ArrowDtype))
+    return table.num_rows, parsed
+
+def _parse_rows(text: str, width: int, wanted: list):
+    """(rows, ragged row indexes, {index: (codes, distinct values)}) with the csv module."""
+    rows = list(csv.reader(io.StringIO(text, newline=''), escapechar='\\'))
+    ragged = [k for k, row in enumerate(rows) if len(row) != width]
+    parsed = {}
+    for i in wanted:
+        values = np.array([row[i] if i < len(row) else '' for row in rows], dtype=object)
+        codes, uniques = pd.factorize(values)
+        parsed[i] = (codes, pd.Series(uniques, dtype=object))
+    return len(rows), ragged, parsed
+
+def check_values(path: str, compression: str, start: int, end, columns: list, types: list, modes: list) -> dict:
+    """
+    Check bytes [start, end) of one CSV (a whole shard: 0, None) against the column
+    types. Rows are numbered from 0 within the range; the range at 0 starts with the
+    header. Blocks are parsed with pyarrow when installed; one with a ragged row is
+    re-parsed with the csv module, which locates it. Returns {'rows', 'bytes',
+    'problems': [...], 'fields': [count, [row, ...]], 'columns': {index: [count,
+    [(row, value), ...]]}}.
+    """
+    checks = [(i, t, m == 'REQUIRED') for i, (t, m) in enumerate(zip(types, modes))
+              if t in VALUE_CHECKS or m == 'REQUIRED']
+    wanted = [i for i, _, _ in checks]
+    name = Path(path).name
+    out = {'rows': 0, 'bytes': 0, 'problems': [], 'fields': [0, []], 'columns': {}}
+    if compression == 'none':
+        stream = open(path, 'rb')
+        stream.seek(start)
+        limit = None if end is None else end - start
+    else:
+        stream, limit = open_shard(Path(path), compression), None
+    with stream:
+        for block in _blocks(stream, limit):
+            at = start + out['bytes']
+            out['bytes'] += len(block)
+            if at == 0:
+                line, _, block = block.partition(b'\n')
+                at += len(line) + 1
+                header = next(csv.reader([line.decode('utf-8', errors='replace').rstrip('\r')], escapechar='\\'), [])
+                if header != columns:
+                    out['problems'].append(f"{name}: header does not match the schema columns")
+            try:
+                text = block.decode('utf-8')
+            except UnicodeDecodeError as e:
+                out['problems'].append(f"{name}: invalid UTF-8 at byte {at + e.start:,}")
+                text = block.decode('utf-8', errors='replace')
+                block = text.encode('utf-8')
+            parsed = _parse_arrow(block, columns, wanted) if pa is not None and block else None
+            if parsed is not None:
+                rows, columns_parsed = parsed
+                ragged = []
+            else:
+                rows, ragged, columns_parsed = _parse_rows(text, len(columns), wanted)
+            base = out['rows']
+            out['rows'] += rows
+            if ragged:
+                fields = out['fields']
+                fields[0] += len(ragged)
+                fields[1] += [base + k for k in ragged[:FIRST_OFFENDERS - len(fields[1])]]
+            for i, bq_type, required in checks:
+                codes, uniques = columns_parsed[i]
+                ok = value_fits(uniques, bq_type, required)
+                if ok.all():
+                    continue
+                bad = np.flatnonzero(~ok[codes])
+                entry = out['columns'].setdefault(i, [0, []])
+                entry[0] += len(bad)
+                entry[1] += [(base + int(k), uniques.iloc[codes[k]]) for k in bad[:FIRST_OFFENDERS - len(entry[1])]]
+    return out
+
+def validate_values(files: list, schema_fields: list, workers: int = 1) -> bool:
+    """
+    Check every value of ``files`` ([(path, compression)] in row order: the CSV, or the
+    shards of a manifest) against ``schema_fields``. Prints the violations per column
+    with their first data rows (1-based, header excluded).
+    """
+    columns = [f['name'] for f in schema_fields]
+    types = [f['type'].upper() for f in schema_fields]
+    modes = [f.get('mode', 'NULLABLE').upper() for f in schema_fields]
+    tasks = [(str(path), compression, start, end) for path, compression in files
+             for start, end in (_ranges(Path(path)) if compression == 'none' else [(0, None)])]
+    started = time.perf_counter()
+    extra = (repeat(columns), repeat(types), repeat(modes))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(check_values, *zip(*tasks), *extra))
+    else:
+        results = list(map(check_values, *zip(*tasks), *extra))
+    seconds = time.perf_counter() - started
+
+    sharded = len(files) > 1
+    offsets, problems = {}, []   # rows before each range within its file
+    fields = [0, []]
+    violations = {}
+    for (path, _, _, _), result in zip(tasks, results):
+        offset = offsets.get(path, 0)
+        prefix = f"{Path(path).name} " if sharded else ''
+        problems += result['problems']
+        fields[0] += result['fields'][0]
+        fields[1] += [f"{prefix}row {offset + k + 1:,}" for k in result['fields'][1]]
+        for i, (count, first) in result['columns'].items():
+            seen = violations.setdefault(i, [0, []])
+            seen[0] += count
+            seen[1] += [(f"{prefix}row {offset + k + 1:,}", value) for k, value in first]
+        offsets[path] = offset + result['rows']
+    rows = sum(r['rows'] for r in results)
+    nbytes = sum(r['bytes'] for r in results)
+    checked = sum(1 for t, m in zip(types, modes) if t in VALUE_CHECKS or m == 'REQUIRED')
+    print(f"🔬 Deep check: {rows:,} rows, {checked} typed column(s) in {seconds:.1f}s "
+          f"({nbytes / 1e6 / max(seconds, 1e-9):.0f} MB/s)")
+
+    for problem in problems[:10]:
+        print(f"❌ {problem}")
+    if fields[0]:
+        print(f"❌ {fields[0]:,} row(s) without {len(columns)} fields, first at "
+              f"{', '.join(fields[1][:FIRST_OFFENDERS])}")
+    if violations:
+        print(f"❌ {len(violations)} column(s) with values BigQuery would reject:")
+        for i in sorted(violations):
+            count, first = violations[i]
+            shown = ', '.join(f"{where} ({value!r})" for where, value in first[:FIRST_OFFENDERS])
+            print(f"   {columns[i]} ({types[i]}{', REQUIRED' if modes[i] == 'REQUIRED' else ''}): "
+                  f"{count:,} value(s), first at {shown}")
+    if problems or fields[0] or violations:
+        return False
+    print("✅ Every value fits its column's BigQuery type")
+    return True
+
+def validate_csv_and_schema(year: int, base_path: Path = Path("."), workers: int = 1, deep: bool = False):
+    """Validate a CSV (or its manifest and shards) and its corresponding BigQuery schema."""
 
-    base_path = Path(".")
     csv_file = base_path / f"{year}_stackoverflow_cleaned.csv"
+    manifest_file = base_path / f"{year}_stackoverflow_manifest.json"
     schema_file = base_path / f"{year}_stackoverflow_bq_schema.json"
+    sharded = manifest_file.exists()
 
     print(f"\n📊 Validating {year} Dataset")
-    print(f"CSV: {csv_file}")
+    print(f"Manifest: {manifest_file}" if sharded else f"CSV: {csv_file}")
     print(f"Schema: {schema_file}")
 
     # Check files exist
-    if not csv_file.exists():
+    if not sharded and not csv_file.exists():
         print(f"❌ CSV file not found: {csv_file}")
         return False
 
@@ -31,8 +348,17 @@ def validate_csv_and_schema(year: int):
     with open(schema_file, 'r') as f:
         schema = json.load(f)
 
-    # Load CSV header
-    df_sample = pd.read_csv(csv_file, nrows=5)
+    # Load CSV header (first shard when sharded, after checking every shard)
+    if sharded:
+        if not validate_manifest(manifest_file, workers):
+            return False
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+        first = manifest['shards'][0]
+        with open_shard(base_path / first['file'], manifest['compression']) as raw:
+            df_sample = pd.read_csv(raw, nrows=5)
+    else:
+        df_sample = pd.read_csv(csv_file, nrows=5)
 
     # Check schema format
     if isinstance(schema, list):
@@ -97,18 +423,36 @@ def validate_csv_and_schema(year: int):
             sample_values = df_sample[col].dropna().head(3).tolist()
             print(f"   {col}: {sample_values}")
 
+    # Every value against its column type (--deep)
+    if deep:
+        if sharded:
+            files = [(base_path / s['file'], manifest['compression']) for s in manifest['shards']]
+        else:
+            files = [(csv_file, 'none')]
+        if not validate_values(files, schema_fields, workers):
+            return False
+
     print(f"✅ Dataset {year} is ready for BigQuery!")
     return True
 
 def main():
     """Validate all datasets."""
+    parser = argparse.ArgumentParser(description="Validate cleaned CSVs (or shard manifests) against BigQuery schemas")
+    parser.add_argument('--dir', type=str, default='.', help='Directory with the cleaned files (default: .)')
+    parser.add_argument('--years', type=int, nargs='+', default=[2023, 2024, 2025], help='Survey years to check')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes checking shards / --deep blocks in parallel (default: 1)')
+    parser.add_argument('--deep', action='store_true',
+                        help='Stream every row and check each value against its BigQuery column type')
+    args = parser.parse_args()
+
     print("🔍 BigQuery Format Validation")
     print("=" * 50)
 
     all_valid = True
-    for year in [2023, 2024, 2025]:
+    for year in args.years:
         try:
-            if not validate_csv_and_schema(year):
+            if not validate_csv_and_schema(year, Path(args.dir), args.workers, args.deep):
                 all_valid = False
         except Exception as e:
             print(f"❌ Error validating {year}: {e}")
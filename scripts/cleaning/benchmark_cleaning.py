@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Benchmark — BigQuery cleaning paths (``generate_cleaned_datasets.py``)
+
+Suites, per survey year:
+  - read  : the former whole-file ``engine='python'`` read vs ``read_survey_csv``
+            (C engine, Python engine only for irregular regions); frames must be
+            identical. Each input is also read with corrupted lines spliced in (open
+            quotes, ``"x"y``, NUL bytes, extra fields, stray inch marks, records that
+            are only ``""``) at a fixed
+            interval, so the Python tier and its range isolation are exercised too.
+  - write : the former ``csv.writer`` + ``iterrows`` row loop vs the bulk
+            ``write_cleaned_csv`` (Arrow engine when pyarrow is installed, and the
+            ``DataFrame.to_csv`` engine); output files must be byte-for-byte identical.
+            An edge-case frame (backslashes, quotes, newlines, NaN/None, numbers,
+            non-ASCII, non-string column names) is checked the same way first.
+  - sanitize : step 4 as six chained pandas calls per column vs the one-batch
+            ``sanitize_text``; frames must be identical (edge cases first: NULs inside
+            CRLF, null tokens, the join separator, NaN, numbers).
+
+Inputs are the same CSV paths as ``generate_cleaned_datasets.py`` expects; if none
+exist (or ``--synthetic-rows`` is given) synthetic survey-shaped CSVs are generated
+in a temp directory (``benchmark_inventory.make_synthetic_csv``).
+
+Usage:
+  python benchmark_cleaning.py --csv2023 ... --csv2024 ... --csv2025 ...
+  python benchmark_cleaning.py --synthetic-rows 100000 --json bench.json
+  python benchmark_cleaning.py ... --suite sanitize
+"""
+
+from __future__ import annotations
+import argparse, csv, filecmp, json, tempfile, time
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Callable
+
+import numpy as np
+import pandas as pd
+
+import generate_cleaned_datasets as gcd
+import tiered_reader
+from benchmark_inventory import make_synthetic_csv
+
+# ----------------------------- reference paths ----------------------------------------
+
+def legacy_write(df: pd.DataFrame, output_file: Path) -> None:
+    """The pre-bulk writer: one csv.writer row per ``iterrows`` Series."""
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL, escapechar='\\')
+        writer.writerow(df.columns.tolist())
+        for _, row in df.iterrows():
+            writer.writerow([str(val) if pd.notna(val) else '' for val in row])
+
+def edge_case_frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        'text': ['plain', 'back\\slash', 'say "hi"', 'multi\nline\r\nrow', '', None, np.nan, 'naïve — ✓'],
+        'ints': [1, 2, 3, 4, 5, 6, 7, 8],
+        'floats': [0.1, 1e16, -2.5, np.nan, 3.0, 1e-7, 2.0, np.inf],
+        'mixed': [1, 'a', 2.5, None, True, pd.Timestamp('2024-01-02'), 'x,y', '\\"'],
+        7: ['int', 'column', 'name', '', '', '', '', ''],
+        'survey_year': 2025,
+    })
+
+def legacy_sanitize(df: pd.DataFrame) -> pd.DataFrame:
+    """The pre-batch step 4: astype(str), five str.replace calls and a replace per column."""
+    df = df.copy()
+    for col in df.columns:
+        df[col] = df[col].astype(str)
+        df[col] = df[col].str.replace('\x00', '', regex=False)
+        df[col] = df[col].str.replace('\r\n', ' ', regex=False)
+        df[col] = df[col].str.replace('\r', ' ', regex=False)
+        df[col] = df[col].str.replace('\n', ' ', regex=False)
+        df[col] = df[col].str.replace('"', "'", regex=False)
+        df[col] = df[col].replace(['nan', 'NaN', 'NULL', 'null'], '')
+    return df
+
+def sanitize_edge_frame() -> pd.DataFrame:
+    # no None: astype(str) renders it 'None' in pandas 2 but missing in pandas 3 (the reader only yields NaN)
+    return pd.DataFrame({
+        'text': ['a\r\x00\nb', '\x00\r\n', 'nu\x00ll', 'NaN', 'say "hi"', '\r\r\n\n', 'x\x1fy', 'naïve — ✓'],
+        'nulls': [np.nan, np.nan, 'null', 'NULL', 'nan ', '', 'None', 'n\nan'],
+        'numbers': [1, 2.5, np.nan, -3, 0, 1e16, True, 7],
+    }, dtype=object)
+
+CORRUPT_LINES = [
+    '1,"an open quote that never closes,x\n',
+    '2,"closed"then text,x\n',
+    '3,nul\x00byte,x\n',
+    '4,' + ','.join(['extra'] * 200) + '\n',
+    '5,5\'11" tall,x\n',
+    '""\n',
+]
+
+def legacy_read(file_path: str, encoding: str) -> pd.DataFrame:
+    """The pre-tiered read: pandas' Python engine over the whole file."""
+    return pd.read_csv(file_path, encoding=encoding, dtype=str, on_bad_lines='skip', engine='python',
+                       quotechar='"', doublequote=True, skipinitialspace=True)
+
+def corrupt_copy(src: str, dst: Path, every: int) -> None:
+    """Copy ``src`` with one of ``CORRUPT_LINES`` after every ``every``-th line (ends on a clean line)."""
+    with open(src, 'r', encoding='utf-8', errors='surrogateescape', newline='') as fin, \
+         open(dst, 'w', encoding='utf-8', errors='surrogateescape', newline='') as fout:
+        for i, line in enumerate(fin, 1):
+            fout.write(line)
+            if i % every == 0:
+                fout.write(CORRUPT_LINES[(i // every) % len(CORRUPT_LINES)])
+
+def frames_identical(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    return list(a.columns) == list(b.columns) and a.index.equals(b.index) and a.equals(b)
+
+def cells_identical(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    """Same labels and the same cells as the CSV writer renders them (missing and '' alike)."""
+    return (list(a.columns) == list(b.columns) and a.index.equals(b.index)
+            and a.astype(object).fillna('').equals(b.astype(object).fillna('')))
+
+def load_cleaned(file_path: str, year: int) -> pd.DataFrame:
+    """A cleaned frame as ``clean_csv_for_bigquery`` writes it (steps 1-5 only)."""
+    encoding = gcd.detect_encoding(file_path)['encoding']
+    df, _ = tiered_reader.read_survey_csv(file_path, encoding)
+    df, _ = gcd.clean_frame(df, year, encoding)
+    return df
+
+def bulk_writer(engine: str) -> Callable[[pd.DataFrame, Path], None]:
+    def write(df: pd.DataFrame, output_file: Path) -> None:
+        gcd.write_cleaned_csv(df, output_file, engine=engine)
+    return write
+
+def time_read(fn: Callable[[], Any], size: int, repeat: int) -> Tuple[Any, Dict[str, Any]]:
+    best, out = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return out, {'seconds': round(best, 3), 'mb_per_s': round(size / 2**20 / best, 1) if best else None}
+
+def time_write(fn: Callable[[pd.DataFrame, Path], None], df: pd.DataFrame, out: Path, repeat: int) -> Dict[str, Any]:
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(df, out)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    size = out.stat().st_size
+    return {'seconds': round(best, 3), 'rows_per_s': round(len(df) / best) if best else None,
+            'mb_per_s': round(size / 2**20 / best, 1) if best else None, 'bytes': size}
+
+# ----------------------------- CLI ----------------------------------------------------
+
+def run_read(inputs: List[tuple], repeat: int, workdir: Path, corrupt_every: int) -> Dict[str, Any]:
+    results = []
+    for fp, yr in inputs:
+        encoding = gcd.detect_encoding(fp)['encoding']
+        bad = workdir / f'{yr}_corrupted.csv'
+        corrupt_copy(fp, bad, corrupt_every)
+        for label, path in (('clean', fp), ('corrupted', str(bad))):
+            size = Path(path).stat().st_size
+            ref, legacy = time_read(lambda: legacy_read(path, encoding), size, repeat)
+            (df, info), tiered = time_read(lambda: tiered_reader.read_survey_csv(path, encoding), size, repeat)
+            identical = frames_identical(ref, df)
+            results.append({'year': yr, 'file': path, 'input': label, 'rows': len(ref), 'identical': identical,
+                            'python': legacy, 'tiered': tiered, **info})
+            share = info['python_bytes'] / size if size else 0.0
+            speedup = legacy['seconds'] / tiered['seconds'] if tiered['seconds'] else float('inf')
+            print(f"{yr} {label:<9}: {len(ref):>8,} rows | python {legacy['seconds']:>6.2f}s → tiered "
+                  f"{tiered['seconds']:>6.2f}s ({speedup:.1f}x, {share:.1%} re-parsed in "
+                  f"{info['python_runs']} run(s)) | identical: {'✅' if identical else '❌'}")
+        bad.unlink()
+
+    totals = {k: round(sum(r[k]['seconds'] for r in results), 3) for k in ('python', 'tiered')}
+    summary = {'seconds': totals, 'identical': all(r['identical'] for r in results)}
+    if totals['tiered']:
+        print(f"\nCSV read: python {totals['python']}s → tiered {totals['tiered']}s "
+              f"({totals['python'] / totals['tiered']:.1f}x, frames identical: {summary['identical']})")
+    return {'per_input': results, 'summary': summary}
+
+def run_sanitize(inputs: List[tuple], repeat: int) -> Dict[str, Any]:
+    edge = sanitize_edge_frame()
+    edge_identical = cells_identical(legacy_sanitize(edge), gcd.sanitize_text(edge))
+    print(f"edge cases: identical: {'✅' if edge_identical else '❌'}")
+
+    results = []
+    for fp, yr in inputs:
+        encoding = gcd.detect_encoding(fp)['encoding']
+        df, _ = tiered_reader.read_survey_csv(fp, encoding)
+        df = df.rename(columns=gcd.clean_column_names(df.columns))
+        size = Path(fp).stat().st_size
+        ref, legacy = time_read(lambda: legacy_sanitize(df), size, repeat)
+        out, batch = time_read(lambda: gcd.sanitize_text(df), size, repeat)
+        identical = cells_identical(ref, out)
+        results.append({'year': yr, 'file': fp, 'rows': len(df), 'columns': df.shape[1],
+                        'identical': identical, 'chained': legacy, 'batch': batch})
+        speedup = legacy['seconds'] / batch['seconds'] if batch['seconds'] else float('inf')
+        print(f"{yr}: {len(df):>8,} rows × {df.shape[1]:>3} cols | chained {legacy['seconds']:>6.2f}s → batch "
+              f"{batch['seconds']:>6.2f}s ({speedup:.1f}x) | identical: {'✅' if identical else '❌'}")
+
+    totals = {k: round(sum(r[k]['seconds'] for r in results), 3) for k in ('chained', 'batch')}
+    summary = {'seconds': totals, 'identical': edge_identical and all(r['identical'] for r in results)}
+    if totals['batch']:
+        print(f"\nText sanitizing: chained {totals['chained']}s → batch {totals['batch']}s "
+              f"({totals['chained'] / totals['batch']:.1f}x, frames identical: {summary['identical']})")
+    return {'per_year': results, 'edge_cases_identical': edge_identical, 'summary': summary}
+
+def run_write(inputs: List[tuple], repeat: int, workdir: Path) -> Dict[str, Any]:
+    engines = [('pandas', bulk_writer('pandas'))]
+    if gcd.pa is not None:
+        engines.insert(0, ('arrow', bulk_writer('arrow')))
+    names = ['iterrows'] + [name for name, _ in engines]
+
+    edge = edge_case_frame()
+    legacy_write(edge, workdir / 'edge_legacy.csv')
+    edge_identical = True
+    for name, fn in engines:
+        fn(edge, workdir / f'edge_{name}.csv')
+        edge_identical &= filecmp.cmp(workdir / 'edge_legacy.csv', workdir / f'edge_{name}.csv', shallow=False)
+    print(f"edge cases: identical: {'✅' if edge_identical else '❌'}")
+
+    results = []
+    for fp, yr in inputs:
+        df = load_cleaned(fp, yr)
+        legacy_out = workdir / f'{yr}_iterrows.csv'
+        timings = {'iterrows': time_write(legacy_write, df, legacy_out, repeat)}
+        identical = True
+        for name, fn in engines:
+            out = workdir / f'{yr}_{name}.csv'
+            timings[name] = time_write(fn, df, out, repeat)
+            identical &= filecmp.cmp(legacy_out, out, shallow=False)
+            out.unlink()
+        legacy_out.unlink()
+        results.append({'year': yr, 'file': fp, 'rows': len(df), 'columns': df.shape[1],
+                        'identical': identical, **timings})
+        line = " | ".join(f"{name} {timings[name]['seconds']:>6.2f}s ({timings[name]['mb_per_s']} MB/s)"
+                          for name in names)
+        print(f"{yr}: {len(df):>8,} rows × {df.shape[1]:>3} cols | {line} | identical: {'✅' if identical else '❌'}")
+
+    totals = {name: round(sum(r[name]['seconds'] for r in results), 3) for name in names}
+    summary = {'seconds': totals, 'identical': edge_identical and all(r['identical'] for r in results)}
+    speedups = ", ".join(f"{name} {totals['iterrows'] / totals[name]:.1f}x" for name in names[1:] if totals[name])
+    print(f"\nCSV write: iterrows {totals['iterrows']}s → {speedups} (bytes identical: {summary['identical']})")
+    return {'per_year': results, 'edge_cases_identical': edge_identical, 'summary': summary}
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark BigQuery cleaning paths")
+    p.add_argument('--csv2023', type=str, default='stackoverflow_2023.csv', help='Path to 2023 CSV')
+    p.add_argument('--csv2024', type=str, default='stackoverflow_2024.csv', help='Path to 2024 CSV')
+    p.add_argument('--csv2025', type=str, default='stackoverflow_2025.csv', help='Path to 2025 CSV')
+    p.add_argument('--synthetic-rows', type=int, default=None, help='Generate synthetic CSVs with this many rows')
+    p.add_argument('--synthetic-cols', type=int, default=120, help='Column count for synthetic CSVs')
+    p.add_argument('--repeat', type=int, default=1, help='Repetitions per path (best time kept)')
+    p.add_argument('--corrupt-every', type=int, default=5000, help='read suite: splice a bad line after every N lines')
+    p.add_argument('--suite', choices=['read', 'write', 'sanitize', 'all'], default='all', help='Which comparison(s) to run')
+    p.add_argument('--json', type=str, default=None, help='Optional path to write results as JSON')
+    return p.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args()
+    inputs = [(args.csv2023, 2023), (args.csv2024, 2024), (args.csv2025, 2025)]
+    tmp = tempfile.TemporaryDirectory(prefix='cleaning_bench_')
+    workdir = Path(tmp.name)
+    if args.synthetic_rows or not all(Path(fp).exists() for fp, _ in inputs):
+        rows = args.synthetic_rows or 50000
+        print(f"Generating synthetic survey CSVs ({rows:,} rows × {args.synthetic_cols} cols) in {tmp.name}")
+        inputs = []
+        for yr in (2023, 2024, 2025):
+            fp = workdir / f'stackoverflow_{yr}.csv'
+            make_synthetic_csv(fp, rows, args.synthetic_cols, seed=yr)
+            inputs.append((str(fp), yr))
+    out = {}
+    if args.suite in ('read', 'all'):
+        print("\n=== CSV read: whole-file Python engine vs tiered reader ===")
+        out['read'] = run_read(inputs, args.repeat, workdir, args.corrupt_every)
+    if args.suite in ('sanitize', 'all'):
+        print("\n=== Text sanitizing (step 4): chained per-column calls vs one batch ===")
+        out['sanitize'] = run_sanitize(inputs, args.repeat)
+    if args.suite in ('write', 'all'):
+        print("\n=== CSV write: iterrows row loop vs bulk writers ===")
+        out['write'] = run_write(inputs, args.repeat, workdir)
+    if args.json:
+        Path(args.json).write_text(json.dumps(out, indent=2), encoding='utf-8')
+        print(f"✅ Written: {args.json}")
+    tmp.cleanup()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Benchmark — Pass-1 inventory load paths
+
+Three suites, per survey year:
+  - load : legacy two-read load (csv-module ``structural_scan`` followed by a separate
+           ``pd.read_csv``) vs the fused single-read ``load_with_scan``
+  - scan : ``structural_scan`` engines — csv.reader row loop vs the byte-level mmap
+           scanner (the fallback for files pandas cannot load); results must match
+  - profile : per-column type sniffing (one to_numeric / regex pass per column) vs the
+           batched ``sniff_frame`` + lazy ``confirm_numeric``; flags must match, and the
+           HyperLogLog distinct estimates of ``profile_columns`` and a chunked
+           ``ChunkedColumnProfiler`` run must agree
+
+Inputs are the same CSV paths as ``data_inventory_master_pass1.py``; if none exist
+(or ``--synthetic-rows`` is given) synthetic survey-shaped CSVs are generated in a
+temp directory so the benchmark can run anywhere.
+
+Usage:
+  python benchmark_inventory.py --csv2023 ... --csv2024 ... --csv2025 ...
+  python benchmark_inventory.py --synthetic-rows 100000 --json bench.json
+  python benchmark_inventory.py --suite scan
+  python benchmark_inventory.py --suite profile
+"""
+
+from __future__ import annotations
+import argparse, csv, json, random, tempfile, time
+from pathlib import Path
+from typing import Dict, Any, List, Callable
+
+import pandas as pd
+
+import data_inventory_master_pass1 as inv
+
+# ----------------------------- helpers ------------------------------------------------
+
+def read_bytes_counter() -> int | None:
+    """Bytes read by this process so far (Linux /proc/self/io 'rchar'); None elsewhere."""
+    try:
+        for line in Path('/proc/self/io').read_text().splitlines():
+            if line.startswith('rchar:'):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def make_synthetic_csv(path: Path, rows: int, ncols: int, seed: int) -> None:
+    """Write a survey-shaped CSV: ids, categoricals, multiselects, numerics and quoted text."""
+    rng = random.Random(seed)
+    cats = ['Employed, full-time', 'Student, part-time', 'Independent contractor, freelancer, or self-employed', 'Retired']
+    langs = ['Python', 'SQL', 'JavaScript', 'C#', 'Go', 'Rust', 'Bash/Shell (all shells)', 'TypeScript']
+    header = ['ResponseId', 'Employment', 'LanguageHaveWorkedWith', 'YearsCodePro', 'ConvertedCompYearly']
+    header += [f'Q{i}' for i in range(max(0, ncols - len(header)))]
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        w = csv.writer(f)
+        w.writerow(header)
+        for i in range(rows):
+            row = [i + 1, rng.choice(cats), ';'.join(rng.sample(langs, rng.randint(1, 4))),
+                   rng.choice(['Less than 1 year', '3', '10', '', 'More than 50 years']),
+                   rng.choice(['', str(rng.randint(5000, 400000))])]
+            row += [rng.choice(['', 'Yes', 'No', 'Agree; Neutral', 'free text, "quoted"']) for _ in header[5:]]
+            w.writerow(row)
+
+def legacy_load(file_path: str) -> int:
+    """The pre-fusion path: full csv-module scan, then an independent pandas read."""
+    struct = inv.structural_scan(file_path, engine='csv')
+    df = pd.read_csv(file_path, low_memory=False, dtype=str, on_bad_lines='skip',
+                     encoding=struct.get('encoding_used', 'utf-8'))
+    return len(df)
+
+def fused_load(file_path: str) -> int:
+    df, _ = inv.load_with_scan(file_path, inv.pick_encoding(file_path))
+    return len(df)
+
+def scan_with(engine: str) -> Callable[[str], Dict[str, Any]]:
+    def scan(file_path: str) -> Dict[str, Any]:
+        return inv.structural_scan(file_path, engine=engine)
+    return scan
+
+def legacy_flags(df: pd.DataFrame) -> List[Dict[str, bool]]:
+    """The pre-batching flags: full to_numeric plus per-column date / multiselect sniffs."""
+    flags = []
+    for col in df.columns:
+        s = df[col]
+        is_numeric = bool(pd.to_numeric(s, errors='coerce').notna().sum() > 0)
+        flags.append({'is_numeric': is_numeric,
+                      'looks_like_date': False if is_numeric else inv.looks_like_date(s),
+                      'is_multiselect': inv.is_multiselect(s)})
+    return flags
+
+def batched_flags(df: pd.DataFrame) -> List[Dict[str, bool]]:
+    """The flag logic of ``profile_columns``: shared sample first, full confirm only on a miss."""
+    flags = []
+    for i, sniff in enumerate(inv.sniff_frame(df)):
+        is_numeric = sniff['numeric_hit'] or inv.confirm_numeric(df.iloc[:, i].value_counts(dropna=False))
+        rate = sniff['date_rate']
+        flags.append({'is_numeric': is_numeric,
+                      'looks_like_date': False if (is_numeric or rate is None) else bool(rate > 0.7),
+                      'is_multiselect': sniff['multiselect']})
+    return flags
+
+def distinct_mismatches(df: pd.DataFrame, chunksize: int) -> List[str]:
+    """Columns whose distinct estimate differs between the whole-frame and chunked profilers."""
+    full, _ = inv.profile_columns(df)
+    chunked = inv.ChunkedColumnProfiler(list(df.columns))
+    for start in range(0, len(df), chunksize):
+        chunked.update(df.iloc[start:start + chunksize])
+    return [a['name'] for a, b in zip(full, chunked.finalize())
+            if a['distinct_estimate'] != b['distinct_estimate']]
+
+def time_call(fn: Callable[[str], Any], file_path: str, repeat: int) -> Dict[str, Any]:
+    best = None
+    bytes_read = None
+    result = None
+    for _ in range(repeat):
+        before = read_bytes_counter()
+        t0 = time.perf_counter()
+        result = fn(file_path)
+        elapsed = time.perf_counter() - t0
+        after = read_bytes_counter()
+        if best is None or elapsed < best:
+            best = elapsed
+            bytes_read = (after - before) if before is not None and after is not None else None
+    out = {'seconds': round(best, 3), 'bytes_read': bytes_read}
+    if isinstance(result, dict):
+        out['rows'] = result.get('total_lines_including_header', 0) - 1
+        out['result'] = result
+    else:
+        out['rows'] = result
+    return out
+
+# ----------------------------- CLI ----------------------------------------------------
+
+def run_load(inputs: List[tuple], repeat: int) -> Dict[str, Any]:
+    results = []
+    for fp, yr in inputs:
+        size_mb = inv.file_size_mb(fp)
+        legacy = time_call(legacy_load, fp, repeat)
+        fused = time_call(fused_load, fp, repeat)
+        results.append({'year': yr, 'file': fp, 'file_size_mb': size_mb, 'legacy': legacy, 'fused': fused})
+        print(f"{yr}: {size_mb:>8.2f} MB | legacy {legacy['seconds']:>7.2f}s | fused {fused['seconds']:>7.2f}s")
+
+    legacy_total = sum(r['legacy']['seconds'] for r in results)
+    fused_total = sum(r['fused']['seconds'] for r in results)
+    summary = {
+        'legacy_seconds': round(legacy_total, 3),
+        'fused_seconds': round(fused_total, 3),
+        'saving_pct': round(100 * (1 - fused_total / legacy_total), 1) if legacy_total else 0.0,
+    }
+    if all(r['legacy']['bytes_read'] and r['fused']['bytes_read'] for r in results):
+        summary['legacy_mb_read'] = round(sum(r['legacy']['bytes_read'] for r in results) / 2**20, 1)
+        summary['fused_mb_read'] = round(sum(r['fused']['bytes_read'] for r in results) / 2**20, 1)
+    print(f"\n{len(results)}-year run: legacy {summary['legacy_seconds']}s → fused {summary['fused_seconds']}s "
+          f"({summary['saving_pct']}% less wall time)")
+    if 'legacy_mb_read' in summary:
+        print(f"Bytes read: legacy {summary['legacy_mb_read']} MB → fused {summary['fused_mb_read']} MB")
+    return {'per_year': results, 'summary': summary}
+
+def run_scan(inputs: List[tuple], repeat: int) -> Dict[str, Any]:
+    engines = [('csv', scan_with('csv')), ('mmap', scan_with('mmap'))]
+    results = []
+    for fp, yr in inputs:
+        timings = {name: time_call(fn, fp, repeat) for name, fn in engines}
+        reference = json.dumps(timings['csv'].pop('result'))
+        identical = True
+        for name, t in timings.items():
+            if 'result' in t:
+                identical &= json.dumps(t.pop('result')) == reference
+        results.append({'year': yr, 'file': fp, 'file_size_mb': inv.file_size_mb(fp),
+                        'identical': identical, **timings})
+        line = " | ".join(f"{name} {t['seconds']:>6.2f}s" for name, t in timings.items())
+        print(f"{yr}: {results[-1]['file_size_mb']:>8.2f} MB | {line} | identical: {'✅' if identical else '❌'}")
+
+    totals = {name: round(sum(r[name]['seconds'] for r in results), 3) for name, _ in engines}
+    summary = {'seconds': totals, 'identical': all(r['identical'] for r in results)}
+    speedups = ", ".join(f"{name} {totals['csv'] / totals[name]:.1f}x"
+                         for name, _ in engines[1:] if totals[name])
+    print(f"\nStructural scan: csv {totals['csv']}s → {speedups} (results identical: {summary['identical']})")
+    return {'per_year': results, 'summary': summary}
+
+def run_profile(inputs: List[tuple], repeat: int) -> Dict[str, Any]:
+    results = []
+    for fp, yr in inputs:
+        df, _ = inv.load_with_scan(fp, inv.pick_encoding(fp))
+        timings = {}
+        flags = {}
+        for name, fn in (('per_column', legacy_flags), ('batched', batched_flags)):
+            best = None
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                flags[name] = fn(df)
+                elapsed = time.perf_counter() - t0
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = {'seconds': round(best, 3)}
+        identical = flags['per_column'] == flags['batched']
+        mismatched = distinct_mismatches(df, chunksize=max(1, len(df) // 7))
+        results.append({'year': yr, 'file': fp, 'rows': len(df), 'columns': df.shape[1],
+                        'identical': identical, 'distinct_mismatches': mismatched, **timings})
+        print(f"{yr}: {len(df):>8,} rows × {df.shape[1]:>3} cols | per-column {timings['per_column']['seconds']:>6.2f}s "
+              f"| batched {timings['batched']['seconds']:>6.2f}s | identical: {'✅' if identical else '❌'} "
+              f"| chunked distinct: {'✅' if not mismatched else '❌ ' + ', '.join(mismatched[:5])}")
+
+    totals = {name: round(sum(r[name]['seconds'] for r in results), 3) for name in ('per_column', 'batched')}
+    summary = {'seconds': totals, 'identical': all(r['identical'] for r in results),
+               'distinct_agree': not any(r['distinct_mismatches'] for r in results)}
+    speedup = totals['per_column'] / totals['batched'] if totals['batched'] else 0.0
+    print(f"\nType sniffing: per-column {totals['per_column']}s → batched {totals['batched']}s "
+          f"({speedup:.1f}x, flags identical: {summary['identical']}, "
+          f"chunked distinct estimates agree: {summary['distinct_agree']})")
+    return {'per_year': results, 'summary': summary}
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark Pass-1 inventory load paths")
+    p.add_argument('--csv2023', type=str, default='stackoverflow_2023.csv', help='Path to 2023 CSV')
+    p.add_argument('--csv2024', type=str, default='stackoverflow_2024.csv', help='Path to 2024 CSV')
+    p.add_argument('--csv2025', type=str, default='stackoverflow_2025.csv', help='Path to 2025 CSV')
+    p.add_argument('--synthetic-rows', type=int, default=None, help='Generate synthetic CSVs with this many rows')
+    p.add_argument('--synthetic-cols', type=int, default=120, help='Column count for synthetic CSVs')
+    p.add_argument('--repeat', type=int, default=1, help='Repetitions per path (best time kept)')
+    p.add_argument('--suite', choices=['load', 'scan', 'profile', 'all'], default='all', help='Which comparison(s) to run')
+    p.add_argument('--json', type=str, default=None, help='Optional path to write results as JSON')
+    return p.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args()
+    inputs = [(args.csv2023, 2023), (args.csv2024, 2024), (args.csv2025, 2025)]
+    tmp = None
+    if args.synthetic_rows or not all(Path(fp).exists() for fp, _ in inputs):
+        tmp = tempfile.TemporaryDirectory(prefix='inventory_bench_')
+        rows = args.synthetic_rows or 50000
+        print(f"Generating synthetic survey CSVs ({rows:,} rows × {args.synthetic_cols} cols) in {tmp.name}")
+        inputs = []
+        for i, yr in enumerate((2023, 2024, 2025)):
+            fp = Path(tmp.name) / f'stackoverflow_{yr}.csv'
+            make_synthetic_csv(fp, rows, args.synthetic_cols, seed=yr)
+            inputs.append((str(fp), yr))
+    out = {}
+    if args.suite in ('load', 'all'):
+        print("\n=== Load: legacy two-read vs fused single-read ===")
+        out['load'] = run_load(inputs, args.repeat)
+    if args.suite in ('scan', 'all'):
+        print("\n=== Structural scan: csv.reader vs byte-level mmap ===")
+        out['scan'] = run_scan(inputs, args.repeat)
+    if args.suite in ('profile', 'all'):
+        print("\n=== Type sniffing: per-column vs batched ===")
+        out['profile'] = run_profile(inputs, args.repeat)
+    if args.json:
+        Path(args.json).write_text(json.dumps(out, indent=2), encoding='utf-8')
+        print(f"✅ Written: {args.json}")
+    if tmp is not None:
+        tmp.cleanup()
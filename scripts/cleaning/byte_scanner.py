@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Byte-level structural scanner for the Pass-1 inventory
+
+Counts fields per CSV record straight from a memory-mapped file with numpy
+(delimiter / newline / quote positions + quote parity) instead of feeding every
+row through ``csv.reader``. Results are identical to the csv-module scan in
+``structural_scan``: same field-count histogram (same key order), same offending
+examples, same record-based line numbers. It only runs when pandas cannot load a
+file (the normal path gets its structure from ``load_with_scan``); on survey-shaped
+CSVs it is about 1.3x ``csv.reader`` at ~100 MB and no faster on small files.
+
+Exactness rules (default csv dialect: ',' delimiter, '"' quote, doublequote):
+  - a quote opens a quoted field only at the start of a field, and a closing quote
+    must be followed by a delimiter, newline, EOF or a second quote ("" escape);
+  - any quote that breaks those rules (e.g. ``5'11"`` or ``"a"b``) is a *violation*:
+    the window containing it is handed to ``csv.reader`` from the enclosing
+    record's first byte, so odd quoting costs what it costs today and no more.
+"""
+
+from __future__ import annotations
+import csv, io, mmap, os, re
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+QUOTE, COMMA, CR, LF = 0x22, 0x2C, 0x0D, 0x0A
+SCAN_WINDOW = 4 << 20            # bytes analyzed per numpy pass
+UTF8_BOM = b'\xef\xbb\xbf'
+
+_LINE_END = re.compile(rb'\r\n|\r|\n')
+_BEFORE_OPEN = np.array([COMMA, CR, LF, QUOTE], dtype=np.uint8)   # valid byte before an opening quote
+_AFTER_CLOSE = np.array([COMMA, CR, LF, QUOTE], dtype=np.uint8)   # valid byte after a closing quote
+
+# ----------------------------- mapping ------------------------------------------------
+
+class MappedFile:
+    """Read-only mmap of a file exposed as a uint8 numpy array (empty files supported)."""
+
+    def __init__(self, file_path: str):
+        self._fh = open(file_path, 'rb')
+        self.size = os.fstat(self._fh.fileno()).st_size
+        self.mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        self.buf = np.frombuffer(self.mm, dtype=np.uint8)
+
+    def __enter__(self) -> 'MappedFile':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.buf = None
+        try:
+            if self.size:
+                self.mm.close()
+        except BufferError:
+            pass  # a numpy view is still alive; the map is released when it is collected
+        self._fh.close()
+
+def data_start(mf: MappedFile, encoding: str) -> int:
+    """First byte the text decoder would hand to csv (skips the BOM for utf-8-sig)."""
+    if _codec(encoding) == 'utf-8-sig' and bytes(mf.mm[:3]) == UTF8_BOM:
+        return 3
+    return 0
+
+def _codec(encoding: str) -> str:
+    return encoding.lower().replace('_', '-')
+
+# ----------------------------- record scanner -----------------------------------------
+
+class RecordScanner:
+    """
+    Scans whole records from a record boundary, accumulating the histogram,
+    offending samples (record index relative to the first scanned record) and
+    the record count.
+    """
+
+    def __init__(self, mf: MappedFile, encoding: str, first_byte: int,
+                 expected_ncols: int | None, sample_offenders: int):
+        self.mf = mf
+        self.buf = mf.buf
+        self.n = mf.size
+        self.first_byte = first_byte
+        # BOM already skipped via first_byte; later records are plain UTF-8
+        self.decode_as = 'utf-8' if _codec(encoding) == 'utf-8-sig' else encoding
+        self.expected_ncols = expected_ncols
+        self.sample_offenders = sample_offenders
+        self.counts: Counter = Counter()
+        self.offenders: List[Tuple[int, int, List[str]]] = []
+        self.n_records = 0
+        self.fallback_windows = 0
+
+    # ---- tallying ----
+    def _tally(self, field_counts: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> None:
+        values, first, freq = np.unique(field_counts, return_index=True, return_counts=True)
+        for i in np.argsort(first, kind='stable'):
+            self.counts[int(values[i])] += int(freq[i])  # first-seen key order, like csv path
+        room = self.sample_offenders - len(self.offenders)
+        if self.expected_ncols and room > 0:
+            for i in np.flatnonzero(field_counts != self.expected_ncols)[:room]:
+                self.offenders.append((self.n_records + int(i), int(field_counts[i]),
+                                       self._preview(int(starts[i]), int(ends[i]))))
+        self.n_records += len(field_counts)
+
+    def _tally_row(self, row: List[str]) -> None:
+        n = len(row)
+        self.counts[n] += 1
+        if self.expected_ncols and n != self.expected_ncols and len(self.offenders) < self.sample_offenders:
+            self.offenders.append((self.n_records, n, row[:5]))
+        self.n_records += 1
+
+    def _preview(self, start: int, end: int) -> List[str]:
+        text = self.mf.mm[start:end].decode(self.decode_as, errors='replace')
+        return next(csv.reader(io.StringIO(text, newline='')), [])[:5]
+
+    # ---- helpers ----
+    def _next_start(self, t: np.ndarray) -> np.ndarray:
+        """Byte after each record terminator (a CR LF pair counts as one terminator)."""
+        after = t + 1
+        crlf = (self.buf[t] == CR) & (after < self.n)
+        crlf[crlf] = self.buf[after[crlf]] == LF
+        return after + crlf
+
+    # ---- scanning ----
+    def scan(self, begin: int, stop: int, window: int = SCAN_WINDOW) -> int:
+        """
+        Scan every record starting at or before ``stop``, beginning at record
+        boundary ``begin``. Returns the offset right after the last scanned record.
+        ``window`` sizes each numpy pass (small spans need not map a full window).
+        """
+        pos, base = begin, window
+        while pos <= stop and pos < self.n:
+            win_end = min(pos + window, self.n)
+            pos, status = self._fast_window(pos, win_end, stop)
+            if status == 'grow':
+                window *= 2   # a single record (multi-line quoted cell) outgrew the window
+                continue
+            window = base
+            if status == 'violation':
+                self.fallback_windows += 1
+                pos = self._csv_window(pos, win_end, stop)
+        return pos
+
+    def _fast_window(self, pos: int, win_end: int, stop: int) -> Tuple[int, str]:
+        buf, n = self.buf, self.n
+        seg = buf[pos:win_end]
+        q = np.flatnonzero(seg == QUOTE)                             # offsets within seg
+        nl = np.flatnonzero((seg == LF) | (seg == CR))
+
+        # quote roles by parity from a record start; find the first rule violation
+        violation = None
+        if len(q):
+            opener, closer = q[0::2] + pos, q[1::2] + pos
+            bad_open = opener[~np.isin(buf[np.maximum(opener - 1, 0)], _BEFORE_OPEN) & (opener != self.first_byte)]
+            nxt = closer + 1
+            bad_close = closer[(nxt < n) & ~np.isin(buf[np.minimum(nxt, n - 1)], _AFTER_CLOSE)]
+            firsts = [x[0] - pos for x in (bad_open, bad_close) if len(x)]
+            violation = min(firsts) if firsts else None
+
+        t = nl[np.searchsorted(q, nl) % 2 == 0]                      # unquoted CR / LF
+        if len(t):
+            lf_after_cr = (seg[t] == LF) & (t > 0)
+            lf_after_cr[lf_after_cr] = seg[t[lf_after_cr] - 1] == CR
+            t = t[~lf_after_cr]
+        if violation is not None:
+            t = t[t < violation]
+
+        if len(t):
+            nexts = self._next_start(t + pos) - pos
+            starts = np.concatenate(([0], nexts[:-1]))
+            k = int(np.searchsorted(starts, stop - pos, side='right'))  # records starting <= stop
+            starts, ends = starts[:k], t[:k]
+        elif violation is not None:
+            return pos, 'violation'
+        elif win_end < n:
+            return pos, 'grow'
+        else:
+            starts, ends = np.array([0]), np.array([len(seg)])       # last record runs to EOF
+
+        # fields = delimiters in the record - delimiters inside its quoted spans + 1;
+        # spans never cross an unquoted terminator (an unclosed one runs to EOF)
+        is_delim = np.zeros(len(seg) + 1, dtype=np.uint8)            # +1: reduceat index may hit EOF
+        np.equal(seg, COMMA, out=is_delim[:-1].view(bool))
+        counts = np.add.reduceat(is_delim, np.append(starts, ends[-1]), dtype=np.int64)[:-1] + 1
+        if len(q):
+            in_span = np.add.reduceat(is_delim, q, dtype=np.int64)[0::2]
+            quoted = np.concatenate(([0], np.cumsum(in_span)))
+            opener = q[0::2]
+            counts -= quoted[np.searchsorted(opener, ends)] - quoted[np.searchsorted(opener, starts)]
+        counts[starts == ends] = 0                                   # blank line -> []
+        self._tally(counts, starts + pos, ends + pos)
+
+        if not len(t):
+            return n, 'ok'
+        new_pos = pos + int(nexts[k - 1])
+        if violation is not None and k == len(t) and new_pos <= stop:
+            return new_pos, 'violation'
+        return new_pos, 'ok'
+
+    def _csv_window(self, pos: int, win_end: int, stop: int) -> int:
+        """csv.reader from record boundary ``pos`` until past ``win_end`` (or ``stop``)."""
+        offset = [pos]
+
+        def lines():
+            at = offset[0]
+            while at < self.n:
+                m = _LINE_END.search(self.mf.mm, at)
+                end = m.end() if m else self.n
+                offset[0] = end
+                yield self.mf.mm[at:end].decode(self.decode_as, errors='replace')
+                at = end
+
+        reader = csv.reader(lines())
+        while pos <= stop and pos < self.n and pos < win_end:
+            row = next(reader, None)
+            if row is None:
+                break
+            self._tally_row(row)
+            pos = offset[0]
+        return pos
+
+# ----------------------------- resync -------------------------------------------------
+
+def resync(mf: MappedFile, pos: int, inside: bool, window: int = SCAN_WINDOW,
+           limit: int | None = None) -> int | None:
+    """
+    First record start after ``pos`` given a (guessed) quote state at ``pos``. With
+    ``limit``, only the next ``limit`` bytes are searched: None if no boundary is there.
+    """
+    buf, n = mf.buf, mf.size
+    stop = n if limit is None else min(pos + limit, n)
+    while pos < stop:
+        win_end = min(pos + window, stop)
+        seg = buf[pos:win_end]
+        q = np.flatnonzero(seg == QUOTE)
+        nl = np.flatnonzero((seg == LF) | (seg == CR))
+        unquoted = nl[(np.searchsorted(q, nl) + inside) % 2 == 0]
+        if len(unquoted):
+            t = pos + int(unquoted[0])
+            return t + 2 if buf[t] == CR and t + 1 < n and buf[t + 1] == LF else t + 1
+        inside = bool((inside + len(q)) % 2)
+        pos = win_end
+    return n if stop == n else None
+
+# ----------------------------- entry point --------------------------------------------
+
+def byte_structural_scan(file_path: str, encoding: str, expected_ncols: int | None = None,
+                         sample_offenders: int = 5) -> Dict[str, Any]:
+    """
+    Field-count scan equivalent to the csv-module loop in ``structural_scan``.
+    Returns expected_ncols, histogram (Counter), offending_examples and
+    total_lines_including_header, plus ``fallback_windows`` (csv.reader windows used).
+    """
+    with MappedFile(file_path) as mf:
+        first = data_start(mf, encoding)
+        n = mf.size
+        header = RecordScanner(mf, encoding, first, None, 0)
+        body = header.scan(first, first) if first < n else n
+        if expected_ncols is None and header.n_records:
+            expected_ncols = next(iter(header.counts))
+        scanner = RecordScanner(mf, encoding, first, expected_ncols, sample_offenders)
+        scanner.scan(body, n)
+
+    seen = header.n_records
+    offenders = [{'line_number': seen + idx + 1, 'field_count': n_fields, 'preview': preview}
+                 for idx, n_fields, preview in scanner.offenders[:sample_offenders]]
+    return {
+        'expected_ncols': expected_ncols,
+        'field_count_histogram': scanner.counts,
+        'offending_examples': offenders,
+        'total_lines_including_header': seen + scanner.n_records,
+        'fallback_windows': header.fallback_windows + scanner.fallback_windows,
+    }
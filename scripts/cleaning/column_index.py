@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Column availability across any number of survey datasets, as bitmasks
+
+``ColumnIndex`` gives every dataset (survey year) a bit, in sorted order, and every
+column the mask of the datasets it appears in:
+
+  2023 -> bit 0, 2024 -> bit 1, 2025 -> bit 2
+  'Age'          0b111   (all three)
+  'AISelect'     0b011   (2023, 2024)
+  'AIAgents'     0b100   (2025 only)
+
+Any powerset query is a test on masks: "exactly these years" is ``mask == m``,
+"in all of these" ``mask & m == m``, "in at least k" ``popcount(mask) >= k``.
+``groups`` partitions the columns by mask in one pass; every query then looks at
+the distinct masks (a handful) instead of intersecting per-year sets, so a 2026
+survey is one more entry in the input, not another hand-written set expression.
+Standard library only.
+"""
+
+from __future__ import annotations
+from itertools import combinations
+from typing import Callable, Dict, Iterable, List, Mapping, Set, Tuple
+
+class ColumnIndex:
+    """Each column's presence across ``datasets`` as a bitmask (bit i = i-th dataset, sorted)."""
+
+    def __init__(self, columns_by_dataset: Mapping[int, Iterable[str]]):
+        self.datasets: List[int] = sorted(columns_by_dataset)
+        self._bit = {d: 1 << i for i, d in enumerate(self.datasets)}
+        self.masks: Dict[str, int] = {}
+        for d in self.datasets:
+            bit = self._bit[d]
+            for col in columns_by_dataset[d]:
+                self.masks[col] = self.masks.get(col, 0) | bit
+        self._groups: Dict[int, Set[str]] | None = None
+
+    @property
+    def full(self) -> int:
+        """Mask of every dataset."""
+        return (1 << len(self.datasets)) - 1
+
+    def mask(self, datasets: Iterable[int]) -> int:
+        """Mask of ``datasets`` (each must be indexed)."""
+        out = 0
+        for d in datasets:
+            if d not in self._bit:
+                raise KeyError(f"Dataset {d} is not in the index ({self.datasets})")
+            out |= self._bit[d]
+        return out
+
+    def datasets_of(self, mask: int) -> List[int]:
+        return [d for d in self.datasets if mask & self._bit[d]]
+
+    def presence(self, column: str) -> List[int]:
+        """Datasets containing ``column`` (empty if none)."""
+        return self.datasets_of(self.masks.get(column, 0))
+
+    def groups(self) -> Dict[int, Set[str]]:
+        """{mask: columns with exactly that availability}, built once in a single pass."""
+        if self._groups is None:
+            groups: Dict[int, Set[str]] = {}
+            for col, m in self.masks.items():
+                groups.setdefault(m, set()).add(col)
+            self._groups = groups
+        return self._groups
+
+    def select(self, test: Callable[[int], bool]) -> Set[str]:
+        """Columns whose mask passes ``test``: the general powerset query."""
+        out: Set[str] = set()
+        for m, cols in self.groups().items():
+            if test(m):
+                out |= cols
+        return out
+
+    def exactly(self, datasets: Iterable[int]) -> Set[str]:
+        """Columns present in these datasets and no others."""
+        return set(self.groups().get(self.mask(datasets), ()))
+
+    def all_of(self, datasets: Iterable[int]) -> Set[str]:
+        """Columns present in every one of these datasets (others allowed)."""
+        want = self.mask(datasets)
+        return self.select(lambda m: m & want == want)
+
+    def any_of(self, datasets: Iterable[int]) -> Set[str]:
+        want = self.mask(datasets)
+        return self.select(lambda m: m & want != 0)
+
+    def at_least(self, k: int) -> Set[str]:
+        """Columns present in at least ``k`` datasets."""
+        return self.select(lambda m: bin(m).count('1') >= k)
+
+    def only(self, dataset: int) -> Set[str]:
+        return self.exactly([dataset])
+
+    def union(self) -> Set[str]:
+        return set(self.masks)
+
+    def intersections(self) -> Dict[str, Set[str]]:
+        """
+        The named sets the reports use, for however many datasets are indexed:
+          all_years                 in every dataset
+          union_all                 in any dataset
+          '{a}_{b}[_{c}...]'        in all of a, b, ... (every subset of 2+ datasets)
+          only_{a}                  in a and no other
+          '{a}_{b}_not_{c}[_{d}]'   in exactly a, b, ... (proper subsets of 2+)
+        """
+        out = {'all_years': self.all_of(self.datasets), 'union_all': self.union()}
+        for size in range(2, len(self.datasets) + 1):
+            for subset in combinations(self.datasets, size):
+                out['_'.join(map(str, subset))] = self.all_of(subset)
+        for d in self.datasets:
+            out[f'only_{d}'] = self.only(d)
+        for size in range(2, len(self.datasets)):
+            for subset in combinations(self.datasets, size):
+                rest = [d for d in self.datasets if d not in subset]
+                out[f"{'_'.join(map(str, subset))}_not_{'_'.join(map(str, rest))}"] = self.exactly(subset)
+        return out
+
+    def pairs(self) -> List[Tuple[int, int]]:
+        """Every pair of datasets, in order."""
+        return list(combinations(self.datasets, 2))
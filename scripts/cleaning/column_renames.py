@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Rename candidates between survey years, from a character n-gram index
+
+A column renamed between surveys (``NEWCollabToolsHaveWorkedWith`` in 2024,
+``DevEnvsHaveWorkedWith`` in 2025) otherwise shows up as one column that ends and
+another that starts, and the longitudinal series is lost. ``suggest_renames`` pairs
+them up for each pair of consecutive years (a, b):
+
+  - ending columns: last seen in a; starting columns: first seen in b (``ColumnIndex``)
+  - ``NgramIndex`` maps each character trigram of the starting names to the names
+    containing it, so an ending name only meets the starting names it shares a
+    trigram with; the shared counts give the Dice similarity without comparing
+    every pair
+  - candidates with name similarity >= ``NAME_MIN`` are scored on their profiles too:
+    null rate (1 - |difference| in percentage points / 100) and top-k overlap (Jaccard
+    of the sketches' top values, multi-select answers split into options; the stored
+    examples when there is no sketch)
+  - score = ``NAME_WEIGHT`` x name + the rest x profile; pairs are matched one to one,
+    best score first, and those >= ``SUGGEST_MIN`` are suggested
+
+Suggestions at or above ``APPLY_MIN`` are marked ``"apply": true``, except numbered
+siblings (``Knowledge_1`` -> ``Knowledge_2``: names that differ only in a trailing
+number), which score high but are usually different questions of one block; they are
+flagged ``"numbered_sibling": true`` and left for the reviewer. After review, the
+same file (``load_renames``) maps each old name to the latest one (``apply_renames``)
+before the intersections are computed. Standard library only.
+"""
+
+from __future__ import annotations
+import json, re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Set, Tuple
+
+from column_index import ColumnIndex
+
+NGRAM = 3
+NAME_MIN = 0.3        # Dice similarity of the names before profiles are compared
+NAME_WEIGHT = 0.5     # share of the score from the names; the rest from the profiles
+SUGGEST_MIN = 0.5     # lowest score written to the suggestions
+APPLY_MIN = 0.7       # suggestions at or above this are marked "apply": true (not numbered siblings)
+ALTERNATIVES = 3      # runner-up targets listed per suggestion, for review
+RENAMES_VERSION = 1
+_MISSING_VALUES = frozenset(['', 'nan', 'none', 'na', 'n/a'])
+_NUMBER_SUFFIX = re.compile(r'[\s_-]*\d+$')
+
+def ngrams(name: str, n: int = NGRAM) -> Set[str]:
+    """Character n-grams of the lower-cased name, punctuation dropped, ends marked."""
+    text = '^' + re.sub(r'[^0-9a-z]+', '', name.lower()) + '$'
+    return {text[i:i + n] for i in range(max(len(text) - n + 1, 1))}
+
+def numbered_siblings(a: str, b: str) -> bool:
+    """True when ``a`` and ``b`` differ only in a trailing number (``Knowledge_1`` / ``Knowledge_2``)."""
+    if a == b or not (_NUMBER_SUFFIX.search(a) or _NUMBER_SUFFIX.search(b)):
+        return False
+    return _NUMBER_SUFFIX.sub('', a).lower() == _NUMBER_SUFFIX.sub('', b).lower()
+
+class NgramIndex:
+    """Inverted index n-gram -> names, for Dice similarity lookups against ``names``."""
+
+    def __init__(self, names: Iterable[str], n: int = NGRAM):
+        self.n = n
+        self.grams: Dict[str, Set[str]] = {name: ngrams(name, n) for name in names}
+        self.postings: Dict[str, List[str]] = {}
+        for name, grams in self.grams.items():
+            for g in grams:
+                self.postings.setdefault(g, []).append(name)
+
+    def similar(self, name: str, min_similarity: float = NAME_MIN) -> List[Tuple[str, float]]:
+        """(indexed name, Dice similarity) for names sharing an n-gram with ``name``, best first."""
+        grams = ngrams(name, self.n)
+        shared: Dict[str, int] = {}
+        for g in grams:
+            for other in self.postings.get(g, ()):
+                shared[other] = shared.get(other, 0) + 1
+        out = []
+        for other, count in shared.items():
+            dice = 2 * count / (len(grams) + len(self.grams[other]))
+            if dice >= min_similarity:
+                out.append((other, dice))
+        return sorted(out, key=lambda kv: (-kv[1], kv[0]))
+
+# ----------------------------- profiles -----------------------------------------------
+
+def value_set(info: Mapping[str, Any], sketch: Mapping[str, Any] | None = None) -> Set[str]:
+    """Tracked values of a column: the sketch's top-k, else its examples (options split)."""
+    if sketch and sketch.get('top_k'):
+        values = [str(item[0]) for item in sketch['top_k'].get('items', [])]
+    else:
+        values = [str(v) for v in info.get('examples') or []]
+    out = set()
+    for v in values:
+        for part in (v.split(';') if info.get('is_multiselect') or ';' in v else [v]):
+            part = part.strip()
+            if part.lower() not in _MISSING_VALUES:
+                out.add(part)
+    return out
+
+def profile_similarity(a: Mapping[str, Any], b: Mapping[str, Any],
+                       a_values: Set[str], b_values: Set[str]) -> Tuple[float, float | None]:
+    """(profile similarity in [0, 1], top-k overlap or None when either side has no values)."""
+    null_sim = 1.0 - min(abs(float(a.get('null_pct') or 0) - float(b.get('null_pct') or 0)) / 100.0, 1.0)
+    if not a_values or not b_values:
+        return null_sim, None
+    overlap = len(a_values & b_values) / len(a_values | b_values)
+    return (null_sim + overlap) / 2, overlap
+
+# ----------------------------- suggestions --------------------------------------------
+
+def _pair_candidates(ending: Set[str], starting: Set[str],
+                     a_cols: Mapping[str, Dict], b_cols: Mapping[str, Dict],
+                     a_sketches: Mapping[str, Any], b_sketches: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    index = NgramIndex(starting)
+    b_values: Dict[str, Set[str]] = {}
+    scored = []
+    for old in sorted(ending):
+        old_values = value_set(a_cols.get(old, {}), a_sketches.get(old))
+        for new, name_sim in index.similar(old):
+            if new not in b_values:
+                b_values[new] = value_set(b_cols.get(new, {}), b_sketches.get(new))
+            profile, overlap = profile_similarity(a_cols.get(old, {}), b_cols.get(new, {}),
+                                                  old_values, b_values[new])
+            scored.append({'from': old, 'to': new,
+                           'score': round(NAME_WEIGHT * name_sim + (1 - NAME_WEIGHT) * profile, 4),
+                           'name_similarity': round(name_sim, 4),
+                           'profile_similarity': round(profile, 4),
+                           'top_k_overlap': None if overlap is None else round(overlap, 4),
+                           'null_pct': [a_cols.get(old, {}).get('null_pct'), b_cols.get(new, {}).get('null_pct')]})
+    return sorted(scored, key=lambda s: (-s['score'], s['from'], s['to']))
+
+def suggest_renames(columns_by_year: Mapping[int, Mapping[str, Dict]],
+                    sketches_by_year: Mapping[int, Mapping[str, Any]] | None = None) -> List[Dict[str, Any]]:
+    """
+    Suggested renames between consecutive years of ``columns_by_year`` ({year: {column:
+    stats with null_pct / examples / is_multiselect}}), best first within each pair.
+    ``sketches_by_year``: the Pass-1 sketches (``profile_drift.load_year_sketches``), optional.
+    """
+    sketches_by_year = sketches_by_year or {}
+    index = ColumnIndex({year: cols.keys() for year, cols in columns_by_year.items()})
+    years = index.datasets
+    out = []
+    for i, (a, b) in enumerate(zip(years, years[1:])):
+        bit_a, later = index.mask([a]), index.mask(years[i + 1:])
+        bit_b, earlier = index.mask([b]), index.mask(years[:i + 1])
+        ending = index.select(lambda m: m & bit_a and not m & later)
+        starting = index.select(lambda m: m & bit_b and not m & earlier)
+        scored = _pair_candidates(ending, starting, columns_by_year[a], columns_by_year[b],
+                                  sketches_by_year.get(a, {}), sketches_by_year.get(b, {}))
+        taken_old, taken_new = set(), set()
+        for s in scored:
+            if s['score'] < SUGGEST_MIN:
+                break
+            if s['from'] in taken_old or s['to'] in taken_new:
+                continue
+            taken_old.add(s['from'])
+            taken_new.add(s['to'])
+            alternatives = [[t['to'], t['score']] for t in scored
+                            if t['from'] == s['from'] and t['to'] != s['to']][:ALTERNATIVES]
+            sibling = numbered_siblings(s['from'], s['to'])
+            out.append({'from_year': a, 'to_year': b, **s,
+                        'apply': s['score'] >= APPLY_MIN and not sibling,
+                        'numbered_sibling': sibling, 'alternatives': alternatives})
+    return out
+
+def write_suggestions(path: Path, suggestions: List[Dict[str, Any]], years: List[int]) -> None:
+    """The suggestions as a renames file: review, set "apply", then pass it to ``load_renames``."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': RENAMES_VERSION, 'years': sorted(years), 'renames': suggestions},
+                  f, indent=2, ensure_ascii=False)
+
+# ----------------------------- applying -----------------------------------------------
+
+def load_renames(path: Path) -> Dict[str, str]:
+    """{old name: latest name} for the entries marked "apply", chains followed to their end."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    step = {r['from']: r['to'] for r in data.get('renames', []) if r.get('apply')}
+    out = {}
+    for old in step:
+        name, seen = old, {old}
+        while name in step and step[name] not in seen:
+            name = step[name]
+            seen.add(name)
+        out[old] = name
+    return out
+
+def apply_renames(columns_by_year: Mapping[int, Any], renames: Mapping[str, str]) -> Dict[int, Any]:
+    """
+    ``columns_by_year`` ({year: {column: info}} or {year: set of columns}) under the
+    latest names. A rename whose target already exists in a year is skipped there.
+    """
+    out = {}
+    for year, cols in columns_by_year.items():
+        def target(col: str) -> str:
+            new = renames.get(col, col)
+            return col if new != col and new in cols else new
+        if isinstance(cols, Mapping):
+            out[year] = {target(col): info for col, info in cols.items()}
+        else:
+            out[year] = {target(col) for col in cols}
+    return out
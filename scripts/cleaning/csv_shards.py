@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Sharded, compressed cleaned CSVs and their manifest
+
+With ``--shard-rows`` / ``--shard-mb`` / ``--compress`` the cleaner splits a year into
+shards named ``{year}_stackoverflow_cleaned-00000.csv[.gz|.zst]``, each a complete
+cleaned CSV (header row included), so loaders can read them concurrently:
+
+  - the cleaner writes each shard uncompressed; ``finish_shard`` (run in a worker
+    process while the next shard is being cleaned) compresses it and checksums the
+    stored file;
+  - ``write_manifest`` records the shards in ``{year}_stackoverflow_manifest.json``:
+    file, rows, stored bytes, CSV bytes and SHA-256 per shard, plus the totals.
+
+gzip is what ``bq load`` accepts for CSV; zstd (via pyarrow) is smaller and faster for
+other readers. Only the standard library is imported up front, so worker processes
+start quickly.
+"""
+
+from __future__ import annotations
+import gzip, hashlib, json, os, shutil
+from pathlib import Path
+from typing import Dict, Any, List, BinaryIO
+
+from pipeline_trace import stage
+
+SHARD_COMPRESSIONS = ('none', 'gzip', 'zstd')
+SHARD_SUFFIXES = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+MANIFEST_VERSION = 1
+GZIP_LEVEL = 6
+_COPY_BYTES = 1 << 20
+
+def shard_name(year: int, index: int, compression: str) -> str:
+    return f"{year}_stackoverflow_cleaned-{index:05d}.csv{SHARD_SUFFIXES[compression]}"
+
+def shard_pattern(year: int, compression: str) -> str:
+    """Wildcard matching every shard of ``year`` (for ``bq load`` from Cloud Storage)."""
+    return f"{year}_stackoverflow_cleaned-*.csv{SHARD_SUFFIXES[compression]}"
+
+def manifest_name(year: int) -> str:
+    return f"{year}_stackoverflow_manifest.json"
+
+def remove_shards(output_dir: Path, year: int) -> List[Path]:
+    """Delete ``year``'s shards (any compression) and manifest from ``output_dir``; returns what was removed."""
+    removed = sorted(Path(output_dir).glob(f"{year}_stackoverflow_cleaned-*.csv*"))
+    manifest = Path(output_dir) / manifest_name(year)
+    if manifest.exists():
+        removed.append(manifest)
+    for path in removed:
+        path.unlink()
+    return removed
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("zstd shards require pyarrow") from None
+    return pyarrow
+
+def check_compression(compression: str) -> None:
+    """Raise if ``compression`` is unknown or its codec is unavailable here."""
+    if compression not in SHARD_COMPRESSIONS:
+        raise ValueError(f"Unknown shard compression: {compression}")
+    if compression == 'zstd':
+        _pyarrow()
+
+def open_shard(path: Path, compression: str) -> BinaryIO:
+    """The shard's CSV bytes, decompressed while read."""
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    if compression == 'zstd':
+        return _pyarrow().input_stream(str(path), compression='zstd')
+    return open(path, 'rb')
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_COPY_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def finish_shard(csv_path: str, shard_path: str, compression: str, rows: int) -> Dict[str, Any]:
+    """
+    Compress the uncompressed shard ``csv_path`` to ``shard_path`` (or move it there
+    for 'none'), delete the input and return its manifest entry.
+    """
+    csv_path, shard_path = Path(csv_path), Path(shard_path)
+    csv_bytes = csv_path.stat().st_size
+    with stage('finish_shard', rows=rows, nbytes=csv_bytes, file=shard_path.name, compression=compression):
+        if compression == 'none':
+            os.replace(csv_path, shard_path)
+        else:
+            if compression == 'gzip':
+                sink = gzip.GzipFile(shard_path, 'wb', compresslevel=GZIP_LEVEL, mtime=0)  # mtime=0: reproducible bytes
+            else:
+                sink = _pyarrow().output_stream(str(shard_path), compression='zstd')
+            with open(csv_path, 'rb') as src, sink:
+                shutil.copyfileobj(src, sink, _COPY_BYTES)
+            csv_path.unlink()
+        return {'file': shard_path.name, 'rows': rows, 'bytes': shard_path.stat().st_size,
+                'csv_bytes': csv_bytes, 'sha256': file_sha256(shard_path)}
+
+def write_manifest(path: Path, year: int, columns: List[str], compression: str,
+                   shards: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Write the manifest for ``shards`` (entries from ``finish_shard``, in order) and return it."""
+    manifest = {
+        'manifest_version': MANIFEST_VERSION,
+        'year': year,
+        'format': 'csv',
+        'compression': compression,
+        'header_rows': 1,  # every shard starts with the header row
+        'schema': f"{year}_stackoverflow_bq_schema.json",
+        'columns': list(columns),
+        'total_rows': sum(s['rows'] for s in shards),
+        'total_bytes': sum(s['bytes'] for s in shards),
+        'shards': shards,
+    }
+    partial = path.with_name(path.name + '.partial')
+    with open(partial, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(partial, path)
+    return manifest
@@ -6,6 +6,16 @@ Outputs (under --outdir, default: docs/):
   - data_dictionary.json  : full per-dataset report (integrity + columns)
   - column_mapping.md     : presence matrix ✅/❌ (per-year)
   - relevant_columns.md   : minimal, curated business buckets scaffold
+  - profile_sketches_{year}.json : mergeable HLL / top-k / KLL quantile / moment sketches (compact JSON)
+  - multiselect_stats_{year}.json : per-option counts + co-occurrence top-k for ';' columns
+  - profile_store.sqlite  : columnar copy (datasets / columns×years) for projected reads
+
+--trace PATH appends per-stage timings, throughput and memory as JSON lines
+(``pipeline_trace``).
+
+--quick profiles a seeded sample of random byte blocks instead of the whole file;
+every count in that report is an estimate ('estimated': true): rows and null shares
+with 95% intervals, distinct counts with [seen, upper-bound] bounds.
 
 Design goals:
   - Robust to structural corruption (per-row field count scan)
@@ -14,67 +24,87 @@ Design goals:
 """
 
 from __future__ import annotations
-import argparse, csv, json, re, sys, time
+import argparse, csv, hashlib, json, os, re, sys, time
+from functools import lru_cache
 from pathlib import Path
 from collections import Counter
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+import numpy as np
 import pandas as pd
 
+from profile_sketches import HyperLogLog, SpaceSaving, KLLSketch, Moments, describe_numeric, TOPK_SKETCH_CAPACITY
+from profile_store import PROFILE_STORE_NAME, write_profile_store
+from column_index import ColumnIndex
+from multiselect_stats import OptionStats, profile_multiselect, update_option_stats
+from byte_scanner import byte_structural_scan
+from quick_profile import (QUICK_SAMPLE_ROWS, sample_records, sample_frame, estimate_rows,
+                           estimate_null_share, estimate_distinct)
+from encoding_detect import ENCODINGS_TO_TRY, detect_encoding, encoding_candidates
+from pipeline_trace import enable_trace, stage
+
+SCAN_ENGINES = ('mmap', 'csv')  # byte-level numpy scanner / csv.reader reference path
+
 # ----------------------------- helpers ------------------------------------------------
 
-def structural_scan(file_path: str, expected_ncols: int | None = None, sample_offenders: int = 5) -> Dict[str, Any]:
+def _raise_csv_field_limit() -> None:
+    # bump field size limit to tolerate very long cells (e.g., 2025 corruption)
+    try:
+        csv.field_size_limit(min(2**31 - 1, getattr(sys, "maxsize", 2**31 - 1)))
+    except Exception:
+        pass
+
+def pick_encoding(file_path: str) -> str:
+    """Encoding decision from sampled head/tail/interior blocks (see ``encoding_detect``)."""
+    try:
+        return detect_encoding(file_path)['encoding']
+    except OSError:
+        return 'utf-8'  # fallback
+
+def structural_scan(file_path: str, expected_ncols: int | None = None, sample_offenders: int = 5,
+                    engine: str = 'mmap') -> Dict[str, Any]:
     """
     Count fields per line to detect mismatched column counts (true structural corruption).
     Returns dict with field-count histogram and sample offending lines.
     Never raises; returns an 'error' key if scanning fails.
+
+    engine='mmap' counts fields from a memory-mapped copy of the file with numpy
+    (``byte_scanner``); engine='csv' runs ``csv.reader`` row by row. Both return identical results.
     """
     counts = Counter()
     offenders = []
     header = None
     total_lines = 0
 
-    # bump field size limit to tolerate very long cells (e.g., 2025 corruption)
-    try:
-        import sys as _sys
-        csv.field_size_limit(min(2**31 - 1, getattr(_sys, "maxsize", 2**31 - 1)))
-    except Exception:
-        pass
+    _raise_csv_field_limit()
 
     try:
         # Try different encodings to handle BOM and other encoding issues
-        encodings_to_try = ['utf-8-sig', 'utf-8', 'latin-1', 'cp1252']
-        successful_encoding = None
-
-        for encoding in encodings_to_try:
-            try:
-                with open(file_path, 'r', encoding=encoding, errors='replace', newline='') as f:
-                    # Test by reading just the first line
-                    first_line = f.readline()
-                    if first_line.strip():  # If we can read something meaningful
-                        successful_encoding = encoding
-                        break
-            except Exception:
-                continue
+        successful_encoding = pick_encoding(file_path)
 
-        if not successful_encoding:
-            successful_encoding = 'utf-8'  # fallback
-
-        with open(file_path, 'r', encoding=successful_encoding, errors='replace', newline='') as f:
-            reader = csv.reader(f)
-            for i, row in enumerate(reader):
-                total_lines += 1
-                if i == 0:
-                    header = row
-                    # Clean up potential BOM from header fields
-                    if header and header[0].startswith('\ufeff'):
-                        header[0] = header[0].lstrip('\ufeff')
-                    if expected_ncols is None and header is not None:
-                        expected_ncols = len(header)
-                    continue
-                n = len(row)
-                counts[n] += 1
-                if expected_ncols and n != expected_ncols and len(offenders) < sample_offenders:
-                    offenders.append({'line_number': i+1, 'field_count': n, 'preview': row[:5]})
+        if engine == 'mmap':
+            res = byte_structural_scan(file_path, successful_encoding, expected_ncols=expected_ncols,
+                                       sample_offenders=sample_offenders)
+            expected_ncols = res['expected_ncols']
+            counts = res['field_count_histogram']
+            offenders = res['offending_examples']
+            total_lines = res['total_lines_including_header']
+        else:
+            with open(file_path, 'r', encoding=successful_encoding, errors='replace', newline='') as f:
+                reader = csv.reader(f)
+                for i, row in enumerate(reader):
+                    total_lines += 1
+                    if i == 0:
+                        header = row
+                        # Clean up potential BOM from header fields
+                        if header and header[0].startswith('\ufeff'):
+                            header[0] = header[0].lstrip('\ufeff')
+                        if expected_ncols is None and header is not None:
+                            expected_ncols = len(header)
+                        continue
+                    n = len(row)
+                    counts[n] += 1
+                    if expected_ncols and n != expected_ncols and len(offenders) < sample_offenders:
+                        offenders.append({'line_number': i+1, 'field_count': n, 'preview': row[:5]})
         anomalies = {k: v for k, v in counts.items() if k != expected_ncols}
         return {
             'expected_ncols': expected_ncols,
@@ -96,114 +126,257 @@ def structural_scan(file_path: str, expected_ncols: int | None = None, sample_of
             'encoding_used': 'unknown'
         }
 
-def looks_like_date(series: pd.Series, sample: int = 5000) -> bool:
+class ScanningReader:
+    """
+    File-like wrapper handed to ``pd.read_csv`` so the structural scan and the
+    pandas load share ONE read of the file.
+
+    Every line pandas pulls is first routed through ``csv.reader``, which builds
+    the same field-count histogram / offending-line samples as
+    ``structural_scan`` while pandas parses the identical text for profiling.
+    """
+
+    def __init__(self, handle, sample_offenders: int = 5):
+        self._buf: List[str] = []
+        self._buffered = 0
+        self._rows = csv.reader(self._tap(handle))
+        self._record_index = 0
+        self.sample_offenders = sample_offenders
+        self.header: List[str] | None = None
+        self.expected_ncols: int | None = None
+        self.counts: Counter = Counter()
+        self.offenders: List[Dict[str, Any]] = []
+
+    def _tap(self, handle):
+        for line in handle:
+            self._buf.append(line)
+            self._buffered += len(line)
+            yield line
+
+    def _record(self, row: List[str]) -> None:
+        i = self._record_index
+        self._record_index += 1
+        if i == 0:
+            self.header = row
+            # Clean up potential BOM from header fields
+            if row and row[0].startswith('\ufeff'):
+                row[0] = row[0].lstrip('\ufeff')
+            self.expected_ncols = len(row)
+            return
+        n = len(row)
+        self.counts[n] += 1
+        if self.expected_ncols and n != self.expected_ncols and len(self.offenders) < self.sample_offenders:
+            self.offenders.append({'line_number': i+1, 'field_count': n, 'preview': row[:5]})
+
+    def read(self, size: int = -1) -> str:
+        # advance the csv reader (which pulls lines into the buffer) until pandas' request is covered
+        while size is None or size < 0 or self._buffered < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._record(row)
+        data = ''.join(self._buf)
+        if size is not None and 0 <= size < len(data):
+            data, rest = data[:size], data[size:]
+            self._buf, self._buffered = [rest], len(rest)
+        else:
+            self._buf, self._buffered = [], 0
+        return data
+
+    def scan_report(self, encoding: str) -> Dict[str, Any]:
+        """Same shape as ``structural_scan`` output."""
+        anomalies = {k: v for k, v in self.counts.items() if k != self.expected_ncols}
+        return {
+            'expected_ncols': self.expected_ncols,
+            'field_count_histogram': dict(self.counts),
+            'anomalous_field_counts': anomalies,
+            'offending_examples': self.offenders,
+            'total_lines_including_header': self._record_index,
+            'encoding_used': encoding
+        }
+
+def _strip_bom(columns: List[str]) -> List[str]:
+    if columns and isinstance(columns[0], str) and columns[0].startswith('\ufeff'):
+        return [columns[0].lstrip('\ufeff')] + list(columns[1:])
+    return columns
+
+def load_with_scan(file_path: str, encoding: str, sample_offenders: int = 5) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Single streaming pass: load the CSV as ``dtype=str`` exactly like the baseline
+    ``pd.read_csv`` call while building the structural scan from the same bytes.
+    Raises on decode/parse failure so the caller can retry another encoding.
+    """
+    _raise_csv_field_limit()
+    with open(file_path, 'r', encoding=encoding, newline='') as f:
+        scanner = ScanningReader(f, sample_offenders=sample_offenders)
+        df = pd.read_csv(
+            scanner,
+            low_memory=False,
+            dtype=str,
+            on_bad_lines='skip'
+        )
+        # drain anything pandas did not need (keeps line totals exact)
+        while scanner.read(1 << 20):
+            pass
+
+    # Clean up BOM from column names if present
+    df.columns = _strip_bom(list(df.columns))
+
+    return df, scanner.scan_report(encoding)
+
+DATE_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2})|(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})$')
+SNIFF_ROWS = 5000  # non-null values inspected by the date / multiselect sniffers
+NUMERIC_HINT_ROWS = 256  # leading non-null values per column tried as numbers before a full confirm
+
+def looks_like_date(series: pd.Series, sample: int = SNIFF_ROWS) -> bool:
     sample_vals = series.dropna().astype(str).head(sample)
     if sample_vals.empty:
         return False
-    pat = re.compile(r'^(\d{4}-\d{2}-\d{2})|(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})$')
-    m = sample_vals.sample(min(len(sample_vals), 200), random_state=0).str.match(pat).mean()
+    m = sample_vals.sample(min(len(sample_vals), 200), random_state=0).str.match(DATE_PATTERN).mean()
     return bool(m > 0.7)
 
 def is_multiselect(series: pd.Series, sep: str = ';') -> bool:
-    sample_vals = series.dropna().astype(str).head(5000)
+    sample_vals = series.dropna().astype(str).head(SNIFF_ROWS)
     if sample_vals.empty:
         return False
     return bool(sample_vals.str.contains(rf'\s*{re.escape(sep)}\s*').mean() > 0.2)
 
-def file_size_mb(path: str) -> float:
-    p = Path(path)
-    if not p.exists():
-        return 0.0
-    return round(p.stat().st_size / (1024*1024), 2)
+# ----------------------------- batched type sniffing ----------------------------------
+# One vectorized pass over a shared sample (each column's first SNIFF_ROWS non-null
+# values, stacked into a single Series) replaces per-column to_numeric / regex calls.
+# Flags are identical to looks_like_date / is_multiselect / "any value is numeric".
 
-# ----------------------------- core analysis ------------------------------------------
+def nonnull_head(df: pd.DataFrame, need: np.ndarray) -> Tuple[pd.Series, np.ndarray, np.ndarray]:
+    """
+    First ``need[j]`` non-null values of every column j, stacked column-major as str.
+    Returns (values, column code per value, values taken per column). The first pass
+    reads ``max(need)`` rows for all columns; only sparse columns reach further down.
+    """
+    ncols = len(need)
+    got = np.zeros(ncols, dtype=np.int64)
+    cols = np.flatnonzero(need > 0)
+    vals_parts, code_parts = [], []
+    lo, n = 0, len(df)
+    while len(cols) and lo < n:
+        hi = min(n, int(need.max())) if lo == 0 else n
+        block = df.iloc[lo:hi, cols].to_numpy(dtype=object).T       # columns x rows
+        mask = pd.notna(block)
+        per_col = mask.sum(axis=1)
+        vals = block[mask]                                         # row-major => grouped by column
+        codes = np.repeat(cols, per_col)
+        rank = np.arange(len(vals)) - np.repeat(np.cumsum(per_col) - per_col, per_col)
+        keep = rank < np.repeat(need[cols] - got[cols], per_col)
+        vals_parts.append(vals[keep])
+        code_parts.append(codes[keep])
+        got[cols] += np.minimum(per_col, need[cols] - got[cols])
+        cols = cols[got[cols] < need[cols]]
+        lo = hi
+    if not vals_parts:
+        return pd.Series([], dtype=object), np.zeros(0, dtype=np.int64), got
+    codes = np.concatenate(code_parts)
+    order = np.argsort(codes, kind='stable')
+    values = pd.Series(np.concatenate(vals_parts)[order], dtype=object).astype(str)
+    return values, codes[order], got
 
-def analyze_dataset(file_path: str, year: int, sample_uniques_cap: int = 10000, topk_cats: int = 10) -> Dict[str, Any]:
-    t0 = time.time()
-    struct = structural_scan(file_path)
-    expected_ncols = struct.get('expected_ncols')
-    corrupted = bool(struct.get('anomalous_field_counts'))
-    encoding_used = struct.get('encoding_used', 'utf-8')
+@lru_cache(maxsize=None)
+def _date_sample_positions(n: int) -> np.ndarray:
+    # the rows looks_like_date() draws: .sample(min(n, 200), random_state=0) of n values
+    return pd.RangeIndex(n).to_series().sample(min(n, 200), random_state=0).to_numpy()
 
-    try:
-        # Try to load with the encoding that worked in structural scan
-        df = pd.read_csv(
-            file_path,
-            low_memory=False,
-            dtype=str,
-            on_bad_lines='skip',
-            encoding=encoding_used
-        )
+def sniff_frame(df: pd.DataFrame, sniff_rows: int = SNIFF_ROWS) -> List[Dict[str, Any]]:
+    """
+    Batched type sniffing for every column of ``df`` on the shared sample.
+    Per column: 'numeric_hit' (a sampled value parses as a number — then the column is
+    numeric; a miss still needs ``confirm_numeric`` over the full column), 'multiselect'
+    and 'date_rate' (None when the column is empty).
+    """
+    ncols = df.shape[1]
+    values, codes, counts = nonnull_head(df, np.full(ncols, sniff_rows, dtype=np.int64))
+    starts = np.cumsum(counts) - counts
+    lead = np.concatenate([starts[j] + np.arange(min(int(counts[j]), NUMERIC_HINT_ROWS)) for j in range(ncols)]
+                          or [np.zeros(0, dtype=np.int64)]).astype(np.int64)
+    parsed = pd.to_numeric(values.iloc[lead], errors='coerce').notna().to_numpy()
+    numeric = np.bincount(codes[lead], weights=parsed, minlength=ncols)
+    # '\s*;\s*' as in is_multiselect() matches exactly when ';' is present
+    multi = np.bincount(codes, weights=values.str.contains(';', regex=False).to_numpy(), minlength=ncols)
 
-        # Clean up BOM from column names if present
-        if len(df.columns) > 0 and df.columns[0].startswith('\ufeff'):
-            df.columns = [df.columns[0].lstrip('\ufeff')] + list(df.columns[1:])
+    picks = [starts[j] + _date_sample_positions(int(counts[j])) for j in range(ncols) if counts[j]]
+    date_rate = np.full(ncols, np.nan)
+    if picks:
+        picked = np.concatenate(picks)
+        hits = values.iloc[picked].str.match(DATE_PATTERN).to_numpy(dtype=float)
+        picked_counts = np.array([len(p) for p in picks])
+        sums = np.add.reduceat(hits, np.cumsum(picked_counts) - picked_counts)
+        date_rate[counts > 0] = sums / picked_counts
 
-        loaded_ok = True
-    except Exception as e:
-        # Try fallback encodings if the structural scan encoding fails
-        fallback_encodings = ['utf-8-sig', 'utf-8', 'latin-1', 'cp1252']
-        loaded_ok = False
-        last_error = str(e)
+    return [{
+        'numeric_hit': bool(numeric[j] > 0),
+        'multiselect': bool(counts[j] and multi[j] / counts[j] > 0.2),
+        'date_rate': None if not counts[j] else float(date_rate[j]),
+    } for j in range(ncols)]
 
-        for enc in fallback_encodings:
-            if enc == encoding_used:  # Skip the one we already tried
-                continue
-            try:
-                df = pd.read_csv(
-                    file_path,
-                    low_memory=False,
-                    dtype=str,
-                    on_bad_lines='skip',
-                    encoding=enc
-                )
-
-                # Clean up BOM from column names if present
-                if len(df.columns) > 0 and df.columns[0].startswith('\ufeff'):
-                    df.columns = [df.columns[0].lstrip('\ufeff')] + list(df.columns[1:])
-
-                loaded_ok = True
-                encoding_used = enc
-                break
-            except Exception as new_e:
-                last_error = str(new_e)
-                continue
+def confirm_numeric(value_counts: pd.Series) -> bool:
+    """Exact "any value is numeric" check on a column's distinct values (its value_counts index)."""
+    distinct = pd.Series(value_counts.index.to_numpy(dtype=object), dtype=object)
+    return bool(pd.to_numeric(distinct, errors='coerce').notna().any())
 
-        if not loaded_ok:
-            return {
-                'year': year,
-                'file': file_path,
-                'file_size_mb': file_size_mb(file_path),
-                'loaded_ok': False,
-                'error': last_error,
-                'structural_scan': struct,
-                'encoding_tried': encoding_used
-            }
+def file_size_mb(path: str) -> float:
+    p = Path(path)
+    if not p.exists():
+        return 0.0
+    return round(p.stat().st_size / (1024*1024), 2)
 
-    total_lines = struct['total_lines_including_header'] - 1  # minus header
-    skipped_rows_est = max(0, total_lines - len(df))
+# ----------------------------- column profiling ---------------------------------------
 
+def profile_columns(df: pd.DataFrame, sample_uniques_cap: int = 10000,
+                    topk_cats: int = 10) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    Whole-frame column profile (the baseline Pass-1 behaviour).
+    Returns (cols_profile, column_sketches) where the sketches are the serialized
+    HyperLogLog / Space-Saving (categorical) or KLL / moments (numeric) summaries
+    written to the sidecar file.
+    """
     cols_profile = []
+    sketches = {}
+    sniffed = sniff_frame(df)
+    null_counts = df.isna().sum().to_numpy()
     for i, col in enumerate(df.columns):
-        s = df[col]
+        s = df.iloc[:, i]
         n = len(s)
-        nulls = int(s.isna().sum())
+        nulls = int(null_counts[i])
         null_pct = round((nulls / n) * 100, 2) if n else 0.0
 
-        # semantic flags
-        as_num = pd.to_numeric(s, errors='coerce')
-        is_numeric = bool(as_num.notna().sum() > 0)
-        looks_date = False if is_numeric else looks_like_date(s)
-        multi = is_multiselect(s)
+        # semantic flags: a sampled numeric hit settles it; otherwise confirm on the
+        # distinct values the categorical path needs anyway
+        flags = sniffed[i]
+        vc = None
+        if flags['numeric_hit']:
+            is_numeric = True
+        else:
+            vc = s.value_counts(dropna=False)
+            is_numeric = confirm_numeric(vc)
+        date_rate = flags['date_rate']
+        looks_date = False if (is_numeric or date_rate is None) else bool(date_rate > 0.7)
+        multi = flags['multiselect']
 
         # uniques & examples (guarded)
+        hll = HyperLogLog()
+        top_k = kll = moments = None
         if is_numeric:
+            as_num = pd.to_numeric(s, errors='coerce')
             examples = [v for v in as_num.dropna().head(5).tolist()]
             unique_approx = int(min(as_num.nunique(dropna=True), sample_uniques_cap))
+            hll.update(as_num)
+            kll, moments = KLLSketch(), Moments()
+            kll.update(as_num.to_numpy())
+            moments.update(as_num.to_numpy())
         else:
-            vc = s.value_counts(dropna=False)
             unique_approx = int(min(vc.size, sample_uniques_cap))
             examples = [str(x) for x in vc.head(topk_cats).index.tolist()]
+            hll.update(s)
+            top_k = SpaceSaving(max(TOPK_SKETCH_CAPACITY, topk_cats))
+            vc.index = vc.index.fillna('nan')
+            top_k.update_counts(vc)
 
         cols_profile.append({
             'index': i,
@@ -214,24 +387,389 @@ def analyze_dataset(file_path: str, year: int, sample_uniques_cap: int = 10000,
             'looks_like_date': looks_date,
             'is_multiselect': multi,
             'unique_approx': unique_approx,
+            'distinct_estimate': hll.estimate(),
+            'numeric_stats': describe_numeric(kll, moments) if is_numeric else None,
             'examples': examples
         })
+        sketches[col] = {'hll': hll.to_dict(), 'top_k': top_k.to_dict() if top_k else None}
+        if is_numeric:
+            sketches[col].update(kll=kll.to_dict(), moments=moments.to_dict())
+    return cols_profile, sketches
+
+class ChunkedColumnProfiler:
+    """
+    Constant-memory column profiler fed one DataFrame chunk at a time.
+
+    Per column it keeps only mergeable state: null/row counts, the first 5 numeric
+    values, a HyperLogLog distinct counter, a Space-Saving top-k summary, a KLL
+    quantile sketch with running moments for numeric values, and boolean
+    sniff hits for the first ``SNIFF_ROWS`` non-null values. ``finalize()`` returns
+    the same ``cols_profile`` shape as ``profile_columns``; ``sketches()`` returns the
+    serialized HLL / top-k summaries. Flags and null counts are exact; unique counts
+    and examples come from the sketches (see ``profile_sketches``).
+    """
+
+    def __init__(self, columns: List[str], sample_uniques_cap: int = 10000, topk_cats: int = 10):
+        self.columns = list(columns)
+        self.sample_uniques_cap = sample_uniques_cap
+        self.topk_cats = topk_cats
+        self.rows = 0
+        self._state = [{
+            'nulls': 0,
+            'numeric_seen': False,
+            'num_examples': [],
+            'num_hll': HyperLogLog(),
+            'kll': KLLSketch(),
+            'moments': Moments(),
+            'str_hll': HyperLogLog(),
+            'top_k': SpaceSaving(max(TOPK_SKETCH_CAPACITY, topk_cats)),
+            'sniffed': 0,
+            'multi_hits': 0,
+            'date_hits': [],
+        } for _ in self.columns]
+        # option stats for every column still inside its sniff window (a single-option
+        # answer has no ';'); dropped as soon as the window rules a column out
+        self._options = {j: OptionStats() for j in range(len(self.columns))}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        self.rows += len(chunk)
+        self._sniff(chunk)
+        for j in list(self._options):
+            st = self._state[j]
+            if st['sniffed'] >= SNIFF_ROWS and not self._is_multi(st):
+                del self._options[j]
+        if self._options:
+            tracked = list(self._options)
+            update_option_stats([self._options[j] for j in tracked], chunk.iloc[:, tracked])
+        for col, st in zip(self.columns, self._state):
+            s = chunk[col]
+            st['nulls'] += int(s.isna().sum())
+
+            as_num = pd.to_numeric(s, errors='coerce').dropna()
+            if len(as_num):
+                if not st['numeric_seen']:
+                    st['numeric_seen'] = True
+                    # numeric columns never report categorical examples
+                    st['str_hll'] = st['top_k'] = None
+                if len(st['num_examples']) < 5:
+                    st['num_examples'].extend(as_num.head(5 - len(st['num_examples'])).tolist())
+                st['num_hll'].update(as_num)
+                st['kll'].update(as_num.to_numpy())
+                st['moments'].update(as_num.to_numpy())
+
+            if not st['numeric_seen']:
+                st['str_hll'].update(s)
+                st['top_k'].update(s)
+
+    def _sniff(self, chunk: pd.DataFrame) -> None:
+        # top every column up to SNIFF_ROWS non-null values in one batched pass
+        need = np.array([max(0, SNIFF_ROWS - st['sniffed']) for st in self._state], dtype=np.int64)
+        if not need.any():
+            return
+        values, codes, got = nonnull_head(chunk[self.columns], need)
+        multi = np.bincount(codes, weights=values.str.contains(';', regex=False).to_numpy(),
+                            minlength=len(need))
+        dates = values.str.match(DATE_PATTERN).to_numpy(dtype=bool)
+        ends = np.cumsum(got)
+        for j, st in enumerate(self._state):
+            st['sniffed'] += int(got[j])
+            st['multi_hits'] += int(multi[j])
+            st['date_hits'].extend(dates[ends[j] - got[j]:ends[j]].tolist())
+
+    @staticmethod
+    def _is_multi(st: Dict[str, Any]) -> bool:
+        return bool(st['sniffed'] and st['multi_hits'] / st['sniffed'] > 0.2)
+
+    @staticmethod
+    def _date_rate(hits: List[bool]) -> float:
+        # same 200-row draw that looks_like_date() takes from its first-5000 sample
+        picked = pd.Series(hits).sample(min(len(hits), 200), random_state=0)
+        return float(picked.mean())
+
+    def finalize(self) -> List[Dict[str, Any]]:
+        cap = self.sample_uniques_cap
+        n = self.rows
+        cols_profile = []
+        for i, (col, st) in enumerate(zip(self.columns, self._state)):
+            nulls = st['nulls']
+            is_numeric = st['numeric_seen']
+            hits = st['date_hits']
+            looks_date = False if (is_numeric or not hits) else bool(self._date_rate(hits) > 0.7)
+            multi = self._is_multi(st)
+            if is_numeric:
+                distinct = st['num_hll'].estimate()
+                examples = list(st['num_examples'])
+                unique_approx = int(min(distinct, cap))
+            else:
+                distinct = st['str_hll'].estimate()
+                # value_counts(dropna=False) semantics: NaN counts as one more unique
+                unique_approx = int(min(distinct + (1 if nulls else 0), cap))
+                examples = [str(v) for v, _, _ in st['top_k'].top(self.topk_cats)]
+            cols_profile.append({
+                'index': i,
+                'name': col,
+                'null_count': nulls,
+                'null_pct': round((nulls / n) * 100, 2) if n else 0.0,
+                'is_numeric': is_numeric,
+                'looks_like_date': looks_date,
+                'is_multiselect': multi,
+                'unique_approx': unique_approx,
+                'distinct_estimate': distinct,
+                'numeric_stats': describe_numeric(st['kll'], st['moments']) if is_numeric else None,
+                'examples': examples
+            })
+        return cols_profile
+
+    def sketches(self) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        for col, st in zip(self.columns, self._state):
+            if st['numeric_seen']:
+                out[col] = {'hll': st['num_hll'].to_dict(), 'top_k': None,
+                            'kll': st['kll'].to_dict(), 'moments': st['moments'].to_dict()}
+            else:
+                out[col] = {'hll': st['str_hll'].to_dict(), 'top_k': st['top_k'].to_dict()}
+        return out
+
+    def multiselect_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {self.columns[j]: stats.to_dict() for j, stats in self._options.items()
+                if self._is_multi(self._state[j])}
+
+def profile_chunked_with_scan(file_path: str, encoding: str, chunksize: int,
+                              sample_uniques_cap: int = 10000, topk_cats: int = 10,
+                              sample_offenders: int = 5) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Chunked variant of ``load_with_scan``: streams ``chunksize`` rows at a time into a
+    ``ChunkedColumnProfiler`` so peak memory is bounded by the chunk, not the file.
+    Returns (profile summary, structural scan).
+    """
+    _raise_csv_field_limit()
+    profiler = None
+    with open(file_path, 'r', encoding=encoding, newline='') as f:
+        scanner = ScanningReader(f, sample_offenders=sample_offenders)
+        reader = pd.read_csv(scanner, dtype=str, on_bad_lines='skip', chunksize=chunksize)
+        with reader:
+            for chunk in reader:
+                if profiler is None:
+                    profiler = ChunkedColumnProfiler(_strip_bom(list(chunk.columns)), sample_uniques_cap, topk_cats)
+                chunk.columns = profiler.columns
+                profiler.update(chunk)
+        while scanner.read(1 << 20):
+            pass
+
+    if profiler is None:  # header-only file: pandas yields no chunks
+        profiler = ChunkedColumnProfiler(_strip_bom(list(scanner.header or [])), sample_uniques_cap, topk_cats)
+    summary = {
+        'rows_loaded': profiler.rows,
+        'n_columns_detected': len(profiler.columns),
+        'columns': profiler.finalize(),
+        'column_sketches': profiler.sketches(),
+        'multiselect_stats': profiler.multiselect_stats(),
+    }
+    return summary, scanner.scan_report(encoding)
+
+# ----------------------------- quick (sampled) profile ---------------------------------
+
+def analyze_quick(file_path: str, year: int, sample_uniques_cap: int = 10000, topk_cats: int = 10,
+                  quick_rows: int = QUICK_SAMPLE_ROWS) -> Dict[str, Any]:
+    """
+    ``analyze_dataset`` from random byte blocks (``quick_profile``): same report shape,
+    but row counts and null shares are estimates with 95% intervals, distinct counts
+    estimates with bounds (``distinct_bounds``), and flags / examples come from the sampled rows.
+    """
+    t0 = time.time()
+    with stage('encoding_detection', year=year) as rec:
+        detection = detect_encoding(file_path)
+        rec['bytes'] = detection['bytes_sampled']
+    encoding = detection['encoding']
+    try:
+        with stage('quick_sample', year=year) as rec:
+            sample = sample_records(file_path, encoding, sample_rows=quick_rows)
+            df = sample_frame(sample)
+            rec.update(rows=len(df), bytes=sample['bytes_read'])
+    except Exception as e:
+        return {
+            'year': year,
+            'file': file_path,
+            'file_size_mb': file_size_mb(file_path),
+            'loaded_ok': False,
+            'error': str(e),
+            'profile_mode': 'quick',
+            'encoding_tried': encoding
+        }
+
+    rows = estimate_rows(sample)
+    n_rows = rows['estimate']
+    census = sample['census']
+    ncols = len(sample['header'])
+    histogram = Counter()
+    for block in sample['blocks']:
+        histogram.update(block['histogram'])
+    sampled_records = sum(histogram.values())
+    too_long = sum(v for k, v in histogram.items() if k > ncols)  # rows pandas would skip
+
+    with stage('profile_columns', rows=len(df), year=year, columns=df.shape[1]):
+        cols_profile, _ = profile_columns(df, sample_uniques_cap=sample_uniques_cap, topk_cats=topk_cats)
+    row_blocks = df.attrs['row_blocks']
+    for c in cols_profile:
+        s = df.iloc[:, c['index']]
+        is_null = s.isna().to_numpy()
+        nulls = estimate_null_share(is_null, row_blocks, census)
+        values = pd.to_numeric(s, errors='coerce') if c['is_numeric'] else s
+        distinct = estimate_distinct(values, round(n_rows * (1 - nulls['estimate'])), census)
+        # value_counts(dropna=False) semantics for categoricals: NaN is one more unique
+        extra = 1 if (not c['is_numeric'] and is_null.any()) else 0
+        c.update({
+            'null_count': int(round(nulls['estimate'] * n_rows)),
+            'null_pct': round(nulls['estimate'] * 100, 2),
+            'null_pct_ci95': [round(v * 100, 2) for v in nulls['ci95']],
+            'unique_approx': int(min(distinct['estimate'] + extra, sample_uniques_cap)),
+            'distinct_estimate': distinct['estimate'],
+            'distinct_bounds': distinct['bounds'],
+            'estimated': not census,
+        })
+
+    struct = {
+        'sampled': True,
+        'expected_ncols': ncols,
+        'field_count_histogram': dict(histogram),
+        'anomalous_field_counts': {k: v for k, v in histogram.items() if k != ncols},
+        'offending_examples': [],
+        'total_lines_including_header': n_rows + 1,
+        'encoding_used': encoding
+    }
+    skipped = round(n_rows * too_long / sampled_records) if sampled_records else 0
+    return {
+        'year': year,
+        'file': file_path,
+        'file_size_mb': file_size_mb(file_path),
+        'loaded_ok': True,
+        'profile_mode': 'quick',
+        'estimated': not census,
+        'rows_loaded': int(n_rows - skipped),
+        'estimated_rows_in_file_ex_header': int(n_rows),
+        'estimated_rows_in_file_ci95': rows['ci95'],
+        'estimated_rows_skipped': int(skipped),
+        'structural_corruption': bool(struct['anomalous_field_counts']),
+        'structural_scan': struct,
+        'n_columns_detected': int(df.shape[1]),
+        'columns': cols_profile,
+        'encoding_used': encoding,
+        'encoding_detection': detection,
+        'quick_sample': {
+            'blocks': len(sample['blocks']),
+            'bytes_read': int(sample['bytes_read']),
+            'coverage': round(sample['bytes_read'] / max(1, os.path.getsize(file_path)), 4),
+            'records_read': int(sampled_records),
+            'rows_kept': int(len(df)),
+            'census': census,
+        },
+        'run_duration_seconds': round(time.time() - t0, 2),
+    }
+
+# ----------------------------- core analysis ------------------------------------------
+
+def analyze_dataset(file_path: str, year: int, sample_uniques_cap: int = 10000, topk_cats: int = 10,
+                    chunksize: int | None = None, scan_engine: str = 'mmap',
+                    quick: bool = False, quick_rows: int = QUICK_SAMPLE_ROWS) -> Dict[str, Any]:
+    with stage('analyze_dataset', nbytes=os.path.getsize(file_path), year=year, file=file_path,
+               mode='quick' if quick else ('chunked' if chunksize else 'full')) as rec:
+        if quick:
+            report = analyze_quick(file_path, year, sample_uniques_cap=sample_uniques_cap, topk_cats=topk_cats,
+                                   quick_rows=quick_rows)
+        else:
+            report = _analyze_full(file_path, year, sample_uniques_cap=sample_uniques_cap, topk_cats=topk_cats,
+                                   chunksize=chunksize, scan_engine=scan_engine)
+        rec['rows'] = report.get('rows_loaded')
+    return report
+
+def _analyze_full(file_path: str, year: int, sample_uniques_cap: int, topk_cats: int,
+                  chunksize: int | None, scan_engine: str) -> Dict[str, Any]:
+    t0 = time.time()
+    with stage('encoding_detection', year=year) as rec:
+        detection = detect_encoding(file_path)
+        rec['bytes'] = detection['bytes_sampled']
+    candidates = encoding_candidates(detection)
+    loaded_ok = False
+    last_error = None
+    df = None
+
+    # One read per attempt: the structural scan rides along with the pandas load, and
+    # the sampled detection makes a decode failure (another pass) the rare exception
+    size = os.path.getsize(file_path)
+    for enc in candidates:
+        try:
+            if chunksize:
+                with stage('load_profile_chunked', nbytes=size, year=year, encoding=enc) as rec:
+                    profiled, struct = profile_chunked_with_scan(
+                        file_path, enc, chunksize, sample_uniques_cap=sample_uniques_cap, topk_cats=topk_cats
+                    )
+                    rec['rows'] = profiled['rows_loaded']
+            else:
+                with stage('load_with_scan', nbytes=size, year=year, encoding=enc) as rec:
+                    df, struct = load_with_scan(file_path, enc)
+                    rec['rows'] = len(df)
+            loaded_ok = True
+            encoding_used = enc
+            break
+        except Exception as e:
+            last_error = str(e)
+            continue
+
+    if not loaded_ok:
+        with stage('structural_scan', nbytes=size, year=year, engine=scan_engine) as rec:
+            struct = structural_scan(file_path, engine=scan_engine)
+            rec['rows'] = struct.get('total_lines_including_header')
+        return {
+            'year': year,
+            'file': file_path,
+            'file_size_mb': file_size_mb(file_path),
+            'loaded_ok': False,
+            'error': last_error,
+            'structural_scan': struct,
+            'encoding_tried': candidates[-1]
+        }
+
+    if df is not None:
+        with stage('profile_columns', rows=len(df), year=year, columns=df.shape[1]):
+            cols_profile, sketches = profile_columns(df, sample_uniques_cap=sample_uniques_cap, topk_cats=topk_cats)
+        multi_cols = [c['index'] for c in cols_profile if c['is_multiselect']]
+        with stage('multiselect_stats', rows=len(df), year=year, columns=len(multi_cols)):
+            option_stats = profile_multiselect(df, multi_cols)
+        profiled = {
+            'rows_loaded': len(df),
+            'n_columns_detected': len(df.columns),
+            'columns': cols_profile,
+            'column_sketches': sketches,
+            'multiselect_stats': option_stats,
+        }
+        del df
+
+    corrupted = bool(struct.get('anomalous_field_counts'))
+    total_lines = struct['total_lines_including_header'] - 1  # minus header
+    skipped_rows_est = max(0, total_lines - profiled['rows_loaded'])
 
     report = {
         'year': year,
         'file': file_path,
         'file_size_mb': file_size_mb(file_path),
         'loaded_ok': loaded_ok,
-        'rows_loaded': int(len(df)),
+        'rows_loaded': int(profiled['rows_loaded']),
         'estimated_rows_in_file_ex_header': int(total_lines),
         'estimated_rows_skipped': int(skipped_rows_est),
         'structural_corruption': bool(corrupted),
         'structural_scan': struct,
-        'n_columns_detected': int(len(df.columns)),
-        'columns': cols_profile,
+        'n_columns_detected': int(profiled['n_columns_detected']),
+        'columns': profiled['columns'],
         'encoding_used': encoding_used,
-        'run_duration_seconds': round(time.time() - t0, 2)
+        'encoding_detection': detection,
+        'run_duration_seconds': round(time.time() - t0, 2),
+        # popped by run() into profile_sketches_{year}.json (kept out of data_dictionary.json)
+        'column_sketches': profiled['column_sketches'],
+        # popped by run() into multiselect_stats_{year}.json
+        'multiselect_stats': profiled['multiselect_stats'],
     }
+    if chunksize:
+        report['profile_chunksize'] = int(chunksize)
     return report
 
 # ----------------------------- docs generation ----------------------------------------
@@ -241,6 +779,12 @@ def write_json(obj: Dict[str, Any], out_path: str):
     with open(out_path, 'w', encoding='utf-8') as f:
         json.dump(obj, f, indent=2)
 
+def write_sketches(sketches: Dict[str, Any], out_path: str):
+    """Compact (unindented) JSON sidecar, e.g. {column: {'hll': ..., 'top_k': ...}}."""
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(sketches, f, separators=(',', ':'))
+
 def generate_column_mapping(reports: List[Dict[str, Any]], out_md: str):
     # Determine year status
     status_by_year = {}
@@ -263,31 +807,28 @@ def generate_column_mapping(reports: List[Dict[str, Any]], out_md: str):
             per_year_cols[y] = {c['name'] for c in r.get('columns', [])}
         status_by_year[y] = status
 
-    # Collect all column names from years that actually loaded
-    loaded_sets = [s for s in per_year_cols.values() if s]
-    all_cols = sorted(set().union(*loaded_sets) if loaded_sets else [])
+    # One availability mask per column over every year in the reports
+    index = ColumnIndex(per_year_cols)
+    years = index.datasets
+    all_cols = sorted(index.union())
+    statuses = ', '.join(f"{yr}: {status_by_year.get(yr, '—')}" for yr in years)
 
     legend = (
         "# Column Availability Matrix\n\n"
         "> Legend: ✅ present · ❌ absent · ⛔ year not loaded\n\n"
-        f"**Year statuses:** 2023: {status_by_year.get(2023,'—')}, "
-        f"2024: {status_by_year.get(2024,'—')}, "
-        f"2025: {status_by_year.get(2025,'—')}\n\n"
+        f"**Year statuses:** {statuses}\n\n"
     )
 
     header = (
-        "| Column Name | 2023 | 2024 | 2025 |\n"
-        "|-------------|------|------|------|\n"
+        f"| Column Name | {' | '.join(str(yr) for yr in years)} |\n"
+        f"|-------------|{'|'.join('------' for _ in years)}|\n"
     )
+    not_loaded = index.mask(yr for yr in years if 'Not loaded' in status_by_year.get(yr, ''))
     rows = []
     for col in all_cols:
-        marks = []
-        for yr in (2023, 2024, 2025):
-            if 'Not loaded' in status_by_year.get(yr, ''):
-                marks.append("⛔")
-            else:
-                present = "✅" if col in per_year_cols.get(yr, set()) else "❌"
-                marks.append(present)
+        mask = index.masks[col]
+        marks = ["⛔" if not_loaded & bit else "✅" if mask & bit else "❌"
+                 for bit in (index.mask([yr]) for yr in years)]
         rows.append(f"| {col} | {' | '.join(marks)} |")
 
     Path(out_md).parent.mkdir(parents=True, exist_ok=True)
@@ -317,55 +858,187 @@ def generate_relevant_columns_minimal(out_md: str):
     Path(out_md).parent.mkdir(parents=True, exist_ok=True)
     Path(out_md).write_text(md, encoding='utf-8')
 
-# ----------------------------- CLI orchestration --------------------------------------
+# ----------------------------- incremental cache --------------------------------------
 
-def run(csv_2023: str, csv_2024: str, csv_2025: str, outdir: str, sample_uniques_cap: int = 10000, topk_cats: int = 10):
-    outdir_path = Path(outdir)
-    outdir_path.mkdir(parents=True, exist_ok=True)
+PROFILE_CACHE_VERSION = 5  # bump when the report/profile format changes (5: distinct_bounds)
 
-    results = []
-    inputs = [(csv_2023, 2023), (csv_2024, 2024), (csv_2025, 2025)]
+class InventoryCache:
+    """
+    Content-addressed cache of per-file ``analyze_dataset`` reports.
 
-    print("=== Data Inventory Pass 1: Analyzing CSV files ===")
+    Entries live in ``<cache_dir>/<key>.json`` where the key hashes the file's
+    content digest together with the profiler parameters and
+    ``PROFILE_CACHE_VERSION``. ``index.json`` remembers (size, mtime_ns) ->
+    content digest per path, so an untouched file is recognised from ``stat``
+    alone; a touched-but-identical file costs one hashing pass, never a re-profile.
+    """
+
+    def __init__(self, cache_dir: str, params: Dict[str, Any]):
+        self.cache_dir = Path(cache_dir)
+        self.params = params
+        self._index_path = self.cache_dir / 'index.json'
+        try:
+            self._index = json.loads(self._index_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self._index = {}
+
+    @staticmethod
+    def content_digest(file_path: str, block_size: int = 1 << 20) -> str:
+        h = hashlib.blake2b(digest_size=20)
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                h.update(block)
+        return h.hexdigest()
+
+    def _digest(self, file_path: str) -> str:
+        st = os.stat(file_path)
+        path_key = str(Path(file_path).resolve())
+        known = self._index.get(path_key)
+        if known and known.get('size') == st.st_size and known.get('mtime_ns') == st.st_mtime_ns:
+            return known['content_digest']
+        digest = self.content_digest(file_path)
+        self._index[path_key] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'content_digest': digest}
+        return digest
+
+    def key(self, file_path: str) -> str:
+        payload = json.dumps({'content': self._digest(file_path), 'params': self.params,
+                              'version': PROFILE_CACHE_VERSION}, sort_keys=True)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+    def lookup(self, file_path: str, year: int) -> Dict[str, Any] | None:
+        try:
+            entry = self.cache_dir / f'{self.key(file_path)}.json'
+            if not entry.exists():
+                return None
+            rep = json.loads(entry.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        rep['year'] = year
+        rep['file'] = file_path
+        rep['cache_hit'] = True
+        return rep
+
+    def store(self, file_path: str, report: Dict[str, Any]) -> None:
+        if not report.get('loaded_ok'):
+            return  # failures are always retried
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            entry = self.cache_dir / f'{self.key(file_path)}.json'
+            entry.write_text(json.dumps(report, separators=(',', ':')), encoding='utf-8')
+        except OSError as e:
+            print(f"  ⚠️ Could not write cache entry: {e}")
 
+    def save_index(self) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._index_path.write_text(json.dumps(self._index, indent=2), encoding='utf-8')
+        except OSError as e:
+            print(f"  ⚠️ Could not write cache index: {e}")
+
+def _serve_from_cache(cache: InventoryCache | None, fp: str, yr: int) -> Dict[str, Any] | None:
+    if cache is None:
+        return None
+    t0 = time.time()
+    rep = cache.lookup(fp, yr)
+    if rep is not None:
+        print(f"  ⚡ Cache hit for {Path(fp).name} ({(time.time() - t0) * 1000:.0f} ms, file unchanged)")
+        _report_outcome(rep)
+    return rep
+
+# ----------------------------- CLI orchestration --------------------------------------
+
+def _run_parallel(inputs: List[tuple], analyze_kwargs: Dict[str, Any], workers: int,
+                  cache: InventoryCache | None = None) -> List[Dict[str, Any]]:
+    """
+    Analyze each input in its own worker process. Reports come back in input order,
+    and a failure (including a crashed worker) only marks that year as not loaded.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    slots: List[Any] = []
+    todo = []
     for fp, yr in inputs:
         print(f"\nProcessing {yr}...")
-        if not fp:
-            print(f"  ⚠️ No file path provided for {yr}")
-            results.append({'year': yr, 'loaded_ok': False, 'error': 'No file path provided'})
-            continue
+        rep = _precheck_input(fp, yr)
+        if rep is None:
+            rep = _serve_from_cache(cache, fp, yr)
+        slots.append(rep)
+        if rep is None:
+            print(f"  📊 Queued {Path(fp).name}")
+            todo.append((len(slots) - 1, fp, yr))
 
-        # Check if file exists
-        if not Path(fp).exists():
-            print(f"  ❌ File does not exist: {fp}")
-            results.append({'year': yr, 'file': fp, 'loaded_ok': False, 'error': f'File does not exist: {fp}'})
-            continue
+    if todo:
+        n_workers = min(workers, len(todo))
+        print(f"\n🚀 Analyzing {len(todo)} dataset(s) with {n_workers} worker processes...")
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = {idx: pool.submit(analyze_dataset, fp, yr, **analyze_kwargs) for idx, fp, yr in todo}
+            for idx, fp, yr in todo:
+                print(f"\nResults {yr} ({Path(fp).name}):")
+                try:
+                    rep = futures[idx].result()
+                    rep['cache_hit'] = False
+                    _report_outcome(rep)
+                    if cache is not None:
+                        cache.store(fp, rep)
+                except Exception as e:
+                    print(f"  ❌ Unexpected error: {str(e)}")
+                    rep = {'year': yr, 'file': fp, 'loaded_ok': False, 'error': str(e)}
+                slots[idx] = rep
+    return slots
 
-        try:
-            print(f"  📊 Analyzing {Path(fp).name}...")
-            rep = analyze_dataset(fp, yr, sample_uniques_cap=sample_uniques_cap, topk_cats=topk_cats)
-
-            # Report what we found
-            if rep.get('loaded_ok'):
-                print(f"  ✅ Loaded successfully using {rep.get('encoding_used', 'unknown')} encoding")
-                print(f"     Rows: {rep.get('rows_loaded', 0)}, Columns: {rep.get('n_columns_detected', 0)}")
-                if rep.get('structural_corruption'):
-                    print(f"     ⚠️ Structural corruption detected")
-                if rep.get('estimated_rows_skipped', 0) > 0:
-                    print(f"     ⚠️ Estimated {rep.get('estimated_rows_skipped')} rows skipped")
-            else:
-                print(f"  ❌ Failed to load: {rep.get('error', 'Unknown error')}")
-        except Exception as e:
-            print(f"  ❌ Unexpected error: {str(e)}")
-            rep = {'year': yr, 'file': fp, 'loaded_ok': False, 'error': str(e)}
-        results.append(rep)
+def _report_outcome(rep: Dict[str, Any]) -> None:
+    # Report what we found
+    if rep.get('loaded_ok'):
+        print(f"  ✅ Loaded successfully using {rep.get('encoding_used', 'unknown')} encoding")
+        print(f"     Rows: {rep.get('rows_loaded', 0)}, Columns: {rep.get('n_columns_detected', 0)}")
+        if rep.get('profile_mode') == 'quick':
+            q = rep.get('quick_sample', {})
+            lo, hi = rep.get('estimated_rows_in_file_ci95', [None, None])
+            print(f"     ⚡ Quick profile: {q.get('rows_kept', 0)} sampled rows from {q.get('blocks', 0)} blocks "
+                  f"({q.get('coverage', 0):.1%} of file); rows 95% CI [{lo}, {hi}] — counts are estimates, "
+                  f"distinct counts bounded by [seen, worst case]")
+        if rep.get('structural_corruption'):
+            print(f"     ⚠️ Structural corruption detected")
+        if rep.get('estimated_rows_skipped', 0) > 0:
+            print(f"     ⚠️ Estimated {rep.get('estimated_rows_skipped')} rows skipped")
+    else:
+        print(f"  ❌ Failed to load: {rep.get('error', 'Unknown error')}")
 
-    print(f"\n=== Generating output files in {outdir_path} ===")
+def _precheck_input(fp: str, yr: int) -> Dict[str, Any] | None:
+    """Return an error report if the input cannot be analyzed at all, else None."""
+    if not fp:
+        print(f"  ⚠️ No file path provided for {yr}")
+        return {'year': yr, 'loaded_ok': False, 'error': 'No file path provided'}
+
+    # Check if file exists
+    if not Path(fp).exists():
+        print(f"  ❌ File does not exist: {fp}")
+        return {'year': yr, 'file': fp, 'loaded_ok': False, 'error': f'File does not exist: {fp}'}
+    return None
+
+def write_outputs(results: List[Dict[str, Any]], outdir_path: Path) -> List[Path]:
+    """Write every Pass-1 artifact for ``results`` under ``outdir_path``; returns the paths written."""
+    written: List[Path] = []
+    # sketches are bulky and only needed for merging/drift: write them to sidecars
+    for r in results:
+        sketches = r.pop('column_sketches', None)
+        if sketches is not None and r.get('year'):
+            sketch_json = outdir_path / f"profile_sketches_{r['year']}.json"
+            write_sketches(sketches, str(sketch_json))
+            print(f"✅ Written: {sketch_json}")
+            written.append(sketch_json)
+        option_stats = r.pop('multiselect_stats', None)
+        if option_stats is not None and r.get('year'):
+            options_json = outdir_path / f"multiselect_stats_{r['year']}.json"
+            write_sketches(option_stats, str(options_json))
+            print(f"✅ Written: {options_json} ({len(option_stats)} multiselect columns)")
+            written.append(options_json)
 
     # write JSON (combined + per-year)
     data_json = outdir_path / 'data_dictionary.json'
     write_json(results, str(data_json))
     print(f"✅ Written: {data_json}")
+    written.append(data_json)
 
     for r in results:
         yr = r.get('year')
@@ -373,15 +1046,80 @@ def run(csv_2023: str, csv_2024: str, csv_2025: str, outdir: str, sample_uniques
             per_year_json = outdir_path / f'data_dictionary_{yr}.json'
             write_json(r, str(per_year_json))
             print(f"✅ Written: {per_year_json}")
+            written.append(per_year_json)
+
+    store_path = outdir_path / PROFILE_STORE_NAME
+    write_profile_store(results, str(store_path))
+    print(f"✅ Written: {store_path}")
+    written.append(store_path)
 
     # docs
     mapping_md = outdir_path / 'column_mapping.md'
     generate_column_mapping(results, str(mapping_md))
     print(f"✅ Written: {mapping_md}")
+    written.append(mapping_md)
 
     relevant_md = outdir_path / 'relevant_columns.md'
     generate_relevant_columns_minimal(str(relevant_md))
     print(f"✅ Written: {relevant_md}")
+    written.append(relevant_md)
+
+    return written
+
+def run(csv_2023: str, csv_2024: str, csv_2025: str, outdir: str, sample_uniques_cap: int = 10000, topk_cats: int = 10,
+        chunksize: int | None = None, workers: int = 1, use_cache: bool = True, cache_dir: str | None = None,
+        scan_engine: str = 'mmap', quick: bool = False,
+        quick_rows: int = QUICK_SAMPLE_ROWS, trace: str | None = None, trace_python_alloc: bool = False):
+    if enable_trace(trace, python_alloc=trace_python_alloc):
+        print(f"⏱️ Tracing stages to {trace}")
+    outdir_path = Path(outdir)
+    outdir_path.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    inputs = [(csv_2023, 2023), (csv_2024, 2024), (csv_2025, 2025)]
+    profile_params = {'sample_uniques_cap': sample_uniques_cap, 'topk_cats': topk_cats, 'chunksize': chunksize}
+    if quick:
+        profile_params.update(quick=True, quick_rows=quick_rows)
+    analyze_kwargs = dict(profile_params, scan_engine=scan_engine)
+
+    cache = None
+    if use_cache:
+        cache = InventoryCache(cache_dir or str(outdir_path / '.inventory_cache'), profile_params)
+
+    print("=== Data Inventory Pass 1: Analyzing CSV files ===")
+
+    if workers and workers > 1:
+        results = _run_parallel(inputs, analyze_kwargs, workers, cache=cache)
+    else:
+        for fp, yr in inputs:
+            print(f"\nProcessing {yr}...")
+            rep = _precheck_input(fp, yr)
+            if rep is None:
+                rep = _serve_from_cache(cache, fp, yr)
+            if rep is not None:
+                results.append(rep)
+                continue
+
+            try:
+                print(f"  📊 Analyzing {Path(fp).name}...")
+                rep = analyze_dataset(fp, yr, **analyze_kwargs)
+                rep['cache_hit'] = False
+                _report_outcome(rep)
+                if cache is not None:
+                    cache.store(fp, rep)
+            except Exception as e:
+                print(f"  ❌ Unexpected error: {str(e)}")
+                rep = {'year': yr, 'file': fp, 'loaded_ok': False, 'error': str(e)}
+            results.append(rep)
+
+    if cache is not None:
+        cache.save_index()
+
+    print(f"\n=== Generating output files in {outdir_path} ===")
+
+    with stage('write_outputs', datasets=len(results)) as rec:
+        written = write_outputs(results, outdir_path)
+        rec['bytes'] = sum(p.stat().st_size for p in written)
 
     # console verdict
     print(f"\n=== Final Analysis Summary ===")
@@ -400,6 +1138,8 @@ def run(csv_2023: str, csv_2024: str, csv_2025: str, outdir: str, sample_uniques
     print("Year verdicts:", ", ".join([f"{y}: {v}" for y, v in verdicts]))
     clean_years = [y for y, v in verdicts if v == '✅ Clean']
     print("Clean baseline years:", clean_years)
+    if cache is not None:
+        print("Cache hits (unchanged, not re-profiled):", [r.get('year') for r in results if r.get('cache_hit')])
 
     # Provide actionable feedback
     failed_years = [y for y, v in verdicts if 'Failed' in v]
@@ -417,8 +1157,29 @@ def parse_args(argv=None):
     p.add_argument('--outdir', type=str, default='docs', help='Output directory')
     p.add_argument('--sample-uniques-cap', type=int, default=10000, help='Cap for unique counts')
     p.add_argument('--topk-cats', type=int, default=10, help='Top-K for categorical examples')
+    p.add_argument('--chunksize', type=int, default=None,
+                   help='Profile in chunks of N rows (bounded memory); default loads the whole file')
+    p.add_argument('--workers', type=int, default=1,
+                   help='Analyze datasets in N parallel processes (default: 1, sequential)')
+    p.add_argument('--no-cache', action='store_true',
+                   help='Re-profile every file, ignoring (and not updating) the incremental cache')
+    p.add_argument('--cache-dir', type=str, default=None,
+                   help='Cache location (default: <outdir>/.inventory_cache)')
+    p.add_argument('--scan-engine', choices=SCAN_ENGINES, default='mmap',
+                   help='Structural scan engine for files pandas cannot load (default: mmap)')
+    p.add_argument('--quick', action='store_true',
+                   help='Triage mode: profile random byte blocks, report estimates with 95%% intervals')
+    p.add_argument('--quick-rows', type=int, default=QUICK_SAMPLE_ROWS,
+                   help=f'Reservoir size for --quick (default: {QUICK_SAMPLE_ROWS})')
+    p.add_argument('--trace', type=str, default=None,
+                   help='Append per-stage timing/throughput/memory as JSON lines to this file')
+    p.add_argument('--trace-python-alloc', action='store_true',
+                   help='With --trace, also record peak Python allocations per stage (tracemalloc; slower)')
     return p.parse_args(argv)
 
 if __name__ == '__main__':
     args = parse_args()
-    run(args.csv2023, args.csv2024, args.csv2025, args.outdir, args.sample_uniques_cap, args.topk_cats)
+    run(args.csv2023, args.csv2024, args.csv2025, args.outdir, args.sample_uniques_cap, args.topk_cats,
+        chunksize=args.chunksize, workers=args.workers, use_cache=not args.no_cache, cache_dir=args.cache_dir,
+        scan_engine=args.scan_engine, quick=args.quick, quick_rows=args.quick_rows,
+        trace=args.trace, trace_python_alloc=args.trace_python_alloc)
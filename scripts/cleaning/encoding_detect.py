@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Shared encoding detection for the survey CSV scripts
+
+Instead of re-reading a whole file once per candidate encoding, ``detect_encoding``
+samples a handful of blocks (head, tail and seeded random interior offsets), checks
+for a UTF-8 BOM and UTF-8 validity, and returns ONE decision with a confidence score.
+
+The decision follows the preference order the scripts always used
+(``ENCODINGS_TO_TRY``), so outputs are unchanged for files the old loops handled:
+  - sampled bytes are valid UTF-8 (BOM or not) -> 'utf-8-sig' (strips a BOM if present)
+  - otherwise                                  -> 'latin-1' (decodes any byte)
+
+Callers still keep a fallback chain (``encoding_candidates``) for the rare case an
+unsampled region disagrees, but never the old full-read-per-guess loop.
+"""
+
+from __future__ import annotations
+import codecs, os, random
+from typing import Dict, Any, List
+
+ENCODINGS_TO_TRY = ['utf-8-sig', 'utf-8', 'latin-1', 'cp1252']
+UTF8_BOM = b'\xef\xbb\xbf'
+SNIFF_BLOCK_BYTES = 64 * 1024
+SNIFF_INTERIOR_BLOCKS = 8
+
+def _sample_blocks(f, size: int, block: int, interior: int) -> List[tuple]:
+    """[(offset, bytes, reaches_eof)] for head, interior and tail blocks (whole file if small)."""
+    if size <= block * (interior + 2):
+        return [(0, f.read(), True)]
+    rng = random.Random(size)  # deterministic per file size: same file -> same sample
+    offsets = sorted(rng.randrange(block, size - 2 * block) for _ in range(interior))
+    blocks = []
+    for off in [0] + offsets + [size - block]:
+        f.seek(off)
+        blocks.append((off, f.read(block), off + block >= size))
+    return blocks
+
+def _utf8_check(data: bytes, starts_mid_file: bool, reaches_eof: bool) -> Dict[str, Any]:
+    skip = 0
+    if starts_mid_file:
+        # skip continuation bytes of a sequence that began before this block
+        while skip < min(3, len(data)) and 0x80 <= data[skip] <= 0xBF:
+            skip += 1
+        data = data[skip:]
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        decoder.decode(data, final=reaches_eof)
+    except UnicodeDecodeError as e:
+        return {'valid': False, 'non_ascii': True, 'bad_offset': skip + e.start}
+    return {'valid': True, 'non_ascii': not data.isascii()}
+
+def detect_encoding(file_path: str, block_size: int = SNIFF_BLOCK_BYTES,
+                    interior_blocks: int = SNIFF_INTERIOR_BLOCKS) -> Dict[str, Any]:
+    """
+    Decide a file's encoding from sampled blocks.
+
+    Returns {'encoding', 'confidence' (0-1), 'bom', 'utf8_valid', 'non_ascii_seen',
+    'c1_bytes_seen', 'bytes_sampled', 'coverage', 'first_invalid_offset'}.
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        blocks = _sample_blocks(f, size, block_size, interior_blocks)
+
+    head = blocks[0][1]
+    bom = head.startswith(UTF8_BOM)
+    sampled = sum(len(b) for _, b, _ in blocks)
+    coverage = 1.0 if size == 0 else min(1.0, sampled / size)
+
+    valid, non_ascii, first_bad, c1 = True, False, None, False
+    for off, data, eof in blocks:
+        check = _utf8_check(data, off > 0, eof)
+        non_ascii |= check['non_ascii']
+        if not check['valid']:
+            valid = False
+            first_bad = off + check['bad_offset'] if first_bad is None else first_bad
+            # 0x80-0x9F are C1 controls in latin-1 but punctuation in cp1252
+            c1 |= any(0x80 <= b <= 0x9F for b in data)
+
+    if valid:
+        encoding = 'utf-8-sig'
+        if coverage >= 1.0:
+            confidence = 1.0
+        elif bom or non_ascii:
+            confidence = 0.97   # multi-byte UTF-8 (or a BOM) is strong positive evidence
+        else:
+            confidence = round(0.6 + 0.35 * coverage, 2)  # pure ASCII sample: could hide a stray byte
+    else:
+        encoding = 'latin-1'
+        confidence = 0.7 if c1 else 0.9  # definitely not UTF-8; C1 bytes hint at cp1252 text
+
+    return {
+        'encoding': encoding,
+        'confidence': confidence,
+        'bom': bom,
+        'utf8_valid': valid,
+        'non_ascii_seen': non_ascii,
+        'c1_bytes_seen': c1,
+        'bytes_sampled': sampled,
+        'coverage': round(coverage, 4),
+        'first_invalid_offset': first_bad,
+    }
+
+def encoding_candidates(detection: Dict[str, Any]) -> List[str]:
+    """
+    Decision first, then the fallbacks still worth a retry. 'utf-8' is dropped
+    after 'utf-8-sig' because it accepts exactly the same bytes.
+    """
+    first = detection['encoding']
+    rest = [e for e in ENCODINGS_TO_TRY if e != first]
+    if first == 'utf-8-sig':
+        rest = [e for e in rest if e != 'utf-8']
+    return [first] + rest
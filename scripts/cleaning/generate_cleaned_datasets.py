@@ -7,56 +7,267 @@ schema files for easy upload and analysis.
 
 Outputs:
 - data/processed/{year}_stackoverflow_cleaned.csv
+- data/processed/{year}_stackoverflow_cleaned.parquet (--format parquet|both; ``parquet_output``)
+- data/processed/{year}_stackoverflow_cleaned-NNNNN.csv[.gz|.zst] + {year}_stackoverflow_manifest.json
+  instead of the single CSV with --shard-rows / --shard-mb / --compress (``csv_shards``)
 - data/processed/{year}_stackoverflow_schema.json
+
+Raw files are parsed by ``tiered_reader``: pandas' C engine wherever it provably
+agrees with the Python engine, the Python engine only for irregular regions.
+Files stream through read -> rename -> clean -> append in ``--chunksize`` row
+chunks; column types are inferred from type evidence over every value, gathered
+along the way (``schema_inference.SchemaInferencer``), so no whole-file frame is
+ever held.
+
+--trace PATH appends per-stage timings, throughput and memory as JSON lines
+(``pipeline_trace``).
 """
 
+import csv
+import io
+from collections import defaultdict
+import itertools
 import json
+import multiprocessing
+import os
+import shutil
 import argparse
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Callable, Iterator, Optional, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
 import re
 
-def clean_csv_for_bigquery(file_path: str, year: int, output_dir: Path) -> Dict[str, Any]:
-    """Clean a CSV file and prepare it for BigQuery upload."""
-
-    print(f"\n🔧 Processing {year} dataset...")
-
-    # Try multiple encodings like our inventory script does
-    encodings_to_try = ['utf-8-sig', 'utf-8', 'latin-1', 'cp1252']
-    df = None
-    encoding_used = None
-
-    for encoding in encodings_to_try:
+from encoding_detect import detect_encoding, encoding_candidates
+from pipeline_trace import enable_trace, stage
+from tiered_reader import iter_survey_csv
+from parquet_output import ParquetStage, write_typed_parquet
+from schema_inference import LOW_CONFIDENCE, ColumnEvidence, SchemaInferencer, decide
+from csv_shards import (SHARD_COMPRESSIONS, check_compression, finish_shard, manifest_name, remove_shards,
+                        shard_name, shard_pattern, write_manifest)
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pa_compute
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional: write_cleaned_csv falls back to DataFrame.to_csv
+    pa = None
+
+CSV_WRITE_CHUNK_ROWS = 50000  # rows formatted per batch (bounds the formatting buffer)
+CLEAN_CHUNK_ROWS = 50000      # rows read, cleaned and written at a time (bounds peak memory)
+NULL_TOKENS = frozenset(['nan', 'NaN', 'NULL', 'null'])  # whole-cell values blanked by step 4
+TEXT_SEPARATOR = '\x1f'       # joins a chunk's cells into one buffer for step 4
+CSV_WRITE_ENGINES = ('auto', 'arrow', 'pandas')
+OUTPUT_FORMATS = ('csv', 'parquet', 'both')
+SHARD_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))  # compression processes beside the cleaner
+LEAN_CATEGORY_SHARE = 0.5     # distinct / non-null values (per cleaning chunk) at or under which a column is 'category'
+
+def _as_text(series: pd.Series) -> pd.Series | None:
+    """
+    The column as the csv.writer row loop wrote it (str(value), '' for nulls), or
+    None when it is already plain strings and can be written as is.
+    """
+    if isinstance(series.dtype, pd.StringDtype):
+        return None
+    if isinstance(series.dtype, pd.CategoricalDtype):  # categories rendered once, cells by code
+        codes = series.cat.codes.to_numpy()
+        rendered = np.append(np.array([str(c) for c in series.cat.categories], dtype=object), '')
+        return pd.Series(rendered[codes], index=series.index, dtype=object)  # code -1 (missing) -> ''
+    if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+        return None
+    return series.map(str).where(series.notna(), '')
+
+def _text_frame(df: pd.DataFrame) -> pd.DataFrame:
+    text = df.copy(deep=False)
+    for i in range(text.shape[1]):
+        converted = _as_text(text.iloc[:, i])
+        if converted is not None:
+            text.isetitem(i, converted)
+    return text
+
+def _header_line(columns: List[str]) -> str:
+    line = io.StringIO()
+    csv.writer(line, quoting=csv.QUOTE_ALL, escapechar='\\').writerow(list(columns))
+    return line.getvalue()
+
+class CleanedCsvWriter:
+    """
+    Appends frames to a cleaned CSV: the header row when opened, then each
+    ``write(df)`` formatted in bulk, so a file can be written one chunk at a time.
+    Same contract and engines as ``write_cleaned_csv``.
+    """
+
+    def __init__(self, output_file: Path, columns: List[str], chunksize: int = CSV_WRITE_CHUNK_ROWS,
+                 engine: str = 'auto'):
+        if engine not in CSV_WRITE_ENGINES:
+            raise ValueError(f"Unknown CSV write engine: {engine}")
+        if engine == 'arrow' and pa is None:
+            raise ImportError("engine='arrow' requires pyarrow")
+        self.engine = 'arrow' if pa is not None and engine != 'pandas' else 'pandas'
+        self.path = Path(output_file)
+        self.chunksize = chunksize
+        self.rows = 0
+        self._arrow = None
+        if self.engine == 'arrow':
+            self._f = open(output_file, 'wb')
+            self._f.write(_header_line(columns).encode('utf-8'))
+            # Arrow quotes every valid field and doubles '"'; nulls become '' (quoted) and
+            # backslashes are escaped up front, which is all escapechar='\\' adds
+            self._schema = pa.schema([(f'c{i}', pa.string()) for i in range(len(columns))])
+            options = pa_csv.WriteOptions(include_header=False, quoting_style='all_valid', eol='\r\n')
+            self._arrow = pa_csv.CSVWriter(self._f, self._schema, write_options=options)
+        else:
+            self._f = open(output_file, 'w', newline='', encoding='utf-8')
+            self._f.write(_header_line(columns))
+
+    def write(self, df: pd.DataFrame) -> None:
+        text = _text_frame(df)
+        self.rows += len(text)
+        if self._arrow is None:
+            text.to_csv(self._f, index=False, header=False, quoting=csv.QUOTE_ALL, escapechar='\\', na_rep='',
+                        lineterminator='\r\n', chunksize=self.chunksize)
+            return
+        for lo in range(0, len(text), self.chunksize):
+            chunk = text.iloc[lo:lo + self.chunksize]
+            arrays = []
+            for i in range(chunk.shape[1]):
+                col = pa.array(chunk.iloc[:, i], type=pa.string(), from_pandas=True)
+                col = pa_compute.replace_substring(pa_compute.fill_null(col, ''), '\\', '\\\\')
+                arrays.append(col)
+            self._arrow.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    @property
+    def bytes_written(self) -> int:
+        self._f.flush()
+        return self._f.tell()
+
+    def close(self) -> None:
+        if self._arrow is not None:
+            self._arrow.close()
+            self._arrow = None
+        self._f.close()
+
+    def __enter__(self) -> 'CleanedCsvWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class ShardedCsvWriter:
+    """
+    ``CleanedCsvWriter`` split into shards of at most ``shard_rows`` rows and/or about
+    ``shard_bytes`` uncompressed bytes, each starting with the header row. A full
+    shard is handed to ``csv_shards.finish_shard`` (compress + checksum) in a pool of
+    ``workers`` processes while the next one is written; ``close`` waits for them and
+    leaves the manifest entries, in order, in ``shards``. Files go to ``work_dir``.
+    """
+
+    def __init__(self, work_dir: Path, year: int, columns: List[str], compression: str = 'none',
+                 shard_rows: int | None = None, shard_bytes: int | None = None, workers: int = 1,
+                 engine: str = 'auto'):
+        check_compression(compression)
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.year = year
+        self.columns = list(columns)
+        self.compression = compression
+        self.shard_rows = shard_rows
+        self.shard_bytes = shard_bytes
+        self.rows = 0
+        self.shards: List[Dict[str, Any]] = []
+        self.engine = engine
+        self._engine = engine
+        self._done: List[Any] = []   # finish_shard results, or their futures
+        self._writer: CleanedCsvWriter | None = None
+        self._row_bytes: float | None = None
+        self._pool = None
+        if workers > 1:
+            # spawn: forking a process that has Arrow/pandas threads running is not safe
+            self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def _open(self) -> None:
+        name = shard_name(self.year, len(self._done), 'none') + '.partial'
+        self._writer = CleanedCsvWriter(self.work_dir / name, self.columns, engine=self._engine)
+        self._header_bytes = self._writer.bytes_written
+        self.engine = self._writer.engine
+
+    def _room(self, available: int) -> int:
+        """Rows of ``available`` that still fit in the open shard."""
+        take = available
+        if self.shard_rows:
+            take = min(take, self.shard_rows - self._writer.rows)
+        if self.shard_bytes:
+            if self._row_bytes is None:
+                return min(take, 1000)  # first rows of the file: measure before estimating
+            room = self.shard_bytes - self._writer.bytes_written
+            take = min(take, max(1, int(room / self._row_bytes)))
+        return take
+
+    def _full(self) -> bool:
+        w = self._writer
+        return bool((self.shard_rows and w.rows >= self.shard_rows)
+                    or (self.shard_bytes and w.bytes_written >= self.shard_bytes))
+
+    def _finish(self) -> None:
+        writer, self._writer = self._writer, None
+        writer.close()
+        args = (str(writer.path), str(self.work_dir / shard_name(self.year, len(self._done), self.compression)),
+                self.compression, writer.rows)
+        self._done.append(self._pool.submit(finish_shard, *args) if self._pool else finish_shard(*args))
+
+    def write(self, df: pd.DataFrame) -> None:
+        lo = 0
+        while lo < len(df):
+            if self._writer is None:
+                self._open()
+            take = self._room(len(df) - lo)
+            self._writer.write(df.iloc[lo:lo + take])
+            lo += take
+            self.rows += take
+            if self.shard_bytes:
+                self._row_bytes = (self._writer.bytes_written - self._header_bytes) / self._writer.rows
+            if self._full():
+                self._finish()
+
+    def close(self) -> None:
         try:
-            df = pd.read_csv(
-                file_path,
-                encoding=encoding,
-                dtype=str,  # Load everything as string initially
-                on_bad_lines='skip',
-                engine='python',  # More robust parsing
-                quotechar='"',
-                doublequote=True,
-                skipinitialspace=True
-            )
-            encoding_used = encoding
-            print(f"  ✅ Loaded with {encoding} encoding")
-            break
-        except Exception as e:
-            continue
-
-    if df is None:
-        raise ValueError(f"Could not read {file_path} with any encoding")
-
-    # Clean BOM from column names if present
-    if len(df.columns) > 0 and df.columns[0].startswith('\ufeff'):
-        df.columns = [df.columns[0].lstrip('\ufeff')] + list(df.columns[1:])
-
-    original_rows = len(df)
-
-    # 1. Clean column names for BigQuery compatibility
+            if self._writer is not None or not self._done:  # an empty file still gets one (header-only) shard
+                if self._writer is None:
+                    self._open()
+                self._finish()
+            self.shards = [d.result() if isinstance(d, Future) else d for d in self._done]
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def __enter__(self) -> 'ShardedCsvWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def write_cleaned_csv(df: pd.DataFrame, output_file: Path, chunksize: int = CSV_WRITE_CHUNK_ROWS,
+                      engine: str = 'auto') -> str:
+    """
+    Write ``df`` with the cleaned-CSV contract: header row, every field quoted
+    (QUOTE_ALL), '"' doubled, '\\' escaped, '' for nulls, CRLF rows, UTF-8.
+
+    Byte-for-byte the output of the former ``csv.writer`` + ``iterrows`` loop, but
+    formatted in bulk: by Arrow's C++ CSV writer when pyarrow is installed
+    (engine='auto'/'arrow'), else by ``DataFrame.to_csv``. Only columns that are not
+    already plain strings are converted first (``_as_text``). Returns the engine used.
+    """
+    with CleanedCsvWriter(output_file, df.columns.tolist(), chunksize, engine) as writer:
+        writer.write(df)
+    return writer.engine
+
+def clean_column_names(columns: List[str]) -> Dict[str, str]:
+    """Step 1: {original: cleaned} BigQuery-compatible column names."""
     cleaned_columns = {}
-    for col in df.columns:
+    for col in columns:
         # BigQuery column name rules:
         # - Must start with letter or underscore
         # - Can contain letters, numbers, underscores
@@ -75,209 +286,475 @@ def clean_csv_for_bigquery(file_path: str, year: int, output_dir: Path) -> Dict[
             counter += 1
 
         cleaned_columns[col] = clean_col
-
-    # Rename columns
-    df = df.rename(columns=cleaned_columns)
-    print(f"  📝 Cleaned {len(cleaned_columns)} column names for BigQuery")
+    return cleaned_columns
+
+def clean_chunk(df: pd.DataFrame, year: int, encoding_used: str,
+                timestamp: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Steps 2-5 on a frame whose columns are already renamed. Rows are cleaned
+    independently, so a file can be cleaned chunk by chunk; returns the frame with
+    {'empty_rows', 'outliers': {salary column: count}} for this chunk.
+    """
+    original_rows = len(df)
 
     # 2. Remove completely empty rows
     df = df.dropna(how='all')
-    empty_rows_removed = original_rows - len(df)
-    if empty_rows_removed > 0:
-        print(f"  🗑️ Removed {empty_rows_removed} completely empty rows")
+    stats = {'empty_rows': original_rows - len(df), 'outliers': {}}
 
     # 3. Clean salary fields for BigQuery compatibility
     salary_fields = ['CompTotal', 'ConvertedCompYearly']
     for col in salary_fields:
         if col in df.columns:
-            print(f"  💰 Cleaning salary field: {col}")
-            # Convert to numeric, handling scientific notation and extreme values
-            numeric_series = pd.to_numeric(df[col], errors='coerce')
+            # Convert to numeric, handling scientific notation and extreme values; always
+            # float64 so every chunk renders the same way ('85000.0')
+            values = df[col].astype(object) if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col]
+            numeric_series = pd.to_numeric(values, errors='coerce').astype('float64')
 
             # Set extreme outliers (>1e9) to null
+            stats['outliers'][col] = int((numeric_series > 1e9).sum())
             numeric_series = numeric_series.where(numeric_series <= 1e9)
 
             # Convert back to string for CSV export, preserving null as empty
             df[col] = numeric_series.astype(str).replace('nan', '')
 
-            outliers_removed = (pd.to_numeric(df[col], errors='coerce') > 1e9).sum()
-            if outliers_removed > 0:
-                print(f"    ⚠️ Removed {outliers_removed} extreme outliers (>1e9) from {col}")
-
-    # 4. Clean problematic characters that might cause CSV issues
-    for col in df.columns:
-        if col not in ['survey_year', 'processing_timestamp', 'source_encoding']:
-            # Aggressive text cleaning to prevent CSV parsing issues
-            df[col] = df[col].astype(str)
-            df[col] = df[col].str.replace('\x00', '', regex=False)
-            df[col] = df[col].str.replace('\r\n', ' ', regex=False)
-            df[col] = df[col].str.replace('\r', ' ', regex=False)
-            df[col] = df[col].str.replace('\n', ' ', regex=False)
-            df[col] = df[col].str.replace('"', "'", regex=False)  # Replace quotes
-            df[col] = df[col].replace(['nan', 'NaN', 'NULL', 'null'], '')
+    # 4. Clean problematic characters that might cause CSV issues (all text columns at once)
+    text_cols = [col for col in df.columns if col not in ['survey_year', 'processing_timestamp', 'source_encoding']]
+    if len(text_cols) == df.shape[1]:
+        df = sanitize_text(df)
+    else:
+        text = sanitize_text(df[text_cols])
+        for col in text_cols:
+            df[col] = text[col]
 
     # 5. Add metadata columns
     df['survey_year'] = year
-    df['processing_timestamp'] = pd.Timestamp.now().isoformat()
+    df['processing_timestamp'] = timestamp
     df['source_encoding'] = encoding_used
 
-    # 6. Save cleaned CSV with robust quoting
-    output_file = output_dir / f"{year}_stackoverflow_cleaned.csv"
-
-    # Use csv module for proper quoting to handle problematic text
-    import csv
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f, quoting=csv.QUOTE_ALL, escapechar='\\')
+    return df, stats
+
+_TEXT_REPLACEMENTS = (('\x00', ''), ('\r\n', ' '), ('\r', ' '), ('\n', ' '), ('"', "'"))  # in this order:
+# NULs go first so a CR and LF they separated still collapse into one space
+
+def _sanitize(text: str) -> str:
+    for old, new in _TEXT_REPLACEMENTS:
+        text = text.replace(old, new)
+    return text
+
+def _sanitize_cells(frame: pd.DataFrame) -> pd.DataFrame:
+    values = frame.to_numpy(dtype=object).ravel().tolist()
+    joined = TEXT_SEPARATOR.join(map(str, values))
+    if joined.count(TEXT_SEPARATOR) == len(values) - 1:
+        cells = _sanitize(joined).split(TEXT_SEPARATOR)
+    else:  # the separator itself occurs in the data
+        cells = [_sanitize(str(v)) for v in values]
+    cells = np.array(cells, dtype=object)
+    cells[pd.Series(cells, dtype=object).isin(NULL_TOKENS).to_numpy()] = ''
+    return pd.DataFrame(cells.reshape(frame.shape), index=frame.index, columns=frame.columns)
+
+def _sanitize_categorical(series: pd.Series) -> pd.Series:
+    """Step 4 on the categories only (once per distinct value), cells keep their codes."""
+    categories = pd.DataFrame({0: np.asarray(series.cat.categories, dtype=object)})
+    cleaned = np.append(_sanitize_cells(categories)[0].to_numpy(), '')   # '' for missing cells (code -1)
+    inverse, uniques = pd.factorize(cleaned)  # categories that clean to the same text merge
+    codes = inverse[series.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, uniques), index=series.index)
+
+def _sanitize_arrow(series: pd.Series) -> pd.Series:
+    for old, new in _TEXT_REPLACEMENTS:
+        series = series.str.replace(old, new, regex=False)
+    return series.where(series.notna() & ~series.isin(NULL_TOKENS), '')
+
+def sanitize_text(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Step 4 over every cell of ``frame``: str(value), NULs dropped, CRLF / CR / LF to a
+    space, '"' to "'", then ``NULL_TOKENS`` (and missing values) to ''. Object
+    columns are joined into one buffer, so each replacement is one C-level pass over
+    the whole batch rather than a pandas call per column (``str.translate`` leaves its
+    fast path on non-ASCII text, ``str.replace`` does not). Arrow-backed string
+    columns (pandas 3's default) are already vectorized and keep per-column kernels;
+    categorical columns (``LeanDtypes``) are cleaned once per category.
+    Returns a new frame.
+    """
+    arrow = [i for i, dtype in enumerate(frame.dtypes)
+             if isinstance(dtype, pd.StringDtype) and dtype.storage == 'pyarrow']
+    categorical = [i for i, dtype in enumerate(frame.dtypes) if isinstance(dtype, pd.CategoricalDtype)]
+    if not arrow and not categorical:
+        return _sanitize_cells(frame)
+    out = frame.copy(deep=False)
+    special = set(arrow) | set(categorical)
+    rest = [i for i in range(frame.shape[1]) if i not in special]
+    if rest:
+        cells = _sanitize_cells(frame.iloc[:, rest])
+        for k, i in enumerate(rest):
+            out.isetitem(i, cells.iloc[:, k])
+    for i in arrow:
+        out.isetitem(i, _sanitize_arrow(frame.iloc[:, i]))
+    for i in categorical:
+        out.isetitem(i, _sanitize_categorical(frame.iloc[:, i]))
+    return out
+
+def _print_clean_stats(column_count: int, empty_rows: int, outliers: Dict[str, int]) -> None:
+    print(f"  📝 Cleaned {column_count} column names for BigQuery")
+    if empty_rows > 0:
+        print(f"  🗑️ Removed {empty_rows} completely empty rows")
+    for col, removed in outliers.items():
+        print(f"  💰 Cleaned salary field: {col}")
+        if removed > 0:
+            print(f"    ⚠️ Removed {removed} extreme outliers (>1e9) from {col}")
+
+def clean_frame(df: pd.DataFrame, year: int, encoding_used: str) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """Clean a loaded frame (steps 1-5); returns it with the {original: cleaned} column mapping."""
+    cleaned_columns = clean_column_names(df.columns)
+    df, stats = clean_chunk(df.rename(columns=cleaned_columns), year, encoding_used,
+                            pd.Timestamp.now().isoformat())
+    _print_clean_stats(len(cleaned_columns), stats['empty_rows'], stats['outliers'])
+    return df, cleaned_columns
+
+def _holds_none(series: pd.Series) -> bool:
+    if series.dtype != object:
+        return False
+    values = series.to_numpy()
+    return any(v is None for v in values[pd.isna(values)])
+
+class LeanDtypes:
+    """
+    Adaptive dtype stage between ``tiered_reader`` and the cleaner. The first frame
+    read decides per column: 'category' when the first ``window`` rows (one cleaning
+    chunk, the unit every step works on) have few distinct values (at most
+    ``LEAN_CATEGORY_SHARE`` of the non-null ones: Age, OrgSize, RemoteWork, Country,
+    ...), else 'string[pyarrow]' (plain object strings without pyarrow). Later runs
+    are parsed straight into those dtypes (``read_dtype``), so no run is held as
+    object strings once the plan exists. Values are unchanged: every step downstream
+    renders a cell the same whatever its dtype. ``trim`` drops the categories a
+    chunk sliced from a run does not use. Columns of a frame that hold None
+    (fields missing from short rows, Python engine only) stay objects, since the
+    cleaner writes None as 'None' and a conversion would make it ''. ``report``
+    compares the first frame's memory as read (objects) with its memory after the
+    conversion.
+    """
+
+    def __init__(self, window: int | None = None):
+        self.window = window
+        self.plan: Dict[str, str] | None = None
+        self.first_rows = 0
+        self.before_bytes = 0
+        self.after_bytes = 0
+        self._string = 'string[pyarrow]' if pa is not None else None
+
+    def read_dtype(self) -> Any:
+        if self.plan is None:
+            return str
+        return defaultdict(lambda: str, self.plan)
+
+    def _decide(self, df: pd.DataFrame) -> pd.DataFrame:
+        self.plan = {}
+        self.first_rows = len(df)
+        self.before_bytes = int(df.memory_usage(deep=True, index=False).sum())
+        out = df.copy(deep=False)
+        for i, col in enumerate(df.columns):
+            series = df.iloc[:, i]
+            keep = _holds_none(series)
+            codes, uniques = pd.factorize(series)
+            seen = codes[:self.window]
+            if len(np.unique(seen[seen >= 0])) <= LEAN_CATEGORY_SHARE * max(int((seen >= 0).sum()), 1):
+                self.plan[col] = 'category'
+                if not keep:
+                    out.isetitem(i, pd.Series(pd.Categorical.from_codes(codes, uniques), index=series.index))
+            elif self._string is not None:
+                self.plan[col] = self._string
+                if not keep:
+                    out.isetitem(i, series.astype(self._string))
+        self.after_bytes = int(out.memory_usage(deep=True, index=False).sum())
+        return out
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """``df`` in the planned dtypes (deciding the plan on the first frame)."""
+        if self.plan is None:
+            return self._decide(df)
+        out = None
+        for i, col in enumerate(df.columns):  # parsers read the planned dtypes; this only catches strays
+            want = self.plan.get(col)
+            if want is None or df.dtypes.iloc[i] == want or _holds_none(df.iloc[:, i]):
+                continue
+            if out is None:
+                out = df.copy(deep=False)
+            out.isetitem(i, df.iloc[:, i].astype(want))
+        return df if out is None else out
+
+    def trim(self, df: pd.DataFrame) -> pd.DataFrame:
+        """``df`` with the categories it does not use dropped (a slice keeps its whole run's)."""
+        out = df
+        for i, dtype in enumerate(df.dtypes):
+            if isinstance(dtype, pd.CategoricalDtype) and len(dtype.categories) > len(df):
+                if out is df:
+                    out = df.copy(deep=False)
+                out.isetitem(i, df.iloc[:, i].cat.remove_unused_categories())
+        return out
+
+    def report(self) -> Dict[str, Any]:
+        kinds = list((self.plan or {}).values())
+        return {'categorical': kinds.count('category'), 'string': len(kinds) - kinds.count('category'),
+                'first_rows': self.first_rows, 'before_bytes': self.before_bytes, 'after_bytes': self.after_bytes}
+
+class _ReadError(Exception):
+    """Reading the raw file failed (typically the wrong encoding): retry with the next candidate."""
+
+def _read_chunks(file_path: str, encoding: str, chunksize: int, info: Dict[str, Any],
+                 dtypes: LeanDtypes | None = None) -> Iterator[pd.DataFrame]:
+    frames = iter_survey_csv(file_path, encoding, chunksize=chunksize, info=info, dtypes=dtypes)
+    while True:
+        try:
+            df = next(frames, None)
+        except Exception as e:
+            raise _ReadError(f'{type(e).__name__}: {e}') from e
+        if df is None:
+            return
+        yield df if dtypes is None else dtypes.trim(df)
+
+def _clean_stream(file_path: str, year: int, encoding: str, open_csv: Callable[[List[str]], Any] | None,
+                  staging_file: Path | None, chunksize: int, lean_dtypes: bool = True) -> Dict[str, Any]:
+    """
+    Read, clean and append ``file_path`` chunk by chunk to the CSV writer made by
+    ``open_csv(columns)`` and/or the Parquet staging file; raises ``_ReadError`` if a
+    chunk cannot be read. The (closed) CSV writer is returned as 'csv_writer'.
+    """
+    read_info: Dict[str, Any] = {}
+    dtypes = LeanDtypes(chunksize) if lean_dtypes else None
+    chunks = _read_chunks(file_path, encoding, chunksize, read_info, dtypes)
+    timestamp = pd.Timestamp.now().isoformat()
+    out = {'original_rows': 0, 'cleaned_rows': 0, 'empty_rows': 0, 'outliers': {}, 'read_info': read_info}
+    writers = []
+    inferencer = names = None
+    try:
+        for k in itertools.count():
+            with stage('load', year=year, encoding=encoding, chunk=k) as rec:
+                df = next(chunks, None)
+                rec['rows'] = None if df is None else len(df)
+            if df is None:
+                break
+            if names is None:
+                # Clean BOM from column names if present
+                columns = list(df.columns)
+                if columns and columns[0].startswith('\ufeff'):
+                    columns[0] = columns[0].lstrip('\ufeff')
+                out['column_mapping'] = clean_column_names(columns)
+                names = [out['column_mapping'][col] for col in columns]
+            out['original_rows'] += len(df)
+            with stage('clean', rows=len(df), year=year, chunk=k):
+                df.columns = names
+                df, stats = clean_chunk(df, year, encoding, timestamp)
+                if inferencer is None:
+                    inferencer = SchemaInferencer(df.columns)
+                    if open_csv is not None:
+                        writers.append(open_csv(df.columns.tolist()))
+                    if staging_file is not None:
+                        writers.append(ParquetStage(staging_file, df.columns.tolist()))
+            with stage('infer_types', rows=len(df), year=year, chunk=k):
+                inferencer.update(df)
+            with stage('write', rows=len(df), year=year, chunk=k) as rec:
+                for writer in writers:
+                    writer.write(df)
+                if open_csv is not None:
+                    rec['engine'] = writers[0].engine
+            out['cleaned_rows'] += len(df)
+            out['empty_rows'] += stats['empty_rows']
+            for col, removed in stats['outliers'].items():
+                out['outliers'][col] = out['outliers'].get(col, 0) + removed
+            del df
+    finally:
+        for writer in writers:
+            writer.close()
+    out['final_columns'] = len(inferencer.columns)
+    out['schema_inferencer'] = inferencer
+    out['csv_writer'] = writers[0] if open_csv is not None else None
+    out['dtypes'] = dtypes.report() if dtypes is not None else None
+    return out
+
+def _publish_shards(writer: ShardedCsvWriter, output_dir: Path, year: int) -> Tuple[Path, Dict[str, Any]]:
+    """
+    Move finished shards from the work directory into ``output_dir`` and write the
+    manifest. A previous run's shards (it may have had more) and single CSV are removed.
+    """
+    remove_shards(output_dir, year)
+    (output_dir / f"{year}_stackoverflow_cleaned.csv").unlink(missing_ok=True)
+    for shard in writer.shards:
+        os.replace(writer.work_dir / shard['file'], output_dir / shard['file'])
+    shutil.rmtree(writer.work_dir, ignore_errors=True)
+    manifest_file = output_dir / manifest_name(year)
+    return manifest_file, write_manifest(manifest_file, year, writer.columns, writer.compression, writer.shards)
+
+def clean_csv_for_bigquery(file_path: str, year: int, output_dir: Path,
+                           chunksize: int = CLEAN_CHUNK_ROWS, output_format: str = 'csv',
+                           shard_rows: int | None = None, shard_bytes: int | None = None,
+                           compression: str = 'none', shard_workers: int = 1,
+                           lean_dtypes: bool = True) -> Dict[str, Any]:
+    """
+    Clean a CSV file and prepare it for BigQuery upload, ``chunksize`` rows at a
+    time: peak memory is a few chunks, not the file. The CSV is written to a
+    ``.partial`` file and renamed once the whole file has been read; for Parquet
+    (``output_format`` 'parquet' / 'both') the chunks go to a string-typed staging
+    file that ``write_parquet_output`` types once the schema is known.
+
+    With ``shard_rows`` / ``shard_bytes`` / ``compression`` the CSV is written as
+    shards instead (``ShardedCsvWriter``, in a ``.shards.partial`` work directory),
+    moved into ``output_dir`` with a manifest once the whole file has been read.
+
+    ``lean_dtypes`` holds low-cardinality columns as 'category' and the rest as
+    'string[pyarrow]' while cleaning (``LeanDtypes``); the output is the same.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    check_compression(compression)
+    sharded = bool(shard_rows or shard_bytes or compression != 'none')
 
-        # Write header
-        writer.writerow(df.columns.tolist())
+    print(f"\n🔧 Processing {year} dataset...")
 
-        # Write data row by row
-        for _, row in df.iterrows():
-            writer.writerow([str(val) if pd.notna(val) else '' for val in row])
+    # Sample-based encoding decision (shared with the inventory script); the remaining
+    # candidates are only read if the full parse disagrees with the sample
+    with stage('encoding_detection', year=year) as rec:
+        detection = detect_encoding(file_path)
+        rec['bytes'] = detection['bytes_sampled']
+    print(f"  🔍 Detected {detection['encoding']} encoding (confidence {detection['confidence']:.2f})")
+    streamed = None
+    encoding_used = None
 
-    print(f"  💾 Saved cleaned CSV: {output_file}")
-    print(f"    📊 CSV uses QUOTE_ALL for robust parsing - use --skip_leading_rows=1 for BigQuery")
+    size = Path(file_path).stat().st_size
+    output_file = output_dir / f"{year}_stackoverflow_cleaned.csv" if output_format != 'parquet' else None
+    partial_file = work_dir = open_csv = None
+    if output_file is not None and sharded:
+        work_dir = output_dir / f"{year}_stackoverflow_cleaned.shards.partial"
+        open_csv = partial(ShardedCsvWriter, work_dir, year, compression=compression, shard_rows=shard_rows,
+                           shard_bytes=shard_bytes, workers=shard_workers)
+        output_file = None
+    elif output_file is not None:
+        partial_file = output_file.with_name(output_file.name + '.partial')
+        open_csv = partial(CleanedCsvWriter, partial_file)
+    staging_file = output_dir / f"{year}_stackoverflow_cleaned.parquet.staging" if output_format != 'csv' else None
+    for encoding in encoding_candidates(detection):
+        try:
+            # C engine wherever it provably agrees with the Python engine; irregular
+            # regions are re-parsed by the Python engine (same rows kept and skipped)
+            streamed = _clean_stream(file_path, year, encoding, open_csv, staging_file, chunksize, lean_dtypes)
+        except _ReadError:
+            continue
+        finally:
+            if streamed is None:
+                for leftover in (partial_file, staging_file):
+                    if leftover is not None:
+                        leftover.unlink(missing_ok=True)
+                if work_dir is not None:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+        encoding_used = encoding
+        break
+
+    if streamed is None:
+        raise ValueError(f"Could not read {file_path} with any encoding")
+    if output_file is not None:
+        partial_file.replace(output_file)
+        # a previous sharded run's manifest would make loaders and the validator use its stale shards
+        stale = remove_shards(output_dir, year)
+        if stale:
+            print(f"  🧹 Removed {len(stale)} stale shard file(s) from a previous sharded run")
+    manifest_file = manifest = None
+    if work_dir is not None:
+        with stage('publish_shards', year=year) as rec:
+            manifest_file, manifest = _publish_shards(streamed['csv_writer'], output_dir, year)
+            rec['bytes'] = manifest['total_bytes']
+
+    read_info = streamed['read_info']
+    print(f"  ✅ Loaded with {encoding_used} encoding")
+    if read_info['python_bytes'] and read_info['engine'] == 'tiered':
+        print(f"    🐢 Python engine re-parsed {read_info['python_runs']} irregular region(s) "
+              f"({read_info['python_bytes'] / 2**20:.1f} MB of {size / 2**20:.1f} MB)")
+    lean = streamed['dtypes']
+    if lean and lean['before_bytes']:
+        print(f"    🧮 Lean dtypes: {lean['categorical']} categorical / {lean['string']} string column(s); "
+              f"first {lean['first_rows']:,} rows {lean['before_bytes'] / 2**20:.1f} MB as read -> "
+              f"{lean['after_bytes'] / 2**20:.1f} MB ({lean['before_bytes'] / max(lean['after_bytes'], 1):.1f}x smaller)")
+    _print_clean_stats(len(streamed['column_mapping']), streamed['empty_rows'], streamed['outliers'])
+
+    # 6. Cleaned CSV: bulk QUOTE_ALL writer, appended chunk by chunk (same bytes as a
+    # csv.writer row loop over the whole frame)
+    if output_file is not None:
+        print(f"  💾 Saved cleaned CSV: {output_file}")
+        print(f"    📊 CSV uses QUOTE_ALL for robust parsing - use --skip_leading_rows=1 for BigQuery")
+    if manifest is not None:
+        print(f"  💾 Saved {len(manifest['shards'])} cleaned CSV shard(s) ({compression}): "
+              f"{output_dir / shard_pattern(year, compression)} ({manifest['total_bytes'] / 2**20:.1f} MB)")
+        print(f"    🧾 Manifest with rows and SHA-256 per shard: {manifest_file}")
+        print(f"    📊 Every shard has the header row - use --skip_leading_rows=1 for BigQuery")
 
     return {
         'year': year,
-        'output_file': str(output_file),
-        'original_rows': original_rows,
-        'cleaned_rows': len(df),
-        'original_columns': len(cleaned_columns),
-        'final_columns': len(df.columns),
+        'output_file': str(output_file) if output_file is not None else None,
+        'csv_manifest': str(manifest_file) if manifest_file is not None else None,
+        'csv_shards': len(manifest['shards']) if manifest is not None else None,
+        'csv_compression': compression if manifest is not None else None,
+        'parquet_staging': str(staging_file) if staging_file is not None else None,
+        'original_rows': streamed['original_rows'],
+        'cleaned_rows': streamed['cleaned_rows'],
+        'original_columns': len(streamed['column_mapping']),
+        'final_columns': streamed['final_columns'],
         'encoding_used': encoding_used,
-        'column_mapping': cleaned_columns,
-        'dataframe': df  # For schema generation
+        'encoding_confidence': detection['confidence'] if encoding_used == detection['encoding'] else None,
+        'column_mapping': streamed['column_mapping'],
+        'schema_inferencer': streamed['schema_inferencer']  # For schema generation
     }
 
-def infer_bigquery_type(series: pd.Series, column_name: str) -> Dict[str, Any]:
-    """Infer BigQuery-compatible data type from pandas series."""
-
-    # Convert to string and get non-null values for analysis
-    non_null_values = series.dropna().astype(str)
-    non_null_values = non_null_values[non_null_values != '']
-
-    if len(non_null_values) == 0:
-        return {
-            'name': column_name,
-            'type': 'STRING',
-            'mode': 'NULLABLE',
-            'description': f'Column {column_name} (all null values)'
-        }
-
-    sample_values = non_null_values.head(1000)  # Sample for performance
-
-    # Special handling for salary fields
-    if column_name in ['CompTotal', 'ConvertedCompYearly']:
-        return {
-            'name': column_name,
-            'type': 'FLOAT',
-            'mode': 'NULLABLE',
-            'description': f'Salary field: {column_name} (cleaned, outliers >1e9 removed)'
-        }
-
-    # Special handling for JobSatPoints fields (they contain decimals)
-    if column_name.startswith('JobSatPoints_'):
-        return {
-            'name': column_name,
-            'type': 'FLOAT',
-            'mode': 'NULLABLE',
-            'description': f'Job satisfaction points: {column_name} (decimal values)'
-        }
-
-    # Special handling for ResponseId - should be INTEGER for BigQuery
-    if column_name == 'ResponseId':
-        return {
-            'name': column_name,
-            'type': 'INTEGER',
-            'mode': 'NULLABLE',
-            'description': f'Response ID: {column_name}'
-        }
-
-    # Try to identify the type
-    # 1. Check for integers
+def write_parquet_output(staging_file: str, schema_file: str, year: int, output_dir: Path) -> Dict[str, Any]:
+    """Type the staged chunks with the BigQuery schema and write ``{year}_stackoverflow_cleaned.parquet``."""
+    parquet_file = output_dir / f"{year}_stackoverflow_cleaned.parquet"
+    with open(schema_file, 'r', encoding='utf-8') as f:
+        schema_fields = json.load(f)
     try:
-        pd.to_numeric(sample_values, errors='raise').astype(int)
-        return {
-            'name': column_name,
-            'type': 'INTEGER',
-            'mode': 'NULLABLE',
-            'description': f'Integer column: {column_name}'
-        }
-    except (ValueError, OverflowError):
-        pass
+        info = write_typed_parquet(Path(staging_file), parquet_file, schema_fields)
+    finally:
+        Path(staging_file).unlink(missing_ok=True)
+    print(f"  🧱 Saved typed Parquet: {parquet_file} ({info['row_groups']} row group(s), "
+          f"{info['bytes'] / 2**20:.1f} MB)")
+    for col, n in info['coerced'].items():
+        print(f"    ⚠️ {n} value(s) in {col} did not fit its schema type and were written as null")
+    return {'parquet_file': str(parquet_file), 'parquet_row_groups': info['row_groups'],
+            'parquet_bytes': info['bytes'], 'parquet_coerced': info['coerced']}
 
-    # 2. Check for floats
-    try:
-        numeric_vals = pd.to_numeric(sample_values, errors='raise')
-        if not all(numeric_vals.apply(lambda x: x.is_integer())):
-            return {
-                'name': column_name,
-                'type': 'FLOAT',
-                'mode': 'NULLABLE',
-                'description': f'Float column: {column_name}'
-            }
-    except (ValueError, OverflowError):
-        pass
-
-    # 3. Check for booleans
-    bool_values = {'true', 'false', 'yes', 'no', '1', '0', 'y', 'n'}
-    unique_lower = set(sample_values.str.lower().unique())
-    if unique_lower.issubset(bool_values) and len(unique_lower) <= 4:
-        return {
-            'name': column_name,
-            'type': 'BOOLEAN',
-            'mode': 'NULLABLE',
-            'description': f'Boolean column: {column_name}'
-        }
-
-    # 4. Check for dates
-    date_patterns = [
-        r'^\d{4}-\d{2}-\d{2}$',  # YYYY-MM-DD
-        r'^\d{1,2}[/-]\d{1,2}[/-]\d{2,4}$',  # MM/DD/YYYY or MM-DD-YYYY
-        r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}',  # ISO datetime
-    ]
-
-    for pattern in date_patterns:
-        if sample_values.str.match(pattern).mean() > 0.7:
-            return {
-                'name': column_name,
-                'type': 'TIMESTAMP',
-                'mode': 'NULLABLE',
-                'description': f'Timestamp column: {column_name}'
-            }
-
-    # 5. Default to STRING
-    return {
-        'name': column_name,
-        'type': 'STRING',
-        'mode': 'NULLABLE',
-        'description': f'String column: {column_name}'
-    }
+def infer_bigquery_type(series: pd.Series, column_name: str) -> Dict[str, Any]:
+    """Infer BigQuery-compatible data type from pandas series (all of it; see ``schema_inference``)."""
+    evidence = ColumnEvidence()
+    evidence.update(series)
+    return decide(column_name, evidence)[0]
 
-def generate_bigquery_schema(df: pd.DataFrame, year: int, output_dir: Path,
+def generate_bigquery_schema(inferencer: SchemaInferencer | pd.DataFrame, year: int, output_dir: Path,
                            column_mapping: Dict[str, str]) -> str:
-    """Generate BigQuery schema JSON file."""
+    """
+    Generate BigQuery schema JSON file from a ``SchemaInferencer`` (or a whole cleaned
+    frame): types decided on every value of every column, with per-column confidence
+    kept in the legacy schema file and low-confidence columns reported.
+    """
 
     print(f"  📋 Generating BigQuery schema for {year}...")
 
-    schema_fields = []
+    if isinstance(inferencer, pd.DataFrame):
+        frame, inferencer = inferencer, SchemaInferencer(inferencer.columns)
+        inferencer.update(frame)
 
-    for col in df.columns:
-        field_info = infer_bigquery_type(df[col], col)
+    # {cleaned: original}, first original wins as in the former reverse scan
+    original_names: Dict[str, str] = {}
+    for orig, clean in column_mapping.items():
+        original_names.setdefault(clean, orig)
 
-        # Add original column name in description if it was changed
-        original_name = None
-        for orig, clean in column_mapping.items():
-            if clean == col:
-                original_name = orig
-                break
+    schema_fields = []
+    type_inference = {}
 
+    for col, (field_info, confidence) in zip(inferencer.columns, inferencer.fields()):
+        # Add original column name in description if it was changed
+        original_name = original_names.get(col)
         if original_name and original_name != col:
             field_info['description'] += f' (originally: {original_name})'
 
         schema_fields.append(field_info)
+        type_inference[col] = {'type': field_info['type'], 'confidence': round(confidence, 6),
+                               **inferencer.evidence[col].as_dict()}
 
     # Save BigQuery-compatible schema (top-level array)
     schema_file = output_dir / f"{year}_stackoverflow_bq_schema.json"
@@ -286,6 +763,14 @@ def generate_bigquery_schema(df: pd.DataFrame, year: int, output_dir: Path,
 
     print(f"  📄 Saved BigQuery schema: {schema_file}")
     print(f"    🎯 Schema format: top-level array (BigQuery compatible)")
+    print(f"    🔬 Types inferred from all {inferencer.rows:,} rows of every column")
+    doubtful = [(col, info) for col, info in type_inference.items() if info['confidence'] < LOW_CONFIDENCE]
+    for col, info in doubtful[:10]:
+        print(f"    ⚠️ {col}: {info['type']} with {info['confidence']:.1%} confidence "
+              f"({info['values']:,} values: {info['integer']:,} integer, {info['float']:,} numeric, "
+              f"{info['boolean']:,} boolean, {info['timestamp']:,} date-like)")
+    if len(doubtful) > 10:
+        print(f"    ⚠️ ... and {len(doubtful) - 10} more low-confidence column(s), see {year}_stackoverflow_schema.json")
 
     # Also save the old format for reference
     legacy_schema = {
@@ -296,6 +781,8 @@ def generate_bigquery_schema(df: pd.DataFrame, year: int, output_dir: Path,
             'year': year,
             'total_fields': len(schema_fields),
             'generated_timestamp': pd.Timestamp.now().isoformat(),
+            'rows_inferred': inferencer.rows,
+            'type_inference': type_inference,
             'source': f'{year}_stackoverflow_cleaned.csv',
             'table_description': f'StackOverflow Developer Survey {year} - Cleaned and processed for analysis'
         }
@@ -322,10 +809,16 @@ The following files have been processed and are ready for BigQuery:
 
     for result in results:
         year = result['year']
+        files = f"- **CSV File:** `{year}_stackoverflow_cleaned.csv`\n" if result.get('output_file') else ''
+        if result.get('csv_manifest'):
+            files += (f"- **CSV Shards:** {result['csv_shards']} × `{shard_pattern(year, result['csv_compression'])}` "
+                      f"(manifest: `{manifest_name(year)}`)\n")
+        if result.get('parquet_file'):
+            files += (f"- **Parquet File:** `{year}_stackoverflow_cleaned.parquet` (typed, zstd, "
+                      f"{result['parquet_row_groups']} row groups)\n")
         md_content += f"""
 ### {year} Dataset
-- **CSV File:** `{year}_stackoverflow_cleaned.csv`
-- **BigQuery Schema:** `{year}_stackoverflow_bq_schema.json`
+{files}- **BigQuery Schema:** `{year}_stackoverflow_bq_schema.json`
 - **Legacy Schema:** `{year}_stackoverflow_schema.json`
 - **Rows:** {result['cleaned_rows']:,} (from {result['original_rows']:,} original)
 - **Columns:** {result['final_columns']} (cleaned from {result['original_columns']} original)
@@ -391,7 +884,60 @@ bq load \\
   stackoverflow_survey.survey_2025 \\
   2025_stackoverflow_cleaned.csv
 ```
+"""
 
+    sharded = [r for r in results if r.get('csv_manifest')]
+    if sharded:
+        md_content += """
+### Option 2c: Command Line, Sharded CSV (bq tool)
+
+Each shard is a complete CSV with the header row; the manifest lists every shard with
+its row count and SHA-256. Check them before loading (`python validate_bq_format.py`
+verifies checksums and row counts against the manifest). BigQuery reads gzip CSVs but
+not zstd ones: use `--compress gzip` for shards meant for `bq load`.
+
+```bash
+"""
+        for r in sharded:
+            year, pattern = r['year'], shard_pattern(r['year'], r['csv_compression'])
+            md_content += f"""# Load {year} data: stage the shards in Cloud Storage, one load job reads them in parallel
+gsutil -m cp {pattern} {manifest_name(year)} gs://YOUR_BUCKET/{year}/
+bq load \\
+  --source_format=CSV \\
+  --skip_leading_rows=1 \\
+  --max_bad_records=0 \\
+  --schema={year}_stackoverflow_bq_schema.json \\
+  stackoverflow_survey.survey_{year} \\
+  "gs://YOUR_BUCKET/{year}/{pattern}"
+
+"""
+        md_content += """```
+"""
+
+    parquet_years = [r['year'] for r in results if r.get('parquet_file')]
+    if parquet_years:
+        md_content += """
+### Option 2b: Command Line, Parquet (bq tool)
+
+Parquet files carry their own typed schema (INTEGER / FLOAT / BOOLEAN / TIMESTAMP as
+inferred, strings dictionary-encoded), so no `--schema` or header flags are needed.
+They load faster than the CSVs; apply the column descriptions afterwards with `bq update`.
+
+```bash
+"""
+        for year in parquet_years:
+            md_content += f"""# Load {year} data
+bq load \\
+  --source_format=PARQUET \\
+  stackoverflow_survey.survey_{year} \\
+  {year}_stackoverflow_cleaned.parquet
+bq update stackoverflow_survey.survey_{year} {year}_stackoverflow_bq_schema.json
+
+"""
+        md_content += """```
+"""
+
+    md_content += """
 ### Option 3: Create Combined Table
 
 ```sql
@@ -450,7 +996,37 @@ def main():
     parser.add_argument('--output-dir', type=str,
                        default='../../coursework/google-data-analytics/ai_workplace_productivity_analysis/data/processed',
                        help='Output directory for cleaned files')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv',
+                       help='Cleaned output: QUOTE_ALL CSV, typed Parquet, or both (Parquet needs pyarrow)')
+    parser.add_argument('--chunksize', type=int, default=CLEAN_CHUNK_ROWS,
+                       help=f'Rows read, cleaned and written at a time (default: {CLEAN_CHUNK_ROWS})')
+    parser.add_argument('--shard-rows', type=int, default=None,
+                       help='Split each cleaned CSV into shards of at most N rows (with a manifest)')
+    parser.add_argument('--shard-mb', type=float, default=None,
+                       help='Split each cleaned CSV into shards of about N MB uncompressed (with a manifest)')
+    parser.add_argument('--compress', choices=SHARD_COMPRESSIONS, default='none',
+                       help='Compress CSV shards: gzip (loadable by bq) or zstd (needs pyarrow); implies sharding')
+    parser.add_argument('--shard-workers', type=int, default=SHARD_WORKERS,
+                       help=f'Processes compressing and checksumming shards (default: {SHARD_WORKERS})')
+    parser.add_argument('--no-lean-dtypes', action='store_true',
+                       help='Hold every column as plain strings while cleaning (no category / string[pyarrow])')
+    parser.add_argument('--trace', type=str, default=None,
+                       help='Append per-stage timing/throughput/memory as JSON lines to this file')
+    parser.add_argument('--trace-python-alloc', action='store_true',
+                       help='With --trace, also record peak Python allocations per stage (tracemalloc; slower)')
     args = parser.parse_args()
+    if args.format != 'csv' and pa is None:
+        parser.error(f"--format {args.format} requires pyarrow")
+    sharding = args.shard_rows is not None or args.shard_mb is not None or args.compress != 'none'
+    if sharding and args.format == 'parquet':
+        parser.error("--shard-rows/--shard-mb/--compress apply to CSV output (--format csv or both)")
+    if (args.shard_rows is not None and args.shard_rows < 1) or (args.shard_mb is not None and args.shard_mb <= 0):
+        parser.error("--shard-rows and --shard-mb must be positive")
+    if args.compress == 'zstd' and pa is None:
+        parser.error("--compress zstd requires pyarrow")
+
+    if enable_trace(args.trace, python_alloc=args.trace_python_alloc):
+        print(f"⏱️ Tracing stages to {args.trace}")
 
     raw_dir = Path(args.raw_dir)
     output_dir = Path(args.output_dir)
@@ -474,19 +1050,31 @@ def main():
             continue
 
         try:
-            result = clean_csv_for_bigquery(str(file_path), year, output_dir)
-
-            # Generate schema
-            schema_file = generate_bigquery_schema(
-                result['dataframe'],
-                year,
-                output_dir,
-                result['column_mapping']
-            )
+            with stage('clean_csv_for_bigquery', nbytes=file_path.stat().st_size, year=year,
+                       file=str(file_path)) as rec:
+                result = clean_csv_for_bigquery(str(file_path), year, output_dir, chunksize=args.chunksize,
+                                                output_format=args.format, shard_rows=args.shard_rows,
+                                                shard_bytes=int(args.shard_mb * 2**20) if args.shard_mb else None,
+                                                compression=args.compress, shard_workers=args.shard_workers,
+                                                lean_dtypes=not args.no_lean_dtypes)
+                rec['rows'] = result['original_rows']
+
+            # Generate schema from the samples collected while streaming
+            with stage('generate_schema', rows=result['cleaned_rows'], year=year):
+                schema_file = generate_bigquery_schema(
+                    result.pop('schema_inferencer'),
+                    year,
+                    output_dir,
+                    result['column_mapping']
+                )
             result['schema_file'] = schema_file
 
-            # Remove dataframe from result (too large to keep)
-            del result['dataframe']
+            # Typed Parquet from the staged chunks, now that the schema is known
+            staging_file = result.pop('parquet_staging')
+            if staging_file:
+                with stage('write_parquet', rows=result['cleaned_rows'], year=year) as rec:
+                    result.update(write_parquet_output(staging_file, schema_file, year, output_dir))
+                    rec['bytes'] = result['parquet_bytes']
             results.append(result)
 
             print(f"  ✅ {year} processing complete")
@@ -1,19 +1,35 @@
 #!/usr/bin/env python3
 """
-Generate a simple Column Intersection for Baseline (2023 ∩ 2024)
+Generate a simple Column Intersection for Baseline (2023 ∩ 2024, or --years ...)
 
-Reads the per-year JSONs created by the Pass-1 inventory script:
+Reads column names from the Pass-1 profile store (docs/profile_store.sqlite),
+falling back to the per-year JSONs created by the Pass-1 inventory script:
   docs/data_dictionary_2023.json
   docs/data_dictionary_2024.json
 
 Writes:
-  docs/column_intersection.md  — columns present in BOTH years
+  docs/column_intersection.md  — columns present in ALL the years
+
+--renames applies a reviewed renames file (column_renames_suggested.json from
+generate_comprehensive_analysis.py): renamed columns count under their latest name.
 """
 
 import json
 from pathlib import Path
 import argparse
 
+from profile_store import find_store, read_datasets, column_names
+from column_index import ColumnIndex
+from column_renames import load_renames, apply_renames
+
+def load_cols_from_store(store: Path, year: int):
+    """Names-only projection of one year from the profile store."""
+    data = read_datasets(store, years=[year]).get(year)
+    if data is None or not data.get('loaded_ok'):
+        error = data.get('error', 'unknown') if data else 'not in profile store'
+        return set(), f"Year {year} not loaded: {error or 'unknown'}"
+    return column_names(store, years=[year]).get(year, set()), None
+
 def load_cols(json_path: Path):
     data = json.loads(json_path.read_text(encoding='utf-8'))
     if not data.get('loaded_ok'):
@@ -21,44 +37,47 @@ def load_cols(json_path: Path):
     cols = {c['name'] for c in data.get('columns', [])}
     return cols, None
 
-def write_md(cols, out_md: Path, note_2023=None, note_2024=None):
-    header = "# Baseline Column Intersection (2023 ∩ 2024)\n\n"
-    notes = ""
-    if note_2023:
-        notes += f"> 2023 note: {note_2023}\n\n"
-    if note_2024:
-        notes += f"> 2024 note: {note_2024}\n\n"
+def write_md(cols, out_md: Path, notes: dict):
+    """``notes``: {year: load note or None}, in year order."""
+    header = f"# Baseline Column Intersection ({' ∩ '.join(str(year) for year in notes)})\n\n"
+    notes_md = "".join(f"> {year} note: {note}\n\n" for year, note in notes.items() if note)
     table_header = "| Column Name |\n|-------------|\n"
     rows = "\n".join(f"| `{c}` |" for c in sorted(cols))
     out_md.parent.mkdir(parents=True, exist_ok=True)
-    out_md.write_text(header + notes + table_header + rows + "\n", encoding='utf-8')
+    out_md.write_text(header + notes_md + table_header + rows + "\n", encoding='utf-8')
 
 def main():
-    ap = argparse.ArgumentParser(description="Generate column_intersection.md for 2023 & 2024")
+    ap = argparse.ArgumentParser(description="Generate column_intersection.md for the baseline years (default 2023 & 2024)")
     ap.add_argument("--docsdir", type=str, default="docs", help="Directory where data_dictionary_*.json live")
+    ap.add_argument("--years", type=int, nargs='+', default=[2023, 2024], help="Years to intersect (default: 2023 2024)")
+    ap.add_argument("--renames", type=str, default=None, help="Reviewed renames file; entries marked \"apply\" are merged")
     args = ap.parse_args()
     docs = Path(args.docsdir)
-
-    j2023 = docs / "data_dictionary_2023.json"
-    j2024 = docs / "data_dictionary_2024.json"
+    years = sorted(set(args.years))
     outmd = docs / "column_intersection.md"
 
-    # If per-year files missing, attempt to synthesize them from the combined JSON
-    if not j2023.exists() or not j2024.exists():
-        combined = docs / "data_dictionary.json"
-        if not combined.exists():
-            raise SystemExit("Missing per-year and combined JSON. Run Pass-1 inventory first.")
-        data_all = json.loads(combined.read_text(encoding='utf-8'))
-        by_year = {d.get('year'): d for d in data_all if isinstance(d, dict) and d.get('year') in (2023, 2024)}
-        if 2023 in by_year:
-            (docs / "data_dictionary_2023.json").write_text(json.dumps(by_year[2023], indent=2), encoding='utf-8')
-        if 2024 in by_year:
-            (docs / "data_dictionary_2024.json").write_text(json.dumps(by_year[2024], indent=2), encoding='utf-8')
-    # Reload paths (in case we just wrote them)
-    cols23, note23 = load_cols(docs / "data_dictionary_2023.json")
-    cols24, note24 = load_cols(docs / "data_dictionary_2024.json")
-    intersection = cols23 & cols24
-    write_md(intersection, outmd, note_2023=note23, note_2024=note24)
+    store = find_store(docs)
+    if store is not None:
+        loaded = {year: load_cols_from_store(store, year) for year in years}
+    else:
+        # If per-year files missing, attempt to synthesize them from the combined JSON
+        if not all((docs / f"data_dictionary_{year}.json").exists() for year in years):
+            combined = docs / "data_dictionary.json"
+            if not combined.exists():
+                raise SystemExit("Missing per-year and combined JSON. Run Pass-1 inventory first.")
+            data_all = json.loads(combined.read_text(encoding='utf-8'))
+            by_year = {d.get('year'): d for d in data_all if isinstance(d, dict) and d.get('year') in years}
+            for year, data in by_year.items():
+                (docs / f"data_dictionary_{year}.json").write_text(json.dumps(data, indent=2), encoding='utf-8')
+        # Reload paths (in case we just wrote them)
+        loaded = {year: load_cols(docs / f"data_dictionary_{year}.json") for year in years}
+
+    columns = {year: cols for year, (cols, _) in loaded.items()}
+    if args.renames:
+        columns = apply_renames(columns, load_renames(Path(args.renames)))
+    index = ColumnIndex(columns)
+    intersection = index.all_of(years)
+    write_md(intersection, outmd, {year: note for year, (_, note) in loaded.items()})
     print(f"Wrote {outmd} with {len(intersection)} columns in the intersection.")
 
 if __name__ == "__main__":
@@ -1,16 +1,61 @@
 #!/usr/bin/env python3
 """
-Comprehensive Column Analysis Across All Years (2023, 2024, 2025)
+Comprehensive Column Analysis Across All Years (2023, 2024, 2025, ...)
 
 Generates EDA-ready documentation and SQL guidance for multi-year analysis.
 Analyzes column intersections, availability patterns, and provides practical guidance.
+Years come from the data: intersections are queries on a ``column_index.ColumnIndex``,
+so a new survey year needs a data dictionary, not new set expressions.
+Also reports cross-year distribution drift per shared column from the stored Pass-1
+sketches (``profile_drift``), without reloading the raw CSVs, and suggests columns
+renamed between years (``column_renames``); ``--renames`` applies a reviewed mapping
+before the intersections are computed.
 """
 
 import json
 import argparse
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, Set, List, Any
+from typing import Dict, Set, List, Any, Tuple
+
+from profile_store import find_store, read_datasets, read_columns
+from profile_drift import load_year_sketches, compare_years, drift_score
+from column_index import ColumnIndex
+from column_renames import (suggest_renames, write_suggestions, load_renames, apply_renames,
+                            NAME_MIN, NAME_WEIGHT, APPLY_MIN)
+
+AI_FIRST_YEAR = 2024  # AI questions started in 2024
+YEAR_FOCUS = {  # what each year's own columns are about (intersection report)
+    2023: 'Pre-AI baseline features',
+    2024: 'Early AI adoption questions',
+    2025: 'Advanced AI agent features',
+}
+YEAR_ROLE = {  # sample considerations
+    2023: 'pre-AI baseline',
+    2024: 'early AI adoption',
+    2025: 'mature AI adoption',
+}
+PAIR_USE = {  # (label, use case) of a two-year intersection
+    (2023, 2024): ('baseline', 'Pre-AI adoption comparison'),
+    (2024, 2025): ('recent', 'Recent AI adoption trends'),
+    (2023, 2025): ('evolution', 'Long-term changes'),
+}
+
+def load_from_store(docs_dir: Path) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, Dict[str, Dict]]] | None:
+    """
+    (data_by_year, columns_by_year) from profile_store.sqlite, reading only the dataset
+    fields and column stats this report uses. None when no current store exists.
+    """
+    store = find_store(docs_dir)
+    if store is None:
+        return None
+    data_by_year = read_datasets(store, loaded_only=True)
+    fields = ('index', 'null_pct', 'is_numeric', 'looks_like_date', 'is_multiselect', 'unique_approx', 'examples')
+    columns_by_year = read_columns(store, fields=fields, years=data_by_year.keys())
+    for cols in columns_by_year.values():
+        for info in cols.values():
+            info['examples'] = info['examples'][:3]  # First 3 examples
+    return data_by_year, {year: columns_by_year.get(year, {}) for year in data_by_year}
 
 def load_column_data(docs_dir: Path) -> Dict[int, Dict[str, Any]]:
     """Load column data from data dictionary files."""
@@ -27,9 +72,10 @@ def load_column_data(docs_dir: Path) -> Dict[int, Dict[str, Any]]:
                     data_by_year[year] = year_data
 
     # Also try individual files as fallback/validation
-    for year in [2023, 2024, 2025]:
-        year_file = docs_dir / f'data_dictionary_{year}.json'
-        if year_file.exists() and year not in data_by_year:
+    for year_file in sorted(docs_dir.glob('data_dictionary_*.json')):
+        year = year_file.stem.rsplit('_', 1)[-1]
+        year = int(year) if year.isdigit() else None
+        if year is not None and year not in data_by_year:
             with open(year_file, 'r') as f:
                 year_data = json.load(f)
                 if year_data.get('loaded_ok'):
@@ -59,32 +105,16 @@ def extract_column_info(data_by_year: Dict[int, Dict[str, Any]]) -> Dict[int, Di
     return columns_by_year
 
 def calculate_intersections(columns_by_year: Dict[int, Dict[str, Dict]]) -> Dict[str, Set[str]]:
-    """Calculate all possible column intersections."""
-    intersections = {}
+    """
+    Every column intersection (``ColumnIndex.intersections``): all_years, union_all,
+    '{a}_{b}' (in both), only_{a}, '{a}_{b}_not_{c}' (exactly a and b), ...
+    """
+    return ColumnIndex({year: cols.keys() for year, cols in columns_by_year.items()}).intersections()
 
-    # Get column names by year
-    cols_2023 = set(columns_by_year.get(2023, {}).keys())
-    cols_2024 = set(columns_by_year.get(2024, {}).keys())
-    cols_2025 = set(columns_by_year.get(2025, {}).keys())
-
-    # All combinations
-    intersections['all_three'] = cols_2023 & cols_2024 & cols_2025
-    intersections['2023_2024'] = cols_2023 & cols_2024
-    intersections['2023_2025'] = cols_2023 & cols_2025
-    intersections['2024_2025'] = cols_2024 & cols_2025
-    intersections['union_all'] = cols_2023 | cols_2024 | cols_2025
-
-    # Year-specific (not in others)
-    intersections['only_2023'] = cols_2023 - cols_2024 - cols_2025
-    intersections['only_2024'] = cols_2024 - cols_2023 - cols_2025
-    intersections['only_2025'] = cols_2025 - cols_2023 - cols_2024
-
-    # Two-year combinations (not in third)
-    intersections['2023_2024_not_2025'] = (cols_2023 & cols_2024) - cols_2025
-    intersections['2023_2025_not_2024'] = (cols_2023 & cols_2025) - cols_2024
-    intersections['2024_2025_not_2023'] = (cols_2024 & cols_2025) - cols_2023
-
-    return intersections
+def _pairs_in_report_order(years: List[int]) -> List[Tuple[int, int]]:
+    """Two-year combinations, consecutive years first."""
+    pairs = [(a, b) for i, a in enumerate(years) for b in years[i + 1:]]
+    return sorted(pairs, key=lambda p: (years.index(p[1]) - years.index(p[0]), p[0]))
 
 def categorize_columns_for_analysis(columns_by_year: Dict[int, Dict[str, Dict]],
                                   intersections: Dict[str, Set[str]]) -> Dict[str, List[str]]:
@@ -137,15 +167,36 @@ def categorize_columns_for_analysis(columns_by_year: Dict[int, Dict[str, Dict]],
 def generate_comprehensive_overview(docs_dir: Path, data_by_year: Dict[int, Dict[str, Any]],
                                   columns_by_year: Dict[int, Dict[str, Dict]],
                                   intersections: Dict[str, Set[str]],
-                                  categories: Dict[str, List[str]]) -> None:
-    """Generate comprehensive analysis overview."""
+                                  categories: Dict[str, List[str]],
+                                  renames: Dict[str, str] | None = None) -> None:
+    """Generate comprehensive analysis overview (``renames``: applied {old: new} names)."""
 
     output_file = docs_dir / 'comprehensive_column_analysis.md'
 
     # Get row counts
     row_counts = {year: data['rows_loaded'] for year, data in data_by_year.items()}
-
-    md_content = f"""# Comprehensive Column Analysis: 2023-2025 StackOverflow Survey
+    years = sorted(data_by_year)
+    year_list = ', '.join(map(str, years))
+    baseline, recent = years[:2], years[-2:]  # first two years; latest two (AI era)
+    ai_years = ', '.join(str(y) for y in years if y >= AI_FIRST_YEAR)
+
+    overview_rows = ''.join(
+        f"| {year} | {row_counts.get(year, 'N/A'):,} | {len(columns_by_year.get(year, {})):,} | ✅ Clean | "
+        f"{data_by_year.get(year, {}).get('file_size_mb', 'N/A')} MB |\n" for year in years)
+    pair_rows = ''
+    for a, b in _pairs_in_report_order(years):
+        label, use = PAIR_USE.get((a, b), ('', 'Year-over-year comparison' if years.index(b) == years.index(a) + 1
+                                            else 'Long-term changes'))
+        pair_rows += f"| {a} ∩ {b}{f' ({label})' if label else ''} | {len(intersections[f'{a}_{b}'])} | {use} |\n"
+    only_rows = ''.join(f"| {year} only | {len(intersections[f'only_{year}'])} | {YEAR_FOCUS.get(year, '—')} |\n"
+                        for year in years)
+    renamed_md = ''
+    if renames:
+        renamed_md = "### **Renamed Columns (Merged)**\n\n| Earlier Name | Counted As |\n|--------------|------------|\n"
+        renamed_md += ''.join(f"| `{old}` | `{new}` |\n" for old, new in sorted(renames.items()))
+        renamed_md += '\n'
+
+    md_content = f"""# Comprehensive Column Analysis: {years[0]}-{years[-1]} StackOverflow Survey
 
 **Generated:** Auto-generated analysis for EDA and SQL query planning
 
@@ -153,10 +204,7 @@ def generate_comprehensive_overview(docs_dir: Path, data_by_year: Dict[int, Dict
 
 | Year | Rows | Columns | Status | File Size |
 |------|------|---------|--------|-----------|
-| 2023 | {row_counts.get(2023, 'N/A'):,} | {len(columns_by_year.get(2023, {})):,} | ✅ Clean | {data_by_year.get(2023, {}).get('file_size_mb', 'N/A')} MB |
-| 2024 | {row_counts.get(2024, 'N/A'):,} | {len(columns_by_year.get(2024, {})):,} | ✅ Clean | {data_by_year.get(2024, {}).get('file_size_mb', 'N/A')} MB |
-| 2025 | {row_counts.get(2025, 'N/A'):,} | {len(columns_by_year.get(2025, {})):,} | ✅ Clean | {data_by_year.get(2025, {}).get('file_size_mb', 'N/A')} MB |
-
+{overview_rows}
 **Total unique columns across all years:** {len(intersections['union_all']):,}
 
 ## 🎯 **Column Intersection Analysis**
@@ -165,36 +213,30 @@ def generate_comprehensive_overview(docs_dir: Path, data_by_year: Dict[int, Dict
 
 | Intersection Type | Count | Use Case |
 |------------------|-------|----------|
-| **All 3 years** (2023 ∩ 2024 ∩ 2025) | **{len(intersections['all_three'])}** | **Longitudinal trends, core metrics** |
-| 2023 ∩ 2024 (baseline) | {len(intersections['2023_2024'])} | Pre-AI adoption comparison |
-| 2024 ∩ 2025 (recent) | {len(intersections['2024_2025'])} | Recent AI adoption trends |
-| 2023 ∩ 2025 (evolution) | {len(intersections['2023_2025'])} | Long-term changes |
-
+| **All {len(years)} years** ({' ∩ '.join(map(str, years))}) | **{len(intersections['all_years'])}** | **Longitudinal trends, core metrics** |
+{pair_rows}
 ### **Year-Specific Columns (New Features)**
 
 | Year | Unique Columns | Key Focus Areas |
 |------|----------------|-----------------|
-| 2023 only | {len(intersections['only_2023'])} | Pre-AI baseline features |
-| 2024 only | {len(intersections['only_2024'])} | Early AI adoption questions |
-| 2025 only | {len(intersections['only_2025'])} | Advanced AI agent features |
-
-## 🔍 **EDA Strategy by Analysis Type**
+{only_rows}
+{renamed_md}## 🔍 **EDA Strategy by Analysis Type**
 
-### **1. Longitudinal Analysis (All 3 Years)**
-**Use these {len(intersections['all_three'])} core columns for trend analysis:**
+### **1. Longitudinal Analysis (All {len(years)} Years)**
+**Use these {len(intersections['all_years'])} core columns for trend analysis:**
 
 ```sql
 -- Core demographic and experience trends
 SELECT year, Age, DevType, YearsCodePro, Employment, RemoteWork
 FROM combined_data
-WHERE year IN (2023, 2024, 2025);
+WHERE year IN ({year_list});
 ```
 
 **Key columns available in all years:**
 """
 
     # Add core columns available in all years
-    core_cols = sorted(intersections['all_three'])
+    core_cols = sorted(intersections['all_years'])
     for i, col in enumerate(core_cols):
         if i % 4 == 0:
             md_content += "\n- "
@@ -204,21 +246,21 @@ WHERE year IN (2023, 2024, 2025);
 
     md_content += f"""
 
-### **2. AI Adoption Analysis (2024-2025 Focus)**
-**Use these {len(intersections['2024_2025'])} columns for AI trend analysis:**
+### **2. AI Adoption Analysis ({recent[0]}-{recent[-1]} Focus)**
+**Use these {len(intersections.get('_'.join(map(str, recent)), ()))} columns for AI trend analysis:**
 
 ```sql
 -- AI tool usage evolution
 SELECT year, AISelect, AIAcc, AIComplex,
        COUNT(*) as respondents
 FROM combined_data
-WHERE year IN (2024, 2025)
+WHERE year IN ({', '.join(map(str, recent))})
   AND AISelect IS NOT NULL
 GROUP BY year, AISelect, AIAcc, AIComplex;
 ```
 
-### **3. Baseline Comparison (2023 vs 2024)**
-**Use these {len(intersections['2023_2024'])} columns for pre/early AI adoption:**
+### **3. Baseline Comparison ({baseline[0]} vs {baseline[-1]})**
+**Use these {len(intersections.get('_'.join(map(str, baseline)), ()))} columns for pre/early AI adoption:**
 
 ```sql
 -- Pre-AI vs Early AI adoption productivity metrics
@@ -227,7 +269,7 @@ SELECT year,
        AVG(CASE WHEN YearsCodePro ~ '^[0-9]+$'
                 THEN CAST(YearsCodePro AS INTEGER) END) as avg_experience
 FROM combined_data
-WHERE year IN (2023, 2024)
+WHERE year IN ({', '.join(map(str, baseline))})
   AND ConvertedCompYearly IS NOT NULL
 GROUP BY year;
 ```
@@ -260,7 +302,7 @@ GROUP BY year;
             # Add availability info for each column
             for col in sorted(cols)[:10]:  # Limit to first 10 to keep readable
                 availability = []
-                for year in [2023, 2024, 2025]:
+                for year in years:
                     if col in columns_by_year.get(year, {}):
                         availability.append(str(year))
 
@@ -277,11 +319,8 @@ GROUP BY year;
 ```sql
 -- Union all years with year identifier
 CREATE VIEW combined_survey AS
-SELECT *, 2023 as survey_year FROM stackoverflow_2023
-UNION ALL
-SELECT *, 2024 as survey_year FROM stackoverflow_2024
-UNION ALL
-SELECT *, 2025 as survey_year FROM stackoverflow_2025;
+{chr(10).join(f"{'UNION ALL' + chr(10) if i else ''}SELECT *, {year} as survey_year FROM stackoverflow_{year}"
+              for i, year in enumerate(years))};
 ```
 
 ### **AI Adoption Trend Analysis**
@@ -293,7 +332,7 @@ WITH ai_adoption AS (
          COUNT(*) as respondents,
          COUNT(*) * 100.0 / SUM(COUNT(*)) OVER (PARTITION BY survey_year) as percentage
   FROM combined_survey
-  WHERE survey_year IN (2024, 2025)  -- AI questions started in 2024
+  WHERE survey_year IN ({ai_years})  -- AI questions started in {AI_FIRST_YEAR}
     AND AISelect IS NOT NULL
   GROUP BY survey_year, AISelect
 )
@@ -311,7 +350,7 @@ SELECT
   AVG(ConvertedCompYearly) as avg_salary,
   PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY ConvertedCompYearly) as median_salary
 FROM combined_survey
-WHERE survey_year IN (2024, 2025)
+WHERE survey_year IN ({ai_years})
   AND ConvertedCompYearly BETWEEN 10000 AND 500000  -- Remove outliers
   AND AISelect IS NOT NULL
 GROUP BY survey_year, AISelect
@@ -331,7 +370,7 @@ SELECT
   AISelect as ai_usage,
   COUNT(*) as respondents
 FROM combined_survey
-WHERE survey_year = 2025  -- Most recent AI data
+WHERE survey_year = {years[-1]}  -- Most recent AI data
   AND YearsCodePro IS NOT NULL
   AND AISelect IS NOT NULL
 GROUP BY experience_level, ai_usage
@@ -345,12 +384,12 @@ ORDER BY experience_level, respondents DESC;
 2. **Sample size** by key demographic segments
 3. **Outlier detection** in numeric fields
 
-### **Phase 2: Baseline Understanding (2023)**
+### **Phase 2: Baseline Understanding ({years[0]})**
 1. **Developer demographics** and experience distribution
 2. **Technology stack** preferences and patterns
 3. **Compensation** and satisfaction baselines
 
-### **Phase 3: AI Adoption Tracking (2024-2025)**
+### **Phase 3: AI Adoption Tracking ({AI_FIRST_YEAR}-{years[-1]})**
 1. **Adoption rates** by demographic segments
 2. **Tool preferences** and usage patterns
 3. **Productivity correlations** with AI usage
@@ -363,14 +402,13 @@ ORDER BY experience_level, respondents DESC;
 ## ⚠️ **Important Notes for Analysis**
 
 ### **Data Compatibility**
-- **2025 has the most comprehensive AI features** ({len(intersections['only_2025'])} new columns)
+- **{years[-1]} has the most comprehensive AI features** ({len(intersections[f'only_{years[-1]}'])} new columns)
 - **Core demographic questions consistent** across all years
-- **Some 2023 columns deprecated** in later years
+- **Some {years[0]} columns deprecated** in later years
 
 ### **Sample Considerations**
-- **2023:** {row_counts.get(2023, 'N/A'):,} responses (pre-AI baseline)
-- **2024:** {row_counts.get(2024, 'N/A'):,} responses (early AI adoption)
-- **2025:** {row_counts.get(2025, 'N/A'):,} responses (mature AI adoption)
+{chr(10).join(f"- **{year}:** {row_counts.get(year, 'N/A'):,} responses"
+              f"{f' ({YEAR_ROLE[year]})' if year in YEAR_ROLE else ''}" for year in years)}
 
 ### **Column Naming Patterns**
 - **`HaveWorkedWith`** = Current usage
@@ -382,7 +420,7 @@ ORDER BY experience_level, respondents DESC;
 
 **Generated by:** Comprehensive Column Analysis Script
 **Last Updated:** {Path(__file__).stat().st_mtime if Path(__file__).exists() else 'Unknown'}
-**Source Files:** data_dictionary_2023.json, data_dictionary_2024.json, data_dictionary_2025.json
+**Source Files:** {', '.join(f'data_dictionary_{year}.json' for year in years)}
 """
 
     # Write the file
@@ -392,10 +430,44 @@ ORDER BY experience_level, respondents DESC;
     return output_file
 
 def generate_sql_ready_column_list(docs_dir: Path, intersections: Dict[str, Set[str]],
-                                 columns_by_year: Dict[int, Dict[str, Dict]]) -> None:
+                                 columns_by_year: Dict[int, Dict[str, Dict]],
+                                 renames: Dict[str, str] | None = None) -> None:
     """Generate SQL-ready column lists for different analysis types."""
 
     output_file = docs_dir / 'sql_column_reference.sql'
+    years = sorted(columns_by_year)
+    baseline, recent = '_'.join(map(str, years[:2])), '_'.join(map(str, years[-2:]))
+
+    # Year-specific sets, latest first: new in the latest (first 20) and middle years, deprecated after the first
+    year_sections = ''
+    for year in reversed(years):
+        cols = sorted(intersections[f'only_{year}'])
+        if year == years[-1] and len(years) > 1:
+            year_sections += f"""
+-- {year} new features ({len(cols)} columns)
+/*
+NEW_IN_{year}:
+{', '.join(f"'{col}'" for col in cols[:20])}
+{"..." if len(cols) > 20 else ""}
+*/
+"""
+        else:
+            kind, name = ('deprecated', f'DEPRECATED_AFTER_{year}') if year == years[0] else ('new', f'NEW_IN_{year}')
+            year_sections += f"""
+-- {year} {kind} features ({len(cols)} columns)
+/*
+{name}:
+{', '.join(f"'{col}'" for col in cols)}
+*/
+"""
+
+    if renames:
+        year_sections += f"""
+-- Renamed columns merged under their latest name ({len(renames)}); alias them when combining years
+/*
+{chr(10).join(f"{old} AS {new}" for old, new in sorted(renames.items()))}
+*/
+"""
 
     sql_content = f"""-- SQL Column Reference for StackOverflow Survey Analysis
 -- Generated automatically from data inventory
@@ -404,25 +476,25 @@ def generate_sql_ready_column_list(docs_dir: Path, intersections: Dict[str, Set[
 -- COLUMN AVAILABILITY BY INTERSECTION TYPE
 -- =============================================================================
 
--- Columns available in ALL 3 years (2023, 2024, 2025) - {len(intersections['all_three'])} columns
+-- Columns available in ALL {len(years)} years ({', '.join(map(str, years))}) - {len(intersections['all_years'])} columns
 -- Use these for longitudinal trend analysis
 /*
-ALL_YEARS_COLUMNS ({len(intersections['all_three'])} columns):
-{', '.join(f"'{col}'" for col in sorted(intersections['all_three']))}
+ALL_YEARS_COLUMNS ({len(intersections['all_years'])} columns):
+{', '.join(f"'{col}'" for col in sorted(intersections['all_years']))}
 */
 
--- Columns available in 2023 & 2024 only - {len(intersections['2023_2024'])} columns
+-- Columns available in {baseline.replace('_', ' & ')} only - {len(intersections.get(baseline, ()))} columns
 -- Use these for baseline vs early AI adoption comparison
 /*
-BASELINE_COLUMNS_2023_2024 ({len(intersections['2023_2024'])} columns):
-{', '.join(f"'{col}'" for col in sorted(intersections['2023_2024']))}
+BASELINE_COLUMNS_{baseline} ({len(intersections.get(baseline, ()))} columns):
+{', '.join(f"'{col}'" for col in sorted(intersections.get(baseline, ())))}
 */
 
--- Columns available in 2024 & 2025 only - {len(intersections['2024_2025'])} columns
+-- Columns available in {recent.replace('_', ' & ')} only - {len(intersections.get(recent, ()))} columns
 -- Use these for AI adoption trend analysis
 /*
-AI_ERA_COLUMNS_2024_2025 ({len(intersections['2024_2025'])} columns):
-{', '.join(f"'{col}'" for col in sorted(intersections['2024_2025']))}
+AI_ERA_COLUMNS_{recent} ({len(intersections.get(recent, ()))} columns):
+{', '.join(f"'{col}'" for col in sorted(intersections.get(recent, ())))}
 */
 
 -- =============================================================================
@@ -431,16 +503,16 @@ AI_ERA_COLUMNS_2024_2025 ({len(intersections['2024_2025'])} columns):
 
 -- Core demographics (available all years)
 SELECT
-  {', '.join([f"'{col}'" for col in sorted(intersections['all_three']) if any(x in col.lower() for x in ['age', 'country', 'employment', 'remote', 'orgsize', 'devtype'])])},
+  {', '.join([f"'{col}'" for col in sorted(intersections['all_years']) if any(x in col.lower() for x in ['age', 'country', 'employment', 'remote', 'orgsize', 'devtype'])])},
   survey_year
 FROM combined_survey;
 
--- AI usage columns (2024-2025)
+-- AI usage columns ({recent.replace('_', '-')})
 SELECT
-  {', '.join([f"'{col}'" for col in sorted(intersections['2024_2025']) if 'ai' in col.lower()][:10])},  -- First 10 AI columns
+  {', '.join([f"'{col}'" for col in sorted(intersections.get(recent, ())) if 'ai' in col.lower()][:10])},  -- First 10 AI columns
   survey_year
 FROM combined_survey
-WHERE survey_year IN (2024, 2025);
+WHERE survey_year IN ({recent.replace('_', ', ')});
 
 -- Productivity metrics (all years)
 SELECT
@@ -454,42 +526,129 @@ FROM combined_survey;
 -- =============================================================================
 -- YEAR-SPECIFIC FEATURE ANALYSIS
 -- =============================================================================
+{year_sections}"""
 
--- 2025 new features ({len(intersections['only_2025'])} columns)
-/*
-NEW_IN_2025:
-{', '.join(f"'{col}'" for col in sorted(list(intersections['only_2025'])[:20]))}
-{"..." if len(intersections['only_2025']) > 20 else ""}
-*/
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(sql_content)
 
--- 2024 new features ({len(intersections['only_2024'])} columns)
-/*
-NEW_IN_2024:
-{', '.join(f"'{col}'" for col in sorted(intersections['only_2024']))}
-*/
+    return output_file
 
--- 2023 deprecated features ({len(intersections['only_2023'])} columns)
-/*
-DEPRECATED_AFTER_2023:
-{', '.join(f"'{col}'" for col in sorted(intersections['only_2023']))}
-*/
+def generate_drift_report(docs_dir: Path, data_by_year: Dict[int, Dict[str, Any]],
+                          top_n: int = 25) -> Tuple[Path, Path] | None:
+    """
+    Distribution drift between consecutive years, from profile_sketches_{year}.json.
+    Writes distribution_drift.json (every shared column) and distribution_drift.md
+    (the ``top_n`` biggest movers per pair). None when fewer than two years have sketches.
+    """
+    sketches = load_year_sketches(docs_dir, sorted(data_by_year))
+    years = sorted(sketches)
+    if len(years) < 2:
+        return None
+
+    pairs = []
+    for ref_year, cur_year in zip(years, years[1:]):
+        drift = compare_years(sketches[ref_year], data_by_year[ref_year].get('rows_loaded', 0),
+                              sketches[cur_year], data_by_year[cur_year].get('rows_loaded', 0))
+        ranked = sorted(drift.items(), key=lambda kv: drift_score(kv[1]), reverse=True)
+        pairs.append({'from': ref_year, 'to': cur_year, 'columns': dict(ranked)})
+
+    json_file = docs_dir / 'distribution_drift.json'
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump({'pairs': pairs}, f, indent=2, ensure_ascii=False)
+
+    md_content = """# Distribution Drift Across Survey Years
+
+**Generated:** from the Pass-1 profile sketches (no raw CSV reads)
+
+- **Numeric columns:** KS distance (max gap between the two CDFs) and PSI over the earlier year's deciles
+- **Categorical columns:** PSI over top-k shares, largest single-value share shift (percentage points), total variation over tracked values
+- **Levels:** PSI < 0.1 stable, 0.1-0.25 moderate, > 0.25 (or KS > 0.1) major
 """
+    for pair in pairs:
+        cols = pair['columns']
+        levels = defaultdict(int)
+        for d in cols.values():
+            levels[d['level']] += 1
+        md_content += f"""
+## {pair['from']} → {pair['to']}
+
+**Shared columns:** {len(cols)} — major: {levels['major']}, moderate: {levels['moderate']}, stable: {levels['stable']}
+
+| Column | Kind | Level | PSI | KS | Largest share shift |
+|--------|------|-------|-----|----|---------------------|
+"""
+        for name, d in list(cols.items())[:top_n]:
+            if d['kind'] == 'type_change':
+                md_content += f"| `{name}` | type change | {d['level']} | | | {d['detail']} |\n"
+                continue
+            shift = ''
+            if d.get('max_shift') is not None:
+                shift = f"{d['max_shift']:+.2f} pp (`{d['max_shift_value']}`)"
+            psi_value = '' if d.get('psi') is None else d['psi']
+            ks_value = '' if d.get('ks') is None else d['ks']
+            md_content += f"| `{name}` | {d['kind']} | {d['level']} | {psi_value} | {ks_value} | {shift} |\n"
+
+    md_file = docs_dir / 'distribution_drift.md'
+    with open(md_file, 'w', encoding='utf-8') as f:
+        f.write(md_content)
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(sql_content)
+    return json_file, md_file
 
-    return output_file
+def generate_rename_suggestions(docs_dir: Path, columns_by_year: Dict[int, Dict[str, Dict]]) -> Tuple[Path, Path]:
+    """
+    Columns that look renamed between consecutive years (``column_renames``), scored on
+    name and profile. Writes column_renames_suggested.json (review it, set "apply" and
+    pass it to --renames) and column_renames_suggested.md.
+    """
+    years = sorted(columns_by_year)
+    suggestions = suggest_renames(columns_by_year, load_year_sketches(docs_dir, years))
+    json_file = docs_dir / 'column_renames_suggested.json'
+    write_suggestions(json_file, suggestions, years)
+
+    md_content = f"""# Suggested Column Renames Across Survey Years
+
+**Generated:** from the column names (character trigram index) and the Pass-1 profiles
+
+- **Candidates:** a column last seen in one year and a column first seen in the next, sharing name trigrams (Dice >= {NAME_MIN})
+- **Score:** {NAME_WEIGHT:.0%} name similarity + {1 - NAME_WEIGHT:.0%} profile similarity (null rate, top-k value overlap); one to one, best first
+- **Apply:** marked at score >= {APPLY_MIN}, never for numbered siblings (names differing only in a trailing number, ⚠️); copy the JSON, adjust `apply`, then rerun with `--renames <file>`
+
+**Suggestions:** {len(suggestions)} ({sum(s['apply'] for s in suggestions)} marked apply)
+
+| Years | From | To | Score | Name | Profile | Top-k overlap | Null % | Apply |
+|-------|------|----|-------|------|---------|---------------|--------|-------|
+"""
+    for s in suggestions:
+        overlap = '' if s['top_k_overlap'] is None else s['top_k_overlap']
+        nulls = ' → '.join('' if v is None else f"{v}" for v in s['null_pct'])
+        md_content += (f"| {s['from_year']} → {s['to_year']} | `{s['from']}` | `{s['to']}` | {s['score']} | "
+                       f"{s['name_similarity']} | {s['profile_similarity']} | {overlap} | {nulls} | "
+                       f"{'✅' if s['apply'] else '⚠️' if s['numbered_sibling'] else ''} |\n")
+
+    md_file = docs_dir / 'column_renames_suggested.md'
+    with open(md_file, 'w', encoding='utf-8') as f:
+        f.write(md_content)
+
+    return json_file, md_file
 
 def main():
     parser = argparse.ArgumentParser(description="Generate comprehensive column analysis across all years")
     parser.add_argument('--docsdir', type=str, default='docs',
                        help='Directory containing data dictionary files')
+    parser.add_argument('--renames', type=str, default=None,
+                       help='Reviewed renames file (from column_renames_suggested.json): entries marked '
+                            '"apply" are counted under their latest name in every report')
     args = parser.parse_args()
 
     docs_dir = Path(args.docsdir)
 
-    print("🔍 Loading data dictionary files...")
-    data_by_year = load_column_data(docs_dir)
+    stored = load_from_store(docs_dir)
+    if stored is not None:
+        print("🔍 Loading profile store (columns × years)...")
+        data_by_year, columns_by_year = stored
+    else:
+        print("🔍 Loading data dictionary files...")
+        data_by_year = load_column_data(docs_dir)
 
     if not data_by_year:
         print("❌ No data dictionary files found. Run data inventory first.")
@@ -497,8 +656,19 @@ def main():
 
     print(f"✅ Loaded data for years: {sorted(data_by_year.keys())}")
 
-    print("📊 Extracting column information...")
-    columns_by_year = extract_column_info(data_by_year)
+    if stored is None:
+        print("📊 Extracting column information...")
+        columns_by_year = extract_column_info(data_by_year)
+
+    print("🔤 Suggesting column renames across years...")
+    for path in generate_rename_suggestions(docs_dir, columns_by_year):
+        print(f"✅ Created: {path}")
+
+    renames = {}
+    if args.renames:
+        renames = load_renames(Path(args.renames))
+        columns_by_year = apply_renames(columns_by_year, renames)
+        print(f"🔀 Applied {len(renames)} renames from {args.renames}")
 
     print("🔗 Calculating intersections...")
     intersections = calculate_intersections(columns_by_year)
@@ -508,21 +678,32 @@ def main():
 
     print("📝 Generating comprehensive overview...")
     overview_file = generate_comprehensive_overview(
-        docs_dir, data_by_year, columns_by_year, intersections, categories
+        docs_dir, data_by_year, columns_by_year, intersections, categories, renames
     )
     print(f"✅ Created: {overview_file}")
 
     print("💾 Generating SQL reference...")
-    sql_file = generate_sql_ready_column_list(docs_dir, intersections, columns_by_year)
+    sql_file = generate_sql_ready_column_list(docs_dir, intersections, columns_by_year, renames)
     print(f"✅ Created: {sql_file}")
 
+    print("📉 Comparing distributions across years (stored sketches)...")
+    drift_files = generate_drift_report(docs_dir, data_by_year)
+    if drift_files is None:
+        print("   ⏭️ Skipped: fewer than two years have profile_sketches_{year}.json")
+    else:
+        for path in drift_files:
+            print(f"✅ Created: {path}")
+
     # Print summary
     print(f"\n📋 Analysis Summary:")
     print(f"   Total unique columns: {len(intersections['union_all'])}")
-    print(f"   Available in all 3 years: {len(intersections['all_three'])}")
-    print(f"   2023 ∩ 2024 (baseline): {len(intersections['2023_2024'])}")
-    print(f"   2024 ∩ 2025 (AI era): {len(intersections['2024_2025'])}")
-    print(f"   2025 new features: {len(intersections['only_2025'])}")
+    years = sorted(columns_by_year)
+    print(f"   Available in all {len(years)} years: {len(intersections['all_years'])}")
+    if len(years) > 1:
+        baseline, recent = years[:2], years[-2:]
+        print(f"   {baseline[0]} ∩ {baseline[1]} (baseline): {len(intersections[f'{baseline[0]}_{baseline[1]}'])}")
+        print(f"   {recent[0]} ∩ {recent[1]} (AI era): {len(intersections[f'{recent[0]}_{recent[1]}'])}")
+        print(f"   {years[-1]} new features: {len(intersections[f'only_{years[-1]}'])}")
 
     return 0
 
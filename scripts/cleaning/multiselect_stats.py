@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Exploded option statistics for multiselect (';'-separated) survey columns
+
+Columns such as ``LanguageHaveWorkedWith`` hold answers like "Python;SQL;Go".
+``update_option_stats`` splits many columns at once (one ``str.split`` + ``explode``
+over the stacked cells), then feeds two bounded, mergeable Space-Saving summaries
+per column (``OptionStats``):
+
+  - options : how many responses selected each option
+  - pairs   : how many responses selected both options of a pair (co-occurrence)
+
+Options are de-duplicated within a response and stripped of surrounding
+whitespace (the separator rule ``is_multiselect`` uses). Pairs are counted in
+row batches so memory stays bounded by ``PAIR_BATCH_ROWS`` responses, and both
+summaries stay exact until they exceed their capacity.
+"""
+
+from __future__ import annotations
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+from profile_sketches import SpaceSaving
+
+MULTISELECT_SEP = ';'
+OPTION_CAPACITY = 1000    # tracked options per column (survey answer lists are far smaller)
+PAIR_CAPACITY = 500       # tracked co-occurring pairs per column
+PAIR_BATCH_ROWS = 20000   # responses self-joined at once when counting pairs
+TOP_OPTIONS = 50          # options listed in the readable summary
+TOP_PAIRS = 25            # pairs listed in the readable summary
+_PAIR_JOIN = '\x1f'       # unit separator: joins a pair into one sketch key
+
+def explode_options(frame: pd.DataFrame, sep: str = MULTISELECT_SEP) -> pd.DataFrame:
+    """
+    Long frame (col, row, option) of the distinct non-empty options in each answered
+    cell, for all columns of ``frame`` at once (``col``/``row`` are positions; rows are
+    ordered by (col, row)). Only distinct answer strings are split.
+    """
+    cells = frame.to_numpy(dtype=object).T                      # columns x rows
+    col, row = np.nonzero(pd.notna(cells))
+    answer, answers = pd.factorize(pd.Series(cells[col, row], dtype=object).astype(str))
+    tokens = pd.Series(answers, dtype=object).str.split(sep, regex=False).explode().str.strip()
+    tokens = pd.DataFrame({'answer': tokens.index.to_numpy(), 'option': tokens.to_numpy()})
+    tokens = tokens[tokens['option'].notna() & (tokens['option'] != '')].drop_duplicates()
+    per_answer = np.bincount(tokens['answer'].to_numpy(), minlength=len(answers))
+    first = np.cumsum(per_answer) - per_answer
+    # every cell takes its answer's token run: first[answer] .. first[answer] + n - 1
+    n = per_answer[answer]
+    take = np.repeat(first[answer] - np.cumsum(n) + n, n) + np.arange(int(n.sum()))
+    return pd.DataFrame({'col': np.repeat(col, n), 'row': np.repeat(row, n),
+                         'option': tokens['option'].to_numpy()[take]})
+
+def count_pairs(long: pd.DataFrame, batch_rows: int = PAIR_BATCH_ROWS) -> pd.DataFrame:
+    """Co-occurrence counts (col, pair 'a<US>b' with a < b, count) from ``explode_options``."""
+    empty = pd.DataFrame({'col': [], 'pair': [], 'count': []})
+    if long.empty:
+        return empty
+    codes, names = pd.factorize(long['option'], sort=True)    # code order == string order
+    width = np.int64(len(names))
+    stride = np.int64(long['row'].max()) + 1
+    cell = long['col'].to_numpy(np.int64) * stride + long['row'].to_numpy(np.int64)  # ascending
+    frame = pd.DataFrame({'cell': cell, 'code': codes.astype(np.int64)})
+    parts = []
+    bounds = np.searchsorted(cell, np.arange(cell[0], cell[-1] + batch_rows, batch_rows))
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        batch = frame.iloc[lo:hi]
+        joined = batch.merge(batch, on='cell')
+        joined = joined[joined['code_x'] < joined['code_y']]
+        if not joined.empty:
+            keys = ((joined['cell'].to_numpy() // stride) * width + joined['code_x'].to_numpy()) * width \
+                + joined['code_y'].to_numpy()
+            parts.append(pd.Series(keys).value_counts(sort=False))
+    if not parts:
+        return empty
+    counts = pd.concat(parts).groupby(level=0, sort=True).sum()
+    keys = counts.index.to_numpy(np.int64)
+    labels = names.to_numpy(dtype=object)
+    a, b = labels[(keys // width) % width], labels[keys % width]
+    return pd.DataFrame({'col': keys // (width * width),
+                         'pair': [f'{x}{_PAIR_JOIN}{y}' for x, y in zip(a, b)],
+                         'count': counts.to_numpy(dtype='int64')})
+
+def update_option_stats(stats: List['OptionStats'], frame: pd.DataFrame) -> None:
+    """Feed every column of ``frame`` into its ``stats`` entry in one batched pass."""
+    long = explode_options(frame)
+    if long.empty:
+        return
+    responses = long.groupby('col')['row'].nunique()
+    options = long.groupby(['col', 'option'], sort=False).size()
+    pairs = count_pairs(long)
+    pair_groups = dict(tuple(pairs.groupby('col'))) if not pairs.empty else {}
+    for j, sub in options.groupby(level=0, sort=False):
+        st = stats[j]
+        st.responses += int(responses[j])
+        st.selections += int(sub.sum())
+        st.options.update_counts(sub.droplevel(0))
+        if j in pair_groups:
+            p = pair_groups[j]
+            st.pairs.update_counts(pd.Series(p['count'].to_numpy(), index=pd.Index(p['pair'], dtype=object)))
+
+class OptionStats:
+    """Per-column option and co-occurrence counts, fed one Series (or chunk) at a time."""
+
+    def __init__(self, option_capacity: int = OPTION_CAPACITY, pair_capacity: int = PAIR_CAPACITY):
+        self.responses = 0    # rows with at least one option
+        self.selections = 0   # options picked, summed over responses
+        self.options = SpaceSaving(option_capacity)
+        self.pairs = SpaceSaving(pair_capacity)
+
+    def update(self, values: pd.Series) -> None:
+        update_option_stats([self], values.to_frame())
+
+    def merge(self, other: 'OptionStats') -> 'OptionStats':
+        self.responses += other.responses
+        self.selections += other.selections
+        self.options.merge(other.options)
+        self.pairs.merge(other.pairs)
+        return self
+
+    def summary(self, top_options: int = TOP_OPTIONS, top_pairs: int = TOP_PAIRS) -> Dict[str, Any]:
+        """Readable view: counts plus share of responses for the leading options and pairs."""
+        n = self.responses
+        share = lambda c: round(c / n, 4) if n else 0.0
+        return {
+            'responses': n,
+            'mean_selected': round(self.selections / n, 2) if n else 0.0,
+            'options_tracked': int(self.options.counts.size),
+            'exact': self.options.exact and self.pairs.exact,
+            'options': [{'option': v, 'count': c, 'share': share(c), 'error': e}
+                        for v, c, e in self.options.top(top_options)],
+            'top_pairs': [{'pair': v.split(_PAIR_JOIN), 'count': c, 'share': share(c), 'error': e}
+                          for v, c, e in self.pairs.top(top_pairs)],
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        pairs = self.pairs.to_dict()
+        pairs['items'] = [[v.split(_PAIR_JOIN), c, e] for v, c, e in pairs['items']]
+        return {
+            'responses': self.responses,
+            'selections': self.selections,
+            'options': self.options.to_dict(),
+            'pairs': pairs,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> 'OptionStats':
+        stats = cls(int(d['options']['capacity']), int(d['pairs']['capacity']))
+        stats.responses = int(d.get('responses', 0))
+        stats.selections = int(d.get('selections', 0))
+        stats.options = SpaceSaving.from_dict(d['options'])
+        pairs = dict(d['pairs'])
+        pairs['items'] = [[_PAIR_JOIN.join(p), c, e] for p, c, e in pairs.get('items', [])]
+        stats.pairs = SpaceSaving.from_dict(pairs)
+        return stats
+
+def profile_multiselect(df: pd.DataFrame, columns: List[int]) -> Dict[str, Dict[str, Any]]:
+    """{column name: OptionStats.to_dict()} for the given column positions of ``df``."""
+    stats = [OptionStats() for _ in columns]
+    if columns:
+        update_option_stats(stats, df.iloc[:, list(columns)])
+    return {df.columns[i]: st.to_dict() for i, st in zip(columns, stats)}
+
+def summarize_multiselect(serialized: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Readable per-column summaries from a serialized ``{column: OptionStats}`` dict."""
+    return {col: OptionStats.from_dict(d).summary() for col, d in serialized.items()}
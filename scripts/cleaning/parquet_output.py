@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Typed Parquet output for the BigQuery cleaner
+
+The cleaner streams chunks before the schema is known (``SchemaInferencer`` only
+decides once the whole file has been seen), so Parquet is written in two steps:
+
+  - ``ParquetStage`` appends every cleaned chunk as string columns to a staging file
+    while the CSV (if any) is written;
+  - ``write_typed_parquet`` reads the staging file back batch by batch, converts each
+    column to the Arrow type of its inferred BigQuery type (``arrow_type``) and writes
+    the final zstd-compressed, dictionary-encoded file in ``PARQUET_ROW_GROUP_ROWS``
+    row groups, so readers (pyarrow, BigQuery) can split one year across workers.
+
+'' (what the cleaner writes for nulls) becomes null in every column. A value that
+does not fit its column's type (the schema is inferred from a sample) is written as
+null and counted per column, never silently dropped from the report. INTEGER columns
+are parsed from the strings (``_integer_column``), never through float64, so every
+INT64 value survives exactly.
+"""
+
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only --format parquet/both needs it
+    pa = None
+
+PARQUET_ROW_GROUP_ROWS = 32768   # several groups per survey year, each big enough for dictionaries to pay off
+PARQUET_COMPRESSION = 'zstd'
+STAGING_COMPRESSION = 'snappy'   # read back once, right away: cheap to write beats small
+BOOLEAN_TRUE = frozenset(['true', 'yes', '1', 'y'])
+BOOLEAN_FALSE = frozenset(['false', 'no', '0', 'n'])
+_EXACT_FLOAT_LIMIT = 2.0 ** 53   # integral floats (e.g. '12.0') above this are not exact integers
+_INT_DIGITS_SAFE = 18            # integer literals this long (sign included) always fit INT64
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Parquet output requires pyarrow")
+
+def arrow_type(bq_type: str) -> 'pa.DataType':
+    """Arrow type written for a BigQuery column type (unknown types stay strings)."""
+    _require_pyarrow()
+    return {
+        'INTEGER': pa.int64(),
+        'FLOAT': pa.float64(),
+        'BOOLEAN': pa.bool_(),
+        'TIMESTAMP': pa.timestamp('us', tz='UTC'),
+    }.get(bq_type, pa.string())
+
+# ----------------------------- staging ------------------------------------------------
+
+class ParquetStage:
+    """Cleaned chunks appended as string columns, for ``write_typed_parquet`` to type later."""
+
+    def __init__(self, path: Path, columns: List[str]):
+        _require_pyarrow()
+        self.path = Path(path)
+        self.rows = 0
+        self._schema = pa.schema([(str(col), pa.string()) for col in columns])
+        self._writer = pq.ParquetWriter(self.path, self._schema, compression=STAGING_COMPRESSION)
+
+    def write(self, df: pd.DataFrame) -> None:
+        arrays = []
+        for i in range(df.shape[1]):
+            arr = pa.array(df.iloc[:, i], from_pandas=True)
+            if arr.type != pa.string():
+                arr = pc.cast(arr, pa.string())
+            arrays.append(arr)
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> 'ParquetStage':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+# ----------------------------- typing -------------------------------------------------
+
+def _integer_column(col: 'pa.Array', present: 'pa.Array') -> tuple:
+    """(int64 array, missing mask) for an INTEGER column's strings."""
+    none = pa.scalar(None, pa.string())
+    literal = pc.fill_null(pc.match_substring_regex(col, r'^[+-]?\d+$'), False)
+    digits = pc.replace_substring_regex(pc.if_else(literal, col, none), r'^\+', '')
+    fits = pc.fill_null(pc.less_equal(pc.utf8_length(digits), _INT_DIGITS_SAFE), False)
+    ints = pc.cast(pc.if_else(fits, digits, none), pa.int64())
+    values = ints.fill_null(0).to_numpy(zero_copy_only=False).copy()
+    missing = ~fits.to_numpy(zero_copy_only=False)
+
+    # the rest: long literals (exact range check) and other numeric text ('12.0', '1e3')
+    rest = np.flatnonzero(missing & present.to_numpy(zero_copy_only=False))
+    if len(rest):
+        text = pd.Series(col.take(pa.array(rest)).to_pylist(), dtype=object)
+        is_literal = literal.take(pa.array(rest)).to_numpy(zero_copy_only=False)
+        numeric = pd.to_numeric(text.where(~is_literal), errors='coerce').astype('float64').to_numpy()
+        for k, i in enumerate(rest):
+            if is_literal[k]:
+                n = int(text.iat[k])
+                if _INT64_MIN <= n <= _INT64_MAX:
+                    values[i], missing[i] = n, False
+            elif np.floor(numeric[k]) == numeric[k] and abs(numeric[k]) < _EXACT_FLOAT_LIMIT:
+                values[i], missing[i] = int(numeric[k]), False
+    return pa.array(values, mask=missing), missing
+
+def _typed_column(col: 'pa.Array', bq_type: str) -> tuple:
+    """(array of ``arrow_type(bq_type)``, count of present values that did not fit)."""
+    present = pc.fill_null(pc.not_equal(col, ''), False)
+    if bq_type not in ('INTEGER', 'FLOAT', 'BOOLEAN', 'TIMESTAMP'):
+        return pc.if_else(present, col, pa.scalar(None, pa.string())), 0
+
+    if bq_type == 'INTEGER':
+        arr, missing = _integer_column(col, present)
+        return arr, int(np.count_nonzero(missing & present.to_numpy(zero_copy_only=False)))
+
+    values = col.to_pandas().where(present.to_numpy(zero_copy_only=False))
+    if bq_type == 'BOOLEAN':
+        lower = values.str.lower()
+        typed = pd.Series(pd.NA, index=values.index, dtype='boolean')
+        typed[lower.isin(BOOLEAN_TRUE)] = True
+        typed[lower.isin(BOOLEAN_FALSE)] = False
+        missing = typed.isna().to_numpy()
+        arr = pa.array(typed.to_numpy(dtype=bool, na_value=False), mask=missing)
+    elif bq_type == 'TIMESTAMP':
+        typed = pd.to_datetime(values, errors='coerce', utc=True, format='mixed')
+        missing = typed.isna().to_numpy()
+        arr = pa.array(typed, from_pandas=True).cast(arrow_type(bq_type), safe=False)
+    else:
+        numeric = pd.to_numeric(values, errors='coerce').astype('float64')
+        missing = numeric.isna().to_numpy()
+        arr = pa.array(numeric.to_numpy(), mask=missing).cast(arrow_type(bq_type))
+    lost = int(np.count_nonzero(missing & present.to_numpy(zero_copy_only=False)))
+    return arr, lost
+
+def write_typed_parquet(staging_path: Path, output_file: Path, schema_fields: List[Dict[str, Any]],
+                        row_group_rows: int = PARQUET_ROW_GROUP_ROWS) -> Dict[str, Any]:
+    """
+    Convert a ``ParquetStage`` file to the typed Parquet file for ``schema_fields``
+    (the BigQuery schema JSON). Returns {'rows', 'row_groups', 'bytes', 'coerced':
+    {column: values written as null}}. Written to ``.partial`` and renamed when done.
+    """
+    _require_pyarrow()
+    fields = [pa.field(f['name'], arrow_type(f['type']), metadata={'description': f.get('description', '')})
+              for f in schema_fields]
+    schema = pa.schema(fields)
+    types = [f['type'] for f in schema_fields]
+    partial = Path(output_file).with_name(Path(output_file).name + '.partial')
+    staged = pq.ParquetFile(staging_path)
+    if staged.schema_arrow.names != schema.names:
+        raise ValueError(f"Staged columns do not match the schema for {output_file}")
+
+    coerced: Dict[str, int] = {}
+    rows = 0
+    pending: List['pa.Table'] = []
+    pending_rows = 0
+    with pq.ParquetWriter(partial, schema, compression=PARQUET_COMPRESSION, use_dictionary=True) as writer:
+        def flush(final: bool) -> None:
+            nonlocal pending, pending_rows
+            table = pa.concat_tables(pending) if pending else schema.empty_table()
+            full = len(table) if final else len(table) // row_group_rows * row_group_rows
+            if full:
+                writer.write_table(table.slice(0, full), row_group_size=row_group_rows)
+            pending = [table.slice(full)] if full < len(table) else []
+            pending_rows = len(table) - full
+
+        for batch in staged.iter_batches(batch_size=row_group_rows):
+            arrays = []
+            for name, bq_type, col in zip(schema.names, types, batch.columns):
+                arr, lost = _typed_column(col, bq_type)
+                if lost:
+                    coerced[name] = coerced.get(name, 0) + lost
+                arrays.append(arr)
+            pending.append(pa.Table.from_arrays(arrays, schema=schema))
+            pending_rows += batch.num_rows
+            rows += batch.num_rows
+            if pending_rows >= row_group_rows:
+                flush(final=False)
+        flush(final=True)
+    os.replace(partial, output_file)
+    meta = pq.ParquetFile(output_file).metadata
+    return {'rows': rows, 'row_groups': meta.num_row_groups, 'bytes': Path(output_file).stat().st_size,
+            'coerced': coerced}
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Stage-level timing and memory trace for the cleaning scripts
+
+Wrap a stage in ``with stage('load', year=2024) as rec:`` and, once tracing is on
+(``enable_trace(path)`` / ``--trace PATH``), one JSON line per finished stage is
+appended to the trace file:
+
+  stage, start (epoch s), seconds, cpu_seconds, rows, bytes, rows_per_s, mb_per_s,
+  rss_mb (resident now), rss_peak_mb (process high-water mark), depth, parent, plus
+  any attributes given (year, file, encoding, ...)
+
+Set ``rec['rows']`` / ``rec['bytes']`` inside the block when they are only known
+at the end. With ``python_alloc=True`` tracemalloc also records each stage's peak
+Python allocation (``py_alloc_peak_mb``); it slows allocation-heavy code, so it
+is off by default. While tracing is off ``stage`` only yields a dict.
+
+The trace path is exported as ``CLEANING_TRACE`` so worker processes (fork or spawn)
+append to the same file. ``python pipeline_trace.py TRACE`` prints where time went
+per stage; ``--chrome OUT`` converts it for chrome://tracing / Perfetto.
+"""
+
+from __future__ import annotations
+import argparse, json, os, sys, time, tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TRACE_ENV = 'CLEANING_TRACE'
+TRACE_ALLOC_ENV = 'CLEANING_TRACE_PYTHON_ALLOC'
+_MB = 1024 * 1024
+
+# ----------------------------- memory probes ------------------------------------------
+
+def rss_mb() -> float | None:
+    """Current resident set size (Linux /proc/self/statm); None elsewhere."""
+    try:
+        pages = int(Path('/proc/self/statm').read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(pages * os.sysconf('SC_PAGE_SIZE') / _MB, 1)
+
+def rss_peak_mb() -> float | None:
+    """Peak resident set size of this process so far (getrusage); None without ``resource``."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (_MB if sys.platform == 'darwin' else 1024), 1)  # bytes on macOS, KB on Linux
+
+# ----------------------------- tracer -------------------------------------------------
+
+class Tracer:
+    """Appends one JSON line per finished stage to ``path`` (safe to share across processes)."""
+
+    def __init__(self, path: str, python_alloc: bool = False):
+        self.path = str(path)
+        self.python_alloc = python_alloc
+        self.script = Path(sys.argv[0]).stem or 'python'
+        self._stack: List[Dict[str, Any]] = []
+        if python_alloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str, rows: int | None = None, nbytes: int | None = None, **attrs):
+        rec: Dict[str, Any] = {'rows': rows, 'bytes': nbytes, **attrs, '_name': name}
+        parent = self._stack[-1] if self._stack else None
+        if self.python_alloc:
+            if parent is not None:  # reset_peak below would otherwise hide the parent's peak so far
+                parent['_alloc_peak'] = max(parent['_alloc_peak'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            rec['_alloc_peak'] = 0
+        self._stack.append(rec)
+        start, t0, c0 = time.time(), time.perf_counter(), time.process_time()
+        error = None
+        try:
+            yield rec
+        except BaseException as e:
+            error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            seconds = time.perf_counter() - t0
+            cpu = time.process_time() - c0
+            self._stack.pop()
+            event = {
+                'script': self.script,
+                'pid': os.getpid(),
+                'stage': name,
+                'parent': parent['_name'] if parent else None,
+                'depth': len(self._stack),
+                'start': round(start, 6),
+                'seconds': round(seconds, 6),
+                'cpu_seconds': round(cpu, 6),
+            }
+            rows, nbytes = rec.get('rows'), rec.get('bytes')
+            event['rows'] = rows
+            event['bytes'] = nbytes
+            event['rows_per_s'] = round(rows / seconds, 1) if rows and seconds > 0 else None
+            event['mb_per_s'] = round(nbytes / _MB / seconds, 2) if nbytes and seconds > 0 else None
+            event['rss_mb'] = rss_mb()
+            event['rss_peak_mb'] = rss_peak_mb()
+            if self.python_alloc:
+                peak = max(rec['_alloc_peak'], tracemalloc.get_traced_memory()[1])
+                event['py_alloc_peak_mb'] = round(peak / _MB, 2)
+                if parent is not None:
+                    parent['_alloc_peak'] = max(parent['_alloc_peak'], peak)
+            event.update({k: v for k, v in rec.items() if k not in ('rows', 'bytes') and not k.startswith('_')})
+            if error:
+                event['error'] = error
+            self._write(event)
+
+    def _write(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event, default=str, separators=(',', ':')) + '\n'
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:  # one append per line: atomic enough across workers
+                f.write(line)
+        except OSError as e:
+            print(f"  ⚠️ Could not write trace event: {e}")
+
+_TRACER: Tracer | None = None
+
+def enable_trace(path: str | None, python_alloc: bool = False) -> Tracer | None:
+    """Turn tracing on for this process and its workers (no-op when ``path`` is falsy)."""
+    global _TRACER
+    if not path:
+        return None
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    os.environ[TRACE_ENV] = str(path)
+    if python_alloc:
+        os.environ[TRACE_ALLOC_ENV] = '1'
+    _TRACER = Tracer(path, python_alloc=python_alloc)
+    return _TRACER
+
+@contextmanager
+def stage(name: str, rows: int | None = None, nbytes: int | None = None, **attrs):
+    """Time and measure the enclosed block as stage ``name`` (see module docstring)."""
+    if _TRACER is None:
+        yield {'rows': rows, 'bytes': nbytes}
+        return
+    with _TRACER.stage(name, rows=rows, nbytes=nbytes, **attrs) as rec:
+        yield rec
+
+if os.environ.get(TRACE_ENV):  # worker process started by a traced run
+    _TRACER = Tracer(os.environ[TRACE_ENV], python_alloc=bool(os.environ.get(TRACE_ALLOC_ENV)))
+
+# ----------------------------- reading traces -----------------------------------------
+
+def read_trace(path: str) -> List[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def summarize(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per (script, stage): calls, total seconds, rows, bytes and the worst peak RSS."""
+    agg: Dict[tuple, Dict[str, Any]] = defaultdict(lambda: {'calls': 0, 'seconds': 0.0, 'rows': 0,
+                                                            'bytes': 0, 'rss_peak_mb': None})
+    for e in events:
+        a = agg[(e['script'], e['stage'])]
+        a['calls'] += 1
+        a['seconds'] += e['seconds']
+        a['rows'] += e.get('rows') or 0
+        a['bytes'] += e.get('bytes') or 0
+        if e.get('rss_peak_mb') is not None:
+            a['rss_peak_mb'] = max(a['rss_peak_mb'] or 0.0, e['rss_peak_mb'])
+    out = []
+    for (script, name), a in agg.items():
+        s = a['seconds']
+        out.append({'script': script, 'stage': name, **a, 'seconds': round(s, 3),
+                    'rows_per_s': round(a['rows'] / s, 1) if a['rows'] and s > 0 else None,
+                    'mb_per_s': round(a['bytes'] / _MB / s, 2) if a['bytes'] and s > 0 else None})
+    return sorted(out, key=lambda r: r['seconds'], reverse=True)
+
+def to_chrome_trace(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Complete ('X') events for chrome://tracing / Perfetto, one track per process."""
+    skip = {'script', 'pid', 'stage', 'start', 'seconds', 'depth', 'parent'}
+    return {'traceEvents': [{
+        'name': e['stage'], 'cat': e['script'], 'ph': 'X',
+        'ts': round(e['start'] * 1e6), 'dur': round(e['seconds'] * 1e6),
+        'pid': e['pid'], 'tid': e['pid'],
+        'args': {k: v for k, v in e.items() if k not in skip and v is not None},
+    } for e in events]}
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description='Summarize a cleaning-pipeline trace (JSON lines)')
+    p.add_argument('trace', type=str, help='Trace file written with --trace')
+    p.add_argument('--chrome', type=str, default=None, help='Also write a Chrome trace JSON here')
+    args = p.parse_args(argv)
+
+    events = read_trace(args.trace)
+    print(f"{'script':<32} {'stage':<24} {'calls':>5} {'seconds':>9} {'rows/s':>12} {'MB/s':>8} {'peak RSS MB':>11}")
+    for r in summarize(events):
+        rps = '' if r['rows_per_s'] is None else f"{r['rows_per_s']:,.0f}"
+        mbps = '' if r['mb_per_s'] is None else f"{r['mb_per_s']:.1f}"
+        peak = '' if r['rss_peak_mb'] is None else f"{r['rss_peak_mb']:.0f}"
+        print(f"{r['script']:<32} {r['stage']:<24} {r['calls']:>5} {r['seconds']:>9.3f} {rps:>12} {mbps:>8} {peak:>11}")
+    if args.chrome:
+        with open(args.chrome, 'w', encoding='utf-8') as f:
+            json.dump(to_chrome_trace(events), f)
+        print(f"✅ Written: {args.chrome}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Cross-year distribution drift from the stored Pass-1 sketches
+
+Pass-1 writes one ``profile_sketches_{year}.json`` per year (see ``profile_sketches``).
+``column_drift`` compares a column between two years using only those summaries,
+so a drift report over every shared column never touches the raw CSVs:
+
+  - numeric     : KS distance (max CDF gap over both KLL sketches' items) and PSI
+                  over the reference year's deciles
+  - categorical : top-k share shifts (share = Space-Saving count / rows loaded);
+                  the largest shift, the total variation over tracked values and
+                  a PSI with untracked values pooled into one 'other' bucket
+
+A value missing from one year's top-k is charged that sketch's ``floor`` (its upper
+bound, 0 while the sketch is exact), so eviction never shows up as drift.
+"""
+
+from __future__ import annotations
+import json, math
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+from profile_sketches import KLLSketch
+
+PSI_BINS = 10            # reference-year quantile bins for numeric PSI
+PSI_EPSILON = 1e-4       # share floor so empty bins do not blow up the log ratio
+PSI_MODERATE = 0.1       # conventional PSI bands: < 0.1 stable, 0.1-0.25 moderate, > 0.25 major
+PSI_MAJOR = 0.25
+KS_MAJOR = 0.1           # KS distance flagged as major drift
+
+def load_year_sketches(docs_dir: Path, years: List[int]) -> Dict[int, Dict[str, Any]]:
+    """{year: {column: serialized sketches}} for each year whose sidecar exists."""
+    out = {}
+    for year in years:
+        path = Path(docs_dir) / f'profile_sketches_{year}.json'
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                out[year] = json.load(f)
+    return out
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population stability index of two share vectors over the same bins."""
+    e = np.maximum(np.asarray(expected, dtype=float), PSI_EPSILON)
+    a = np.maximum(np.asarray(actual, dtype=float), PSI_EPSILON)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+def drift_level(psi_value: float | None, ks: float | None = None) -> str:
+    if psi_value is None:
+        return 'n/a'
+    if psi_value > PSI_MAJOR or (ks is not None and ks > KS_MAJOR):
+        return 'major'
+    return 'moderate' if psi_value > PSI_MODERATE else 'stable'
+
+# ----------------------------- numeric ------------------------------------------------
+
+def numeric_drift(ref: KLLSketch, cur: KLLSketch, bins: int = PSI_BINS) -> Dict[str, Any]:
+    """KS distance and decile PSI between two quantile sketches."""
+    if not ref.n or not cur.n:
+        return {'ks': None, 'psi': None}
+    points = np.union1d(ref.support(), cur.support())
+    ks = float(np.max(np.abs(ref.cdf(points) - cur.cdf(points))))
+    edges = np.unique(np.asarray(ref.quantiles(np.arange(1, bins) / bins), dtype=float))
+    ref_cdf = np.concatenate([[0.0], ref.cdf(edges), [1.0]])
+    cur_cdf = np.concatenate([[0.0], cur.cdf(edges), [1.0]])
+    return {'ks': round(ks, 4), 'psi': round(psi(np.diff(ref_cdf), np.diff(cur_cdf)), 4)}
+
+# ----------------------------- categorical --------------------------------------------
+
+def _shares(top_k: Dict[str, Any], rows: int) -> Tuple[Dict[str, float], float]:
+    return {str(v): c / rows for v, c, _ in top_k.get('items', [])}, top_k.get('floor', 0) / rows
+
+def categorical_drift(ref_top: Dict[str, Any], ref_rows: int,
+                      cur_top: Dict[str, Any], cur_rows: int) -> Dict[str, Any]:
+    """Share shifts over the union of both years' tracked values."""
+    if not ref_rows or not cur_rows:
+        return {'max_shift': None, 'max_shift_value': None, 'tvd': None, 'psi': None}
+    ref, ref_floor = _shares(ref_top, ref_rows)
+    cur, cur_floor = _shares(cur_top, cur_rows)
+    values = list(dict.fromkeys(list(ref) + list(cur)))
+    a = np.array([ref.get(v, ref_floor) for v in values])
+    b = np.array([cur.get(v, cur_floor) for v in values])
+    shift = b - a
+    top = int(np.argmax(np.abs(shift)))
+    # pool whatever the sketches do not track into one bucket so both vectors sum to 1
+    a_full = np.append(a, max(0.0, 1.0 - a.sum()))
+    b_full = np.append(b, max(0.0, 1.0 - b.sum()))
+    return {
+        'max_shift': round(float(shift[top]) * 100, 2),
+        'max_shift_value': values[top],
+        'tvd': round(float(np.abs(shift).sum()) / 2, 4),
+        'psi': round(psi(a_full, b_full), 4),
+    }
+
+# ----------------------------- per column ---------------------------------------------
+
+def column_drift(ref: Dict[str, Any], ref_rows: int, cur: Dict[str, Any], cur_rows: int) -> Dict[str, Any]:
+    """Drift of one column between two years from its serialized sketches."""
+    ref_numeric, cur_numeric = bool(ref.get('kll')), bool(cur.get('kll'))
+    if ref_numeric != cur_numeric:
+        return {'kind': 'type_change', 'level': 'major',
+                'detail': f"{'numeric' if ref_numeric else 'categorical'} -> "
+                          f"{'numeric' if cur_numeric else 'categorical'}"}
+    if ref_numeric:
+        out = {'kind': 'numeric', **numeric_drift(KLLSketch.from_dict(ref['kll']), KLLSketch.from_dict(cur['kll']))}
+        out['level'] = drift_level(out['psi'], out['ks'])
+        return out
+    if not ref.get('top_k') or not cur.get('top_k'):
+        return {'kind': 'categorical', 'level': 'n/a'}
+    out = {'kind': 'categorical', **categorical_drift(ref['top_k'], ref_rows, cur['top_k'], cur_rows)}
+    out['level'] = drift_level(out['psi'])
+    return out
+
+def compare_years(ref_sketches: Dict[str, Any], ref_rows: int,
+                  cur_sketches: Dict[str, Any], cur_rows: int) -> Dict[str, Dict[str, Any]]:
+    """{column: drift} for every column present in both years' sketches."""
+    shared = [c for c in ref_sketches if c in cur_sketches]
+    return {c: column_drift(ref_sketches[c], ref_rows, cur_sketches[c], cur_rows) for c in shared}
+
+def drift_score(d: Dict[str, Any]) -> float:
+    """Sort key: type changes first, then by PSI (KS as a tie-breaker)."""
+    if d['kind'] == 'type_change':
+        return math.inf
+    return (d.get('psi') or 0.0) + 1e-3 * (d.get('ks') or 0.0)
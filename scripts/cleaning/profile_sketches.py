@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Mergeable column sketches for the Pass-1 profiler
+
+  - HyperLogLog  : distinct-count estimate in fixed memory (2**precision registers)
+  - SpaceSaving  : heavy-hitter / top-k counts with per-item error bounds
+  - KLLSketch    : quantiles of numeric columns in O(k) memory (Karnin, Lang & Liberty)
+  - Moments      : exact count / mean / variance (Welford, Chan et al. merge) / min / max
+
+All are fed whole pandas Series or numpy arrays (vectorized, no per-row Python), merge associatively across chunks, files and years, and round-trip through
+plain JSON via ``to_dict`` / ``from_dict``.
+"""
+
+from __future__ import annotations
+import base64, math, zlib
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+HLL_PRECISION = 14          # 16384 registers, ~0.8% standard error
+TOPK_SKETCH_CAPACITY = 100  # tracked heavy hitters per column (>> topk_cats)
+KLL_K = 200                 # top compactor size, ~1.3% rank error
+QUANTILE_PROBS = (0.01, 0.05, 0.5, 0.95, 0.99)
+
+# ----------------------------- HyperLogLog --------------------------------------------
+
+def hash_values(values: pd.Series) -> np.ndarray:
+    """
+    Stable 64-bit hashes (same across processes/runs) for non-null values. Numbers are
+    hashed as float64 (``hash_pandas_object`` hashes by dtype, and ``to_numeric`` gives
+    int64 for one chunk and float64 for the next), with -0.0 folded into 0.0.
+    """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        values = values.astype(np.float64) + 0.0
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    # frexp on values that fit float64 exactly (< 2**32) gives the exact bit length
+    hi = (x >> np.uint64(32)).astype(np.float64)
+    lo = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(hi > 0, np.frexp(hi)[1] + 32, np.frexp(lo)[1])
+
+class HyperLogLog:
+    """Distinct-count sketch (Flajolet et al.) with linear-counting small-range correction."""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values: pd.Series) -> None:
+        values = values.dropna()
+        if values.empty:
+            return
+        self.update_hashes(hash_values(values))
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        p = self.precision
+        idx = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+        rank = ((64 - p) - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge HLL precision {other.precision} into {self.precision}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> int:
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.exp2(-self.registers.astype(np.float64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+    @property
+    def relative_error(self) -> float:
+        return round(1.04 / math.sqrt(self.registers.size), 4)
+
+    def to_dict(self) -> Dict[str, Any]:
+        packed = base64.b64encode(zlib.compress(self.registers.tobytes(), 6)).decode('ascii')
+        return {'precision': self.precision, 'registers': packed}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> 'HyperLogLog':
+        hll = cls(int(d['precision']))
+        raw = zlib.decompress(base64.b64decode(d['registers']))
+        hll.registers = np.frombuffer(raw, dtype=np.uint8).copy()
+        return hll
+
+# ----------------------------- Space-Saving -------------------------------------------
+
+class SpaceSaving:
+    """
+    Heavy-hitter summary holding at most ``capacity`` items.
+
+    ``floor`` bounds the count of any untracked item (0 while nothing has been
+    evicted, i.e. the summary is still exact). Estimates are upper bounds and
+    ``count - error`` is a guaranteed lower bound. Merging follows Agarwal et al.
+    (mergeable summaries): absent items are charged the other side's floor.
+    """
+
+    def __init__(self, capacity: int = TOPK_SKETCH_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+        self.errors = pd.Series(dtype='int64')
+        self.floor = 0
+
+    def update(self, values: pd.Series, dropna: bool = False) -> None:
+        """Add a batch of raw values (NaN is tallied as 'nan' unless dropna)."""
+        vc = values.value_counts(dropna=dropna, sort=False)
+        if vc.empty:
+            return
+        if not dropna:
+            vc.index = vc.index.fillna('nan')
+        self.update_counts(vc)
+
+    def update_counts(self, counts: pd.Series) -> None:
+        """Add exact counts (value -> count), e.g. a chunk's ``value_counts``."""
+        counts = counts.astype('int64')
+        self._merge_counts(counts, pd.Series(0, index=counts.index, dtype='int64'), 0)
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        self._merge_counts(other.counts, other.errors, other.floor)
+        return self
+
+    def _merge_counts(self, counts: pd.Series, errors: pd.Series, floor: int) -> None:
+        keys = self.counts.index.append(counts.index[~counts.index.isin(self.counts.index)])
+        merged = (self.counts.reindex(keys, fill_value=self.floor)
+                  + counts.reindex(keys, fill_value=floor))
+        merged_err = (self.errors.reindex(keys, fill_value=self.floor)
+                      + errors.reindex(keys, fill_value=floor))
+        new_floor = self.floor + floor
+        if len(merged) > self.capacity:
+            kept = merged.nlargest(self.capacity, keep='first')
+            new_floor = max(new_floor, int(merged.drop(kept.index).max()))
+            merged = kept
+            merged_err = merged_err.reindex(kept.index)
+        self.counts = merged.astype('int64')
+        self.errors = merged_err.astype('int64')
+        self.floor = int(new_floor)
+
+    def top(self, k: int) -> List[tuple]:
+        """[(value, estimated_count, error), ...] highest first; ties keep first-seen order."""
+        ranked = self.counts.sort_values(ascending=False, kind='stable').head(k)
+        return [(v, int(c), int(self.errors[v])) for v, c in ranked.items()]
+
+    @property
+    def exact(self) -> bool:
+        return self.floor == 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'capacity': self.capacity,
+            'floor': self.floor,
+            'items': [[v, c, e] for v, c, e in self.top(self.capacity)],
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> 'SpaceSaving':
+        ss = cls(int(d['capacity']))
+        items = d.get('items', [])
+        index = pd.Index([it[0] for it in items], dtype=object)
+        ss.counts = pd.Series([int(it[1]) for it in items], index=index, dtype='int64')
+        ss.errors = pd.Series([int(it[2]) for it in items], index=index, dtype='int64')
+        ss.floor = int(d.get('floor', 0))
+        return ss
+
+# ----------------------------- numeric distribution -----------------------------------
+
+def _finite(values) -> np.ndarray:
+    v = np.asarray(values, dtype=np.float64)
+    return v[np.isfinite(v)]
+
+def _pack_floats(v: np.ndarray) -> str:
+    return base64.b64encode(zlib.compress(v.astype('<f8').tobytes(), 6)).decode('ascii')
+
+def _unpack_floats(packed: str) -> np.ndarray:
+    return np.frombuffer(zlib.decompress(base64.b64decode(packed)), dtype='<f8').copy()
+
+class KLLSketch:
+    """
+    Quantile sketch: a stack of compactors, level h holding items of weight 2**h.
+
+    A level over its capacity (k·(2/3)**depth, at least 2) is sorted and every other
+    item, from a seeded random offset, is promoted to the next level. Memory stays
+    O(k) however many values are fed; merging concatenates levels and compacts again.
+    """
+
+    def __init__(self, k: int = KLL_K, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.zeros(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - h - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values) -> None:
+        """Add a batch of numbers (NaN / inf are ignored)."""
+        v = _finite(values)
+        if not v.size:
+            return
+        self.n += int(v.size)
+        self.levels[0] = np.concatenate([self.levels[0], v])
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if level.size <= self._capacity(h):
+                h += 1
+                continue
+            if h + 1 == len(self.levels):
+                self.levels.append(np.zeros(0))
+            level = np.sort(level)
+            # an odd item out stays behind so total weight is preserved exactly
+            stay, level = level[:level.size % 2], level[level.size % 2:]
+            offset = int(self._rng.integers(2))
+            self.levels[h] = stay
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], level[offset::2]])
+            h = 0  # adding a level shrinks every capacity below it
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge KLL k={other.k} into k={self.k}")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.zeros(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _sorted_weighted(self) -> tuple:
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, probs=QUANTILE_PROBS) -> List[float | None]:
+        """Value at each rank ``p·n`` (lower quantile); None while empty."""
+        if not self.n:
+            return [None for _ in probs]
+        items, cum = self._sorted_weighted()
+        idx = np.searchsorted(cum, np.asarray(probs, dtype=float) * cum[-1], side='left')
+        return [float(items[min(i, items.size - 1)]) for i in idx]
+
+    def cdf(self, points) -> np.ndarray:
+        """Estimated share of values <= each point (zeros while empty)."""
+        points = np.asarray(points, dtype=np.float64)
+        if not self.n:
+            return np.zeros(points.shape)
+        items, cum = self._sorted_weighted()
+        idx = np.searchsorted(items, points, side='right')
+        return np.where(idx > 0, cum[np.maximum(idx - 1, 0)], 0.0) / cum[-1]
+
+    def support(self) -> np.ndarray:
+        """Every retained item, sorted (where the estimated CDF steps)."""
+        return np.sort(np.concatenate(self.levels))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'k': self.k, 'n': self.n, 'levels': [_pack_floats(level) for level in self.levels]}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> 'KLLSketch':
+        kll = cls(int(d['k']))
+        kll.n = int(d['n'])
+        kll.levels = [_unpack_floats(level) for level in d['levels']] or [np.zeros(0)]
+        return kll
+
+class Moments:
+    """Exact count, mean, variance, min and max; batches and sketches combine pairwise (Chan et al.)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0   # sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values) -> None:
+        """Add a batch of numbers (NaN / inf are ignored)."""
+        v = _finite(values)
+        if not v.size:
+            return
+        mean = float(v.mean())
+        self._combine(int(v.size), mean, float(((v - mean) ** 2).sum()), float(v.min()), float(v.max()))
+
+    def _combine(self, n: int, mean: float, m2: float, lo: float, hi: float) -> None:
+        if not n:
+            return
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, lo)
+        self.max = max(self.max, hi)
+
+    def merge(self, other: 'Moments') -> 'Moments':
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    @property
+    def variance(self) -> float | None:
+        """Sample variance (ddof=1, as ``pd.Series.var``)."""
+        if self.count < 2:
+            return 0.0 if self.count else None
+        return self.m2 / (self.count - 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        empty = not self.count
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'min': None if empty else self.min, 'max': None if empty else self.max}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> 'Moments':
+        m = cls()
+        m.count = int(d['count'])
+        m.mean, m.m2 = float(d['mean']), float(d['m2'])
+        if m.count:
+            m.min, m.max = float(d['min']), float(d['max'])
+        return m
+
+def describe_numeric(kll: KLLSketch, moments: Moments) -> Dict[str, Any]:
+    """The ``numeric_stats`` block of a column profile: count, min/max, mean, variance, p1..p99."""
+    empty = not moments.count
+    stats = {
+        'count': moments.count,
+        'min': None if empty else moments.min,
+        'max': None if empty else moments.max,
+        'mean': None if empty else moments.mean,
+        'variance': moments.variance,
+    }
+    for p, q in zip(QUANTILE_PROBS, kll.quantiles(QUANTILE_PROBS)):
+        stats[f'p{round(p * 100)}'] = q
+    return stats
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Columnar profile store for the Pass-1 inventory (SQLite, standard library only)
+
+``data_dictionary.json`` is one indented document per run; every downstream script
+had to parse all of it just to learn column names. Pass-1 now also writes
+``profile_store.sqlite`` next to it with two narrow tables:
+
+  datasets : one row per year  (file, size, rows, status, encoding, ...)
+  columns  : one row per (year, column)  (flags, null stats, uniques, numeric stats, examples)
+
+Readers ask only for what they need — ``column_names`` touches just (year, name),
+``read_columns(fields=...)`` selects the requested stats — so load time tracks
+the projection, not the size of the JSON, as survey years are added.
+
+The JSON stays the source of truth; ``find_store`` ignores a store older than it
+and callers fall back to the JSON.
+"""
+
+from __future__ import annotations
+import json, os, sqlite3
+from pathlib import Path
+from typing import Dict, Any, List, Iterable, Set
+
+PROFILE_STORE_NAME = 'profile_store.sqlite'
+PROFILE_STORE_VERSION = 2
+
+DATASET_FIELDS = ('file', 'file_size_mb', 'loaded_ok', 'error', 'rows_loaded', 'n_columns_detected',
+                  'estimated_rows_in_file_ex_header', 'estimated_rows_skipped', 'structural_corruption',
+                  'encoding_used', 'run_duration_seconds')
+COLUMN_FIELDS = ('index', 'null_count', 'null_pct', 'is_numeric', 'looks_like_date', 'is_multiselect',
+                 'unique_approx', 'distinct_estimate', 'numeric_stats', 'examples')
+_BOOL_FIELDS = {'loaded_ok', 'structural_corruption', 'is_numeric', 'looks_like_date', 'is_multiselect'}
+_JSON_FIELDS = {'examples', 'numeric_stats'}
+# 'index' is an SQL keyword; store it as idx and hand it back under its report name
+_SQL_NAME = {'index': 'idx'}
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE datasets (
+    year INTEGER PRIMARY KEY, file TEXT, file_size_mb REAL, loaded_ok INTEGER, error TEXT,
+    rows_loaded INTEGER, n_columns_detected INTEGER, estimated_rows_in_file_ex_header INTEGER,
+    estimated_rows_skipped INTEGER, structural_corruption INTEGER, encoding_used TEXT,
+    run_duration_seconds REAL
+);
+CREATE TABLE columns (
+    year INTEGER NOT NULL, idx INTEGER NOT NULL, name TEXT NOT NULL,
+    null_count INTEGER, null_pct REAL, is_numeric INTEGER, looks_like_date INTEGER,
+    is_multiselect INTEGER, unique_approx INTEGER, distinct_estimate INTEGER, numeric_stats TEXT,
+    examples TEXT,
+    PRIMARY KEY (year, idx)
+);
+CREATE INDEX columns_name ON columns (name, year);
+"""
+
+def _sql(field: str) -> str:
+    return _SQL_NAME.get(field, field)
+
+def _to_sql(field: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if field in _JSON_FIELDS:
+        return json.dumps(value, separators=(',', ':'))
+    if field in _BOOL_FIELDS:
+        return int(bool(value))
+    return value
+
+def _from_sql(field: str, value: Any) -> Any:
+    if value is None:
+        return [] if field == 'examples' else None
+    if field in _JSON_FIELDS:
+        return json.loads(value)
+    if field in _BOOL_FIELDS:
+        return bool(value)
+    return value
+
+# ----------------------------- write --------------------------------------------------
+
+def write_profile_store(reports: List[Dict[str, Any]], out_path: str) -> None:
+    """Write all per-year reports to a fresh store (built beside it, then swapped in)."""
+    out = Path(out_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + '.tmp')
+    if tmp.exists():
+        tmp.unlink()
+    con = sqlite3.connect(str(tmp))
+    try:
+        con.executescript(_SCHEMA)
+        con.execute("INSERT INTO meta VALUES ('version', ?)", (str(PROFILE_STORE_VERSION),))
+        ds_cols = ', '.join(('year',) + DATASET_FIELDS)
+        col_cols = ', '.join(('year', 'name') + tuple(_sql(f) for f in COLUMN_FIELDS))
+        for r in reports:
+            year = r.get('year')
+            if not year:
+                continue
+            con.execute(f"INSERT INTO datasets ({ds_cols}) VALUES ({', '.join('?' * (len(DATASET_FIELDS) + 1))})",
+                        [year] + [_to_sql(f, r.get(f)) for f in DATASET_FIELDS])
+            con.executemany(
+                f"INSERT INTO columns ({col_cols}) VALUES ({', '.join('?' * (len(COLUMN_FIELDS) + 2))})",
+                ([year, c['name']] + [_to_sql(f, c.get(f)) for f in COLUMN_FIELDS]
+                 for c in r.get('columns', []))
+            )
+        con.commit()
+    finally:
+        con.close()
+    os.replace(tmp, out)
+
+# ----------------------------- read ---------------------------------------------------
+
+def find_store(docs_dir: Path) -> Path | None:
+    """The store in ``docs_dir`` if present and not older than data_dictionary.json."""
+    store = Path(docs_dir) / PROFILE_STORE_NAME
+    if not store.exists():
+        return None
+    combined = Path(docs_dir) / 'data_dictionary.json'
+    if combined.exists() and combined.stat().st_mtime > store.stat().st_mtime:
+        return None
+    return store
+
+def _connect(store: Path) -> sqlite3.Connection:
+    return sqlite3.connect(f'file:{store}?mode=ro', uri=True)
+
+def _year_filter(years: Iterable[int] | None) -> tuple:
+    if years is None:
+        return '', []
+    years = list(years)
+    return f" WHERE year IN ({', '.join('?' * len(years))})", years
+
+def read_datasets(store: Path, years: Iterable[int] | None = None,
+                  loaded_only: bool = False) -> Dict[int, Dict[str, Any]]:
+    """{year: dataset-level report fields} (no columns)."""
+    where, params = _year_filter(years)
+    if loaded_only:
+        where += (' AND' if where else ' WHERE') + ' loaded_ok = 1'
+    con = _connect(store)
+    try:
+        rows = con.execute(f"SELECT year, {', '.join(DATASET_FIELDS)} FROM datasets{where} ORDER BY year",
+                           params).fetchall()
+    finally:
+        con.close()
+    return {row[0]: {'year': row[0], **{f: _from_sql(f, v) for f, v in zip(DATASET_FIELDS, row[1:])}}
+            for row in rows}
+
+def read_columns(store: Path, fields: Iterable[str] = COLUMN_FIELDS,
+                 years: Iterable[int] | None = None) -> Dict[int, Dict[str, Dict[str, Any]]]:
+    """{year: {column name: {field: value}}} with only the requested ``fields`` selected."""
+    fields = tuple(fields)
+    unknown = set(fields) - set(COLUMN_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown column fields: {sorted(unknown)}")
+    where, params = _year_filter(years)
+    select = ', '.join(('year', 'name') + tuple(_sql(f) for f in fields))
+    convert = [f for f in fields if f in _BOOL_FIELDS or f in _JSON_FIELDS]
+    out: Dict[int, Dict[str, Dict[str, Any]]] = {}
+    con = _connect(store)
+    try:
+        for row in con.execute(f"SELECT {select} FROM columns{where} ORDER BY year, idx", params):
+            info = dict(zip(fields, row[2:]))
+            for f in convert:
+                info[f] = _from_sql(f, info[f])
+            out.setdefault(row[0], {})[row[1]] = info
+    finally:
+        con.close()
+    return out
+
+def column_names(store: Path, years: Iterable[int] | None = None) -> Dict[int, Set[str]]:
+    """{year: set of column names} — the names-only projection."""
+    where, params = _year_filter(years)
+    out: Dict[int, Set[str]] = {}
+    con = _connect(store)
+    try:
+        for year, name in con.execute(f"SELECT year, name FROM columns{where}", params):
+            out.setdefault(year, set()).add(name)
+    finally:
+        con.close()
+    return out
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Quick-profile sampler for first-look triage of huge CSVs (``--quick``)
+
+Instead of reading the whole file, ``sample_records`` reads ``QUICK_BLOCKS`` blocks
+at seeded random byte offsets (one per equal stratum of the body, so blocks never
+overlap), resyncs each to a record boundary and parses only whole records:
+
+  - the quote state at a random offset is unknown, so both guesses are resynced
+    (each only within ``PROBE_BYTES``: a guess with no record boundary there is
+    rejected) and the one whose first records match the header's field count wins;
+  - a block keeps every record that *starts* inside it (``RecordScanner.scan``
+    finishes the last one), so records are never split or double counted;
+  - rows stream through a reservoir (Algorithm R) capped at ``QUICK_SAMPLE_ROWS``.
+
+Rows and null shares treat blocks as clusters (ratio estimator, between-block
+variance), so their 95% intervals stay honest when nearby rows look alike:
+
+  - rows in file     : rows-per-byte ratio × body bytes
+  - null share       : ratio of nulls to kept rows, Wilson-floored
+  - distinct values  : Shlosser estimate within bounds [observed, GEE upper bound (Charikar
+                       et al., 2000)]; a range, not a confidence interval
+
+Files small enough to read in one go are read completely (a census, no interval).
+"""
+
+from __future__ import annotations
+import csv, io, math, random
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from byte_scanner import MappedFile, RecordScanner, data_start, resync
+
+QUICK_BLOCKS = 64                 # random blocks read per file
+QUICK_BLOCK_BYTES = 256 << 10     # bytes per block (records starting inside it)
+QUICK_SAMPLE_ROWS = 20000         # reservoir size
+QUICK_SEED = 0
+PROBE_BYTES = 16 << 10            # bytes parsed when choosing a resync quote state
+Z95 = 1.959964
+
+# ----------------------------- sampling -----------------------------------------------
+
+def _records(mf: MappedFile, decode_as: str, begin: int, end: int) -> List[List[str]]:
+    text = mf.mm[begin:end].decode(decode_as, errors='replace')
+    return list(csv.reader(io.StringIO(text, newline='')))
+
+def _probe_score(mf: MappedFile, encoding: str, first: int, pos: int, ncols: int) -> float:
+    """Share of the records right after ``pos`` that have the header's field count."""
+    probe = RecordScanner(mf, encoding, first, ncols, 0)
+    probe.scan(pos, min(pos + PROBE_BYTES, mf.size) - 1, window=PROBE_BYTES)
+    return probe.counts.get(ncols, 0) / probe.n_records if probe.n_records else 0.0
+
+def _block_start(mf: MappedFile, encoding: str, first: int, offset: int, ncols: int) -> int:
+    # a wrong guess can run to EOF looking for a boundary (quote-free data read as
+    # inside a quote never finds one), so each guess gets PROBE_BYTES at most
+    outside = resync(mf, offset, False, PROBE_BYTES, limit=PROBE_BYTES)
+    inside = resync(mf, offset, True, PROBE_BYTES, limit=PROBE_BYTES)
+    if inside is None or outside == inside:
+        return outside if outside is not None else resync(mf, offset, False, PROBE_BYTES)
+    if outside is None:
+        return inside
+    # outside-a-quote wins ties: it is by far the common case in survey exports
+    if _probe_score(mf, encoding, first, inside, ncols) > _probe_score(mf, encoding, first, outside, ncols):
+        return inside
+    return outside
+
+def sample_records(file_path: str, encoding: str, blocks: int = QUICK_BLOCKS,
+                   block_bytes: int = QUICK_BLOCK_BYTES, sample_rows: int = QUICK_SAMPLE_ROWS,
+                   seed: int = QUICK_SEED) -> Dict[str, Any]:
+    """
+    Header, reservoir of (block id, row) and per-block tallies from random byte blocks.
+    Returns {'header', 'rows', 'row_blocks', 'blocks': [{'bytes', 'records', 'histogram'}],
+    'body_bytes', 'bytes_read', 'complete' (whole body read), 'census' (and every row kept)}.
+    """
+    rng = random.Random(seed)
+    with MappedFile(file_path) as mf:
+        first = data_start(mf, encoding)
+        head = RecordScanner(mf, encoding, first, None, 0)
+        body = head.scan(first, first) if first < mf.size else mf.size
+        decode_as = head.decode_as
+        header = _records(mf, decode_as, first, body)[0] if body > first else []
+        ncols = len(header)
+        body_bytes = mf.size - body
+
+        census = body_bytes <= 2 * blocks * block_bytes
+        if census:
+            spans = [(body, mf.size)]
+        else:
+            stratum = body_bytes // blocks
+            spans = []
+            for k in range(blocks):
+                offset = body + k * stratum + rng.randrange(stratum - block_bytes)
+                spans.append((_block_start(mf, encoding, first, offset, ncols), offset + block_bytes))
+
+        kept: List[List[str]] = []
+        kept_blocks: List[int] = []
+        tallies = []
+        seen = 0
+        for b, (start, stop) in enumerate(spans):
+            scanner = RecordScanner(mf, encoding, first, ncols, 0)
+            end = scanner.scan(start, stop - 1, window=block_bytes) if start < stop else start
+            rows = _records(mf, decode_as, start, end) if end > start else []
+            tallies.append({'bytes': end - start, 'records': len(rows),
+                            'histogram': dict(scanner.counts)})
+            for row in rows:
+                # Algorithm R: every row read so far is kept with equal probability
+                if len(kept) < sample_rows:
+                    kept.append(row)
+                    kept_blocks.append(b)
+                else:
+                    j = rng.randrange(seen + 1)
+                    if j < sample_rows:
+                        kept[j] = row
+                        kept_blocks[j] = b
+                seen += 1
+
+    return {
+        'header': header,
+        'rows': kept,
+        'row_blocks': np.array(kept_blocks, dtype=np.int64),
+        'blocks': tallies,
+        'body_bytes': body_bytes,
+        'bytes_read': sum(t['bytes'] for t in tallies) + body,
+        'complete': census,
+        'census': census and seen == len(kept),
+    }
+
+def sample_frame(sample: Dict[str, Any]) -> pd.DataFrame:
+    """
+    The kept rows as the dtype=str frame ``pd.read_csv(on_bad_lines='skip')`` would
+    give (same NA tokens, short rows padded, over-long rows dropped). The block of
+    each row is kept in ``df.attrs['row_blocks']``.
+    """
+    ncols = len(sample['header'])
+    good = [i for i, r in enumerate(sample['rows']) if 0 < len(r) <= ncols]
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(sample['header'])
+    writer.writerows(sample['rows'][i] for i in good)
+    buf.seek(0)
+    df = pd.read_csv(buf, dtype=str, skip_blank_lines=False)
+    df.attrs['row_blocks'] = sample['row_blocks'][good]
+    return df
+
+# ----------------------------- estimators ---------------------------------------------
+
+def _interval(est: float, se: float, lo: float = 0.0, hi: float = math.inf) -> List[float]:
+    return [max(lo, est - Z95 * se), min(hi, est + Z95 * se)]
+
+def ratio_estimate(y: np.ndarray, x: np.ndarray, sampled_share: float = 0.0) -> Tuple[float, float]:
+    """Cluster ratio estimator sum(y)/sum(x) and its standard error (with fpc)."""
+    k = len(x)
+    total_x = float(x.sum())
+    if not total_x:
+        return 0.0, 0.0
+    r = float(y.sum()) / total_x
+    if k < 2:
+        return r, 0.0
+    resid = y - r * x
+    se = math.sqrt(max(0.0, 1.0 - sampled_share) * float((resid ** 2).sum()) / (k * (k - 1))) / x.mean()
+    return r, se
+
+def estimate_rows(sample: Dict[str, Any]) -> Dict[str, Any]:
+    """Rows in the file (ex header) from the sampled rows-per-byte ratio."""
+    records = np.array([t['records'] for t in sample['blocks']], dtype=float)
+    nbytes = np.array([t['bytes'] for t in sample['blocks']], dtype=float)
+    body = sample['body_bytes']
+    if sample['complete'] or not nbytes.sum():
+        n = int(records.sum())
+        return {'estimate': n, 'ci95': [n, n]}
+    r, se = ratio_estimate(records, nbytes, float(nbytes.sum()) / body if body else 1.0)
+    lo, hi = _interval(r * body, se * body, lo=float(records.sum()))
+    return {'estimate': int(round(r * body)), 'ci95': [int(math.floor(lo)), int(math.ceil(hi))]}
+
+def estimate_null_share(is_null: np.ndarray, row_blocks: np.ndarray, census: bool) -> Dict[str, Any]:
+    """Null share with a 95% interval: between-block (cluster) SE, never below binomial."""
+    n = len(is_null)
+    if not n:
+        return {'estimate': 0.0, 'ci95': [0.0, 1.0]}
+    p = float(is_null.mean())
+    if census:
+        return {'estimate': p, 'ci95': [p, p]}
+    _, blocks = np.unique(row_blocks, return_inverse=True)
+    y = np.bincount(blocks, weights=is_null.astype(float))
+    x = np.bincount(blocks).astype(float)
+    _, se_cluster = ratio_estimate(y, x)
+    # Wilson half-width as a floor, so all-null / no-null samples still get an interval
+    centre = (p + Z95 ** 2 / (2 * n)) / (1 + Z95 ** 2 / n)
+    half = Z95 * math.sqrt(p * (1 - p) / n + Z95 ** 2 / (4 * n * n)) / (1 + Z95 ** 2 / n)
+    lo, hi = _interval(p, se_cluster, 0.0, 1.0)
+    return {'estimate': p, 'ci95': [float(min(lo, centre - half)), float(max(hi, centre + half))]}
+
+def estimate_distinct(values: pd.Series, population: int, census: bool) -> Dict[str, Any]:
+    """
+    Distinct count of ``population`` rows from the non-null ``values`` sample.
+    Point estimate: Shlosser (good for skewed and key-like columns, where GEE's
+    sqrt(N/n)·f1 + (d - f1) badly undercounts). ``bounds``: d (seen) to the GEE
+    worst-case upper bound (d - f1) + f1·N/n, where f_i counts values seen exactly
+    i times; no coverage is claimed, so this is not a 95% interval.
+    """
+    values = values.dropna()
+    n = len(values)
+    if not n:
+        return {'estimate': 0, 'bounds': [0, 0]}
+    freq = values.value_counts(sort=False)
+    d = int(freq.size)
+    if census or population <= n:
+        return {'estimate': d, 'bounds': [d, d]}
+    f = freq.value_counts()                                   # i -> f_i
+    i, fi = f.index.to_numpy(dtype=float), f.to_numpy(dtype=float)
+    f1 = int(f.get(1, 0))
+    q = n / population
+    upper = int(math.ceil((d - f1) + f1 / q))
+    denom = float((i * q * (1 - q) ** (i - 1) * fi).sum())
+    est = d + f1 * float(((1 - q) ** i * fi).sum()) / denom if denom else d
+    return {'estimate': int(round(min(max(est, d), upper))), 'bounds': [d, upper]}
@@ -57,7 +57,9 @@ echo "   📄 column_mapping.md - Full availability matrix"
 echo "   📄 column_intersection.md - 2023 ∩ 2024 baseline"
 echo "   📄 comprehensive_column_analysis.md - EDA strategy & SQL templates"
 echo "   📄 sql_column_reference.sql - Ready-to-use SQL column lists"
+echo "   📄 distribution_drift.md - Cross-year drift per shared column (from sketches)"
 echo "   📄 data_dictionary.json - Complete technical metadata"
+echo "   📄 profile_store.sqlite - Columns × years store (fast projected reads)"
 echo
 echo "💾 Processed datasets in: $RAW_DIR/../processed"
 echo "   📄 2023_stackoverflow_cleaned.csv - Fixed encoding & BigQuery ready"
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Tiered CSV reader for the BigQuery cleaner
+
+``clean_csv_for_bigquery`` parsed every file with pandas' Python engine. That engine
+is ``csv.reader(strict=True)`` underneath: it skips rows the C tokenizer would accept
+(``"x"y``, a quote left open, a field over ``csv.field_size_limit``) and keeps NUL
+bytes the C tokenizer truncates at. ``read_survey_csv`` returns the same DataFrame
+(same rows kept, same rows skipped) while the C engine parses every region where the
+two engines provably agree:
+
+  - the body is cut into record-aligned blocks by a numpy quote-parity pass (the
+    ``byte_scanner`` quoting rules); blocks that break them are resynced exactly
+    with ``byte_scanner.RecordScanner``;
+  - a block is *fast* when every quote in it opens or closes a field, it holds no
+    NUL byte, no open quote and no bare CR (old-Mac line ends, which the C engine
+    mis-reads after a blank line), no record that is only ``""`` (the Python engine
+    skips it as blank, the C engine keeps an all-NaN row), and no record is longer
+    than the csv field limit;
+  - runs of fast blocks go to the C engine, everything else to the Python engine,
+    each run with the header re-attached; the frames are concatenated in order.
+
+A Python-engine run must end where that engine is between records, otherwise its
+last record is cut short ("unexpected end of data") where the whole-file parse would
+have kept reading; such a run absorbs the following blocks until it ends cleanly.
+Runs after the first are parsed behind two dummy ``_,_,...`` rows so their first
+records cannot turn into an implicit index (or index names). A header the scanner
+cannot vouch for, or first data rows the Python engine turns into an index, send the
+whole file to the Python engine.
+
+``iter_survey_csv`` yields the same rows in frames of a bounded size: runs are capped
+at ``READ_RUN_BYTES`` and each is parsed whole, then sliced (pandas' own chunked
+readers skip and keep different lines than a whole-file read). Given a ``dtypes``
+stage, C-engine runs are parsed straight into the dtypes it asks for (e.g.
+'category'), so they are never held as object strings once the stage has decided;
+Python-engine parses stay strings (short rows there hold None, which the cleaner
+writes as 'None') and are converted by the stage afterwards.
+
+pandas' pyarrow engine is not a tier: it has no ``skipinitialspace`` and its bad-line
+and NA handling differ from the Python engine's.
+"""
+
+from __future__ import annotations
+import csv, io, os, warnings
+from typing import Dict, Any, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from byte_scanner import MappedFile, RecordScanner, data_start, QUOTE, COMMA, CR, LF
+
+READ_BLOCK_BYTES = 256 << 10 # isolation granularity: a bad record costs at most ~this much Python parsing
+INDEX_PROBE_BYTES = 64 << 10 # head parsed by the Python engine to see whether it infers an index
+SCAN_TAIL_BYTES = 16 << 10   # bytes past a block's nominal end searched for its last record's terminator
+READ_CHUNK_ROWS = 50000      # rows per frame yielded by iter_survey_csv
+READ_RUN_BYTES = 32 << 20    # longest run iter_survey_csv parses in one piece (runs are parsed whole, then sliced)
+STREAM_BUFFER_BYTES = 1 << 20
+READ_ENGINES = ('tiered', 'python')
+READ_OPTIONS = dict(
+    dtype=str,                # Load everything as string initially
+    on_bad_lines='skip',
+    quotechar='"',
+    doublequote=True,
+    skipinitialspace=True,
+)
+_OPEN_AT_END = 'unexpected end of data'
+_QUOTE_NEIGHBOURS = np.array([COMMA, CR, LF, QUOTE], dtype=np.uint8)  # valid before an opening / after a closing quote
+_SPACE = 0x20
+
+def read_python(source, encoding: str) -> pd.DataFrame:
+    """The reference read: pandas' Python engine over the whole source."""
+    return pd.read_csv(source, encoding=encoding, engine='python', **READ_OPTIONS)
+
+# ----------------------------- planning -----------------------------------------------
+
+def _has_bare_cr(seg: np.ndarray) -> bool:
+    cr = np.flatnonzero(seg == CR)
+    return bool(len(cr)) and (cr[-1] + 1 == len(seg) or bool(np.any(seg[cr + 1] != LF)))
+
+def _has_empty_quoted_record(seg: np.ndarray, ends: np.ndarray) -> bool:
+    """Whether a record (from offset 0, a record boundary) is ``""`` after leading spaces."""
+    ends = ends[ends >= 2]
+    for e in ends[(seg[ends - 1] == QUOTE) & (seg[ends - 2] == QUOTE)]:
+        i = int(e) - 3
+        while i >= 0 and seg[i] == _SPACE:
+            i -= 1
+        if i < 0 or seg[i] == LF or seg[i] == CR:
+            return True
+    return False
+
+def _first_violation(buf: np.ndarray, pos: int, seg: np.ndarray, q: np.ndarray) -> int:
+    """Offset of the first quote that neither opens nor closes a field (len(seg) if none)."""
+    if not len(q):
+        return len(seg)
+    opener, closer = q[0::2], q[1::2]
+    bad_open = opener[~np.isin(buf[pos + opener - 1], _QUOTE_NEIGHBOURS)]   # pos is past the header
+    nxt = closer + 1
+    bad_close = closer[(nxt < len(seg)) & ~np.isin(seg[np.minimum(nxt, len(seg) - 1)], _QUOTE_NEIGHBOURS)]
+    return int(min([x[0] for x in (bad_open, bad_close) if len(x)], default=len(seg)))
+
+def _fast_block_end(buf: np.ndarray, n: int, pos: int, stop: int, limit: int) -> int | None:
+    """
+    Start of the first record after ``stop`` when the records from boundary ``pos``
+    are fast-safe (see module docstring); None otherwise. Records are judged by
+    length, which bounds every field's length in characters.
+    """
+    tail = SCAN_TAIL_BYTES
+    while True:
+        hi = min(n, stop + tail)
+        seg = buf[pos:hi]
+        q = np.flatnonzero(seg == QUOTE)
+        bad = _first_violation(buf, pos, seg, q)
+        nl = np.flatnonzero((seg == LF) | (seg == CR))
+        t = nl[np.searchsorted(q, nl) % 2 == 0]                  # unquoted CR / LF
+        k = int(np.searchsorted(t, stop - pos))
+        if k < len(t) and (t[k] + 1 < len(seg) or hi == n):
+            end = int(t[k]) + 1
+            if seg[end - 1] == CR and end < len(seg) and seg[end] == LF:
+                end += 1
+            break
+        if bad < len(seg):
+            return None                                          # parity is off: do not chase a terminator
+        if hi == n:
+            end = len(seg)                                       # last record runs to EOF
+            break
+        tail *= 2                                                # one record outgrew the tail
+    if bad < end or np.count_nonzero(q < end) % 2:
+        return None                                              # bad quote, or one left open
+    block = seg[:end]
+    if np.count_nonzero(block == 0) or _has_bare_cr(block):
+        return None
+    ends = t[t < end]
+    if _has_empty_quoted_record(block, np.append(ends, end)):
+        return None
+    if int(np.diff(ends, prepend=-1, append=end).max()) > limit:
+        return None
+    return pos + end
+
+def plan_runs(mf: MappedFile, encoding: str, block_bytes: int = READ_BLOCK_BYTES,
+              run_bytes: int | None = None) -> Dict[str, Any] | None:
+    """
+    Split the body into runs of record-aligned blocks: {'body', 'ncols', 'runs':
+    [[start, end, fast], ...]}; a run stops growing once it spans ``run_bytes``.
+    None when the header itself is not safe to reuse.
+    """
+    first = data_start(mf, encoding)
+    header = RecordScanner(mf, encoding, first, None, 0)
+    body = header.scan(first, first) if first < mf.size else mf.size
+    ncols = next(iter(header.counts), 0)
+    head = mf.buf[:body]
+    if ncols == 0 or header.fallback_windows or np.count_nonzero(head == 0) or _has_bare_cr(head):
+        return None
+
+    limit = csv.field_size_limit()
+    scanner = RecordScanner(mf, encoding, first, None, 0)   # exact boundaries through irregular blocks
+    runs: List[List] = []
+    pos = body
+    while pos < mf.size:
+        end = _fast_block_end(mf.buf, mf.size, pos, pos + block_bytes, limit)
+        fast = end is not None
+        if not fast:
+            end = scanner.scan(pos, pos + block_bytes, window=block_bytes)
+        if runs and runs[-1][2] == fast and (run_bytes is None or runs[-1][1] - runs[-1][0] < run_bytes):
+            runs[-1][1] = end
+        else:
+            runs.append([pos, end, fast])
+        pos = end
+    return {'body': body, 'ncols': ncols, 'runs': runs}
+
+# ----------------------------- parsing ------------------------------------------------
+
+class _RunStream(io.RawIOBase):
+    """``prefix`` followed by bytes [start, end) of the mapped file, read without copying the range up front."""
+
+    def __init__(self, mm, prefix: bytes, start: int, end: int):
+        self.mm, self.prefix, self.pos, self.end = mm, prefix, start, end
+        self.off = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if self.off < len(self.prefix):
+            k = min(len(b), len(self.prefix) - self.off)
+            b[:k] = self.prefix[self.off:self.off + k]
+            self.off += k
+            return k
+        k = min(len(b), self.end - self.pos)
+        if k <= 0:
+            return 0
+        b[:k] = self.mm[self.pos:self.pos + k]
+        self.pos += k
+        return k
+
+def _run_source(mf: MappedFile, head: bytes, dummy: bytes, body: int, start: int, end: int) -> io.BufferedReader:
+    if start == body:
+        return io.BufferedReader(_RunStream(mf.mm, b'', 0, end), buffer_size=STREAM_BUFFER_BYTES)
+    return io.BufferedReader(_RunStream(mf.mm, head + dummy, start, end), buffer_size=STREAM_BUFFER_BYTES)
+
+def _parse_c(source, encoding: str, dtype: Any = str) -> pd.DataFrame:
+    return pd.read_csv(source, encoding=encoding, engine='c', **{**READ_OPTIONS, 'dtype': dtype})
+
+def _parse_python(source, encoding: str) -> Tuple[pd.DataFrame, bool]:
+    """Python-engine parse of a run; also reports whether its last record ran off the end."""
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always', pd.errors.ParserWarning)
+        df = pd.read_csv(source, encoding=encoding, engine='python', **{**READ_OPTIONS, 'on_bad_lines': 'warn'})
+    return df, any(_OPEN_AT_END in str(w.message) for w in caught)
+
+def _default_index(df: pd.DataFrame) -> bool:
+    return isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1
+
+def _python_infers_index(mf: MappedFile, encoding: str, body: int) -> bool:
+    """
+    Whether the Python engine builds an index from the first two data lines (a first
+    line longer than the header, or a second line holding index names' worth more).
+    """
+    span = INDEX_PROBE_BYTES
+    while True:
+        scanner = RecordScanner(mf, encoding, data_start(mf, encoding), None, 0)
+        end = scanner.scan(body, body + span, window=span)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', pd.errors.ParserWarning)
+            df = pd.read_csv(io.BytesIO(bytes(mf.mm[:end])), encoding=encoding, engine='python',
+                             **{**READ_OPTIONS, 'on_bad_lines': 'warn'})
+        if not _default_index(df):
+            return True
+        if len(df) + len(caught) >= 2 or end >= mf.size:
+            return False
+        span *= 4
+
+def _slices(df: pd.DataFrame, chunksize: int | None) -> Iterator[pd.DataFrame]:
+    if chunksize is None or len(df) <= chunksize:
+        yield df
+        return
+    for lo in range(0, len(df), chunksize):
+        yield df.iloc[lo:lo + chunksize]
+
+# ----------------------------- entry points -------------------------------------------
+
+def iter_survey_csv(file_path: str, encoding: str, chunksize: int | None = READ_CHUNK_ROWS,
+                    engine: str = 'tiered', info: Dict[str, Any] | None = None,
+                    block_bytes: int = READ_BLOCK_BYTES, dtypes: Any = None) -> Iterator[pd.DataFrame]:
+    """
+    The rows ``read_python`` would return, as frames of at most ``chunksize`` rows
+    (None: one frame per run). Runs are capped at ``READ_RUN_BYTES`` and each is
+    parsed whole, then sliced: pandas' chunked readers are not equivalent (the C
+    engine lets a chunk's first row through with too many fields, the Python engine
+    raises on quoting errors instead of skipping the line). A whole-file Python
+    fallback therefore holds the whole file.
+    ``info``, if given, receives {'engine', 'c_bytes', 'python_bytes', 'python_runs'}.
+    ``dtypes``, if given, is a dtype stage (``generate_cleaned_datasets.LeanDtypes``):
+    C-engine parses get ``dtypes.read_dtype()`` as their dtype and every parsed frame
+    goes through ``dtypes.apply`` before it is sliced. Values and rows are unchanged.
+    At least one frame (possibly empty) is yielded.
+    """
+    if engine not in READ_ENGINES:
+        raise ValueError(f"Unknown CSV read engine: {engine}")
+    info = {} if info is None else info
+    size = os.path.getsize(file_path)
+    whole = {'engine': 'python', 'c_bytes': 0, 'python_bytes': size, 'python_runs': 1}
+    dtype = (lambda: str) if dtypes is None else dtypes.read_dtype
+    lean = (lambda df: df) if dtypes is None else dtypes.apply
+    if engine == 'python' or size == 0:
+        info.update(whole)
+        yield from _slices(lean(read_python(file_path, encoding)), chunksize)
+        return
+
+    with MappedFile(file_path) as mf:
+        plan = plan_runs(mf, encoding, block_bytes, None if chunksize is None else READ_RUN_BYTES)
+        if plan is None or _python_infers_index(mf, encoding, plan['body']):
+            info.update(whole)
+            yield from _slices(lean(read_python(file_path, encoding)), chunksize)
+            return
+        body, runs = plan['body'], plan['runs']
+        info.update(engine='tiered', c_bytes=0, python_bytes=0, python_runs=0)
+        if len(runs) <= 1 and all(fast for _, _, fast in runs):
+            runs = [[body, size, True]]
+        head = bytes(mf.mm[:body])
+        dummy = (b','.join([b'_'] * plan['ncols']) + b'\n') * 2
+        yielded = False
+        i = 0
+        while i < len(runs):
+            start, end, fast = runs[i]
+            if fast:
+                source = file_path if len(runs) == 1 else _run_source(mf, head, dummy, body, start, end)
+                try:
+                    df = _parse_c(source, encoding, dtype())
+                except pd.errors.ParserError:
+                    fast = False          # e.g. a tokenizer limit: the Python engine takes the run
+            if not fast:
+                grow = 1
+                while True:
+                    df, open_at_end = _parse_python(_run_source(mf, head, dummy, body, start, end), encoding)
+                    if not open_at_end or i + 1 >= len(runs):
+                        break
+                    absorbed = runs[i + 1:i + 1 + grow]   # quote still open: keep reading, doubling the reach
+                    end = absorbed[-1][1]
+                    del runs[i + 1:i + 1 + grow]
+                    grow *= 2
+                info['python_runs'] += 1
+            if start == body and not _default_index(df):
+                info.update(whole)
+                del df
+                yield from _slices(lean(read_python(file_path, encoding)), chunksize)
+                return
+            info['c_bytes' if fast else 'python_bytes'] += end - start
+            if start != body:
+                df = df.iloc[2:]          # the dummy rows
+            df = lean(df)
+            for part in _slices(df, chunksize):
+                if len(part) or not yielded:
+                    yielded = True
+                    yield part
+            del df
+            i += 1
+
+def read_survey_csv(file_path: str, encoding: str, engine: str = 'tiered',
+                    block_bytes: int = READ_BLOCK_BYTES) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Read a raw survey CSV exactly as ``read_python`` would. Returns the frame and
+    {'engine', 'c_bytes', 'python_bytes', 'python_runs'} (engine='python' reads the
+    whole file with the Python engine, as before).
+    """
+    info: Dict[str, Any] = {}
+    frames = list(iter_survey_csv(file_path, encoding, chunksize=None, engine=engine, info=info,
+                                  block_bytes=block_bytes))
+    if len(frames) == 1:
+        return frames[0], info
+    return pd.concat(frames, ignore_index=True), info